@@ -48,6 +48,15 @@ typecheck_requires = [
 dev_requires: List[str] = [
     # 'pytest-sugar>=0.9.1',
 ]
+orjson_requires = [
+    'orjson>=3.3',
+]
+zstd_requires = [
+    'zstandard>=0.14',
+]
+parquet_requires = [
+    'pyarrow>=1.0',
+]
 docs_requires = [
     'sphinx~=2.4',
     'sphinx-intl>=2.0',
@@ -107,6 +116,9 @@ setup(
         'lint': lint_requires,
         'typecheck': typecheck_requires,
         'docs': docs_requires,
+        'orjson': orjson_requires,
+        'zstd': zstd_requires,
+        'parquet': parquet_requires,
     },
     data_files=[],
     entry_points={
@@ -1,9 +1,19 @@
+import importlib
+from typing import Any
+
 from . import exceptions
-from . import session
+
+_session_names = (
+    'BaseSession',
+    'Session',
+    'AsyncSession',
+    'api_session',
+    'shutdown_shared_runtime',
+)
 
 __all__ = (
     *exceptions.__all__,
-    *session.__all__,
+    *_session_names,
 )
 
 __version__ = '20.09.0a1.dev0'
@@ -11,3 +21,14 @@ __version__ = '20.09.0a1.dev0'
 
 def get_user_agent():
     return 'Backend.AI Client for Python {0}'.format(__version__)
+
+
+def __getattr__(name: str) -> Any:
+    # The session module imports aiohttp, which takes most of the import time,
+    # so it is imported on the first access to its names.
+    if name == 'session' or name in _session_names:
+        session = importlib.import_module('.session', __name__)
+        return session if name == 'session' else getattr(session, name)
+    if name in exceptions.__all__:
+        return getattr(exceptions, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
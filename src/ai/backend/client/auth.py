@@ -1,5 +1,6 @@
 from datetime import datetime
 import enum
+import functools
 import hashlib
 import hmac
 from typing import (
@@ -28,6 +29,19 @@ class AuthToken:
     content = attr.ib(default=None)                 # type: str
 
 
+@functools.lru_cache(maxsize=16)
+def _get_empty_body_hash(hash_type: str) -> str:
+    return hashlib.new(hash_type, b'').hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def _get_sign_key(secret_key: str, hash_type: str, date_bucket: str, hostname: str) -> bytes:
+    # The signing key only depends on the keypair, the date and the endpoint,
+    # so it is derived once per day for each (keypair, endpoint) combination.
+    sign_key = hmac.new(secret_key.encode(), date_bucket.encode(), hash_type).digest()
+    return hmac.new(sign_key, hostname.encode(), hash_type).digest()
+
+
 def generate_signature(
     *,
     method: str,
@@ -43,9 +57,8 @@ def generate_signature(
     '''
     Generates the API request signature from the given parameters.
     '''
-    hash_type = hash_type
     hostname = endpoint._val.netloc  # type: ignore
-    body_hash = hashlib.new(hash_type, b'').hexdigest()
+    body_hash = _get_empty_body_hash(hash_type)
 
     sign_str = '{}\n{}\n{}\nhost:{}\ncontent-type:{}\nx-backendai-version:{}\n{}'.format(  # noqa
         method.upper(),
@@ -58,10 +71,7 @@ def generate_signature(
     )
     sign_bytes = sign_str.encode()
 
-    sign_key = hmac.new(secret_key.encode(),
-                        date.strftime('%Y%m%d').encode(), hash_type).digest()
-    sign_key = hmac.new(sign_key, hostname.encode(), hash_type).digest()
-
+    sign_key = _get_sign_key(secret_key, hash_type, date.strftime('%Y%m%d'), hostname)
     signature = hmac.new(sign_key, sign_bytes, hash_type).hexdigest()
     headers = {
         'Authorization': 'BackendAI signMethod=HMAC-{}, credential={}:{}'.format(
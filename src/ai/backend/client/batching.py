@@ -0,0 +1,436 @@
+"""
+Provides batched dispatching of GraphQL queries.
+
+Multiple GraphQL queries are merged into a single document by prefixing
+their top-level fields with aliases and their variables with distinct names,
+so that they are sent to the server in a single request.  The result is
+split back into the per-query results by the aliases.
+
+There are two ways to batch queries:
+
+* When :attr:`APIConfig.graphql_batching
+  <ai.backend.client.config.APIConfig.graphql_batching>` is set, the read-only
+  GraphQL queries issued in the same event loop tick, such as the concurrent
+  calls of the function-class shortcuts under :func:`asyncio.gather`, are
+  merged automatically by the session's :class:`GraphQLBatcher`.
+
+* :meth:`Admin.batch() <ai.backend.client.func.admin.Admin.batch>` returns
+  a :class:`GraphQLBatch` to collect the queries explicitly and send them
+  when the context exits:
+
+  .. code-block:: python3
+
+    with session.Admin.batch() as batch:
+      users = batch.query('{ users { email } }')
+      agents = batch.query('{ agents { id } }')
+    print(users.result(), agents.result())
+
+Queries using fragments or directives are sent as they are.  If the merged
+request fails with an API error, the queries are sent individually so that
+each caller gets its own result or error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextvars import copy_context
+import json
+import re
+from typing import (
+    Any,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+import attr
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .compat import current_loop
+from .exceptions import BackendAPIError
+from .snapshot import ResponseSnapshot
+
+if TYPE_CHECKING:
+    from .session import BaseSession
+
+__all__ = (
+    'ParsedQuery',
+    'parse_query',
+    'merge_queries',
+    'GraphQLBatchStats',
+    'GraphQLBatcher',
+    'BatchedQuery',
+    'GraphQLBatch',
+)
+
+_token_pattern = re.compile(r'''
+    (?P<ignored> [\s,\ufeff]+ | \#[^\n\r]* )
+  | (?P<string> """(?:\\"""|(?!""")[\s\S])*""" | "(?:\\.|[^"\\\n\r])*" )
+  | (?P<spread> \.\.\. )
+  | (?P<variable> \$[_A-Za-z][_0-9A-Za-z]* )
+  | (?P<name> [_A-Za-z][_0-9A-Za-z]* )
+  | (?P<number> -?[0-9]+(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)? )
+  | (?P<punct> [!():=@\[\]{}|&] )
+''', re.VERBOSE)
+
+
+def _tokenize(query: str) -> Optional[List[str]]:
+    tokens = []
+    pos = 0
+    while pos < len(query):
+        m = _token_pattern.match(query, pos)
+        if m is None:
+            return None
+        if m.lastgroup == 'spread':
+            return None  # fragments are not supported
+        if m.lastgroup != 'ignored':
+            tokens.append(m.group())
+        pos = m.end()
+    return tokens
+
+
+def _find_closing(tokens: Sequence[str], start: int) -> int:
+    """
+    Returns the index of the bracket closing the one at *start*.
+    """
+    opening = tokens[start]
+    closing = {'{': '}', '(': ')', '[': ']'}[opening]
+    depth = 0
+    for idx in range(start, len(tokens)):
+        if tokens[idx] == opening:
+            depth += 1
+        elif tokens[idx] == closing:
+            depth -= 1
+            if depth == 0:
+                return idx
+    raise ValueError('unbalanced brackets')
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
+class ParsedQuery:
+    """
+    The tokens of a GraphQL query decomposed for merging.
+    """
+    var_defs: Tuple[str, ...]
+    # The response keys and the tokens of the top-level fields without aliases
+    fields: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def parse_query(query: str) -> Optional[ParsedQuery]:
+    """
+    Decomposes a GraphQL query document with a single query operation,
+    or returns ``None`` if it cannot be merged with others.
+    """
+    tokens = _tokenize(query)
+    if not tokens:
+        return None
+    try:
+        idx = 0
+        var_defs: Tuple[str, ...] = ()
+        if tokens[idx] == 'query':
+            idx += 1
+            if tokens[idx] not in ('(', '{'):
+                idx += 1  # skip the operation name
+            if tokens[idx] == '(':
+                end = _find_closing(tokens, idx)
+                var_defs = tuple(tokens[idx + 1:end])
+                idx = end + 1
+        if tokens[idx] != '{' or _find_closing(tokens, idx) != len(tokens) - 1:
+            return None  # directives, mutations or multiple definitions
+        fields = []
+        idx += 1
+        while tokens[idx] != '}':
+            if tokens[idx + 1] == ':':
+                key = tokens[idx]
+                idx += 2
+            else:
+                key = tokens[idx]
+            if not re.fullmatch(r'[_A-Za-z][_0-9A-Za-z]*', tokens[idx]):
+                return None
+            start = idx
+            idx += 1
+            if tokens[idx] == '(':
+                idx = _find_closing(tokens, idx) + 1
+            if tokens[idx] == '@':
+                return None
+            if tokens[idx] == '{':
+                idx = _find_closing(tokens, idx) + 1
+            fields.append((key, tuple(tokens[start:idx])))
+    except (IndexError, ValueError):
+        return None
+    if not fields:
+        return None
+    return ParsedQuery(var_defs=var_defs, fields=tuple(fields))
+
+
+def _rename_variables(tokens: Sequence[str], prefix: str) -> List[str]:
+    return [
+        f'${prefix}{token[1:]}' if token.startswith('$') else token
+        for token in tokens
+    ]
+
+
+def merge_queries(
+    queries: Sequence[Tuple[ParsedQuery, Mapping[str, Any]]],
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Merges the parsed queries and their variables into a single query document
+    and the variables for it.  The top-level fields and the variables of
+    the *i*-th query are prefixed with ``q<i>_``.
+    """
+    var_defs: List[str] = []
+    selections: List[str] = []
+    variables: Dict[str, Any] = {}
+    for idx, (parsed, query_vars) in enumerate(queries):
+        prefix = f'q{idx}_'
+        var_defs.extend(_rename_variables(parsed.var_defs, prefix))
+        for key, tokens in parsed.fields:
+            selections.append(f"{prefix}{key}: {' '.join(_rename_variables(tokens, prefix))}")
+        variables.update({f'{prefix}{name}': value for name, value in query_vars.items()})
+    header = f"query({' '.join(var_defs)})" if var_defs else 'query'
+    return f"{header} {{ {' '.join(selections)} }}", variables
+
+
+def _split_result(data: Mapping[str, Any], idx: int, parsed: ParsedQuery) -> Dict[str, Any]:
+    prefix = f'q{idx}_'
+    return {key: data.get(f'{prefix}{key}') for key, _ in parsed.fields}
+
+
+async def _execute_merged(
+    queries: Sequence[Tuple[ParsedQuery, Mapping[str, Any]]],
+) -> Tuple[List[Dict[str, Any]], URL]:
+    from .request import Request
+    query, variables = merge_queries(queries)
+    rqst = Request('POST', '/admin/graphql')
+    rqst.set_json({
+        'query': query,
+        'variables': variables,
+    })
+    async with rqst.fetch(batch=False) as resp:
+        data = await resp.json()
+        url = resp.raw_response.url
+    return [_split_result(data, idx, parsed) for idx, (parsed, _) in enumerate(queries)], url
+
+
+@attr.s(auto_attribs=True, slots=True)
+class GraphQLBatchStats:
+    queries: int = 0     # the number of queries submitted for batching
+    batches: int = 0     # the number of merged requests sent
+    merged: int = 0      # the number of queries sent as a part of merged requests
+    fallbacks: int = 0   # the number of merged requests retried individually
+
+
+class GraphQLBatcher:
+    """
+    Merges the GraphQL queries submitted in the same event loop tick.
+
+    :param max_size: The maximum number of queries merged into a single request.
+    """
+
+    __slots__ = ('_max_size', '_pending', '_flush_handle', 'stats')
+
+    _pending: List[Tuple[ParsedQuery, Mapping[str, Any], asyncio.Future]]
+    _flush_handle: Optional[asyncio.Handle]
+
+    def __init__(self, max_size: int = 20) -> None:
+        self._max_size = max_size
+        self._pending = []
+        self._flush_handle = None
+        self.stats = GraphQLBatchStats()
+
+    async def submit(
+        self,
+        parsed: ParsedQuery,
+        variables: Mapping[str, Any],
+    ) -> Optional[ResponseSnapshot]:
+        """
+        Returns the response snapshot of the query sent as a part of a merged
+        request, or ``None`` if the caller should send the query by itself.
+        """
+        loop = current_loop()
+        fut: asyncio.Future[Optional[ResponseSnapshot]] = loop.create_future()
+        self._pending.append((parsed, variables, fut))
+        self.stats.queries += 1
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if len(pending) == 1:
+            pending[0][2].set_result(None)
+            return
+        # Detach the merged request from the per-call deadline of the first caller.
+        from .deadline import api_deadline
+        ctx = copy_context()
+        ctx.run(api_deadline.set, None)
+        ctx.run(asyncio.ensure_future, self._dispatch(pending))
+
+    async def _dispatch(
+        self,
+        pending: Sequence[Tuple[ParsedQuery, Mapping[str, Any], asyncio.Future]],
+    ) -> None:
+        self.stats.batches += 1
+        self.stats.merged += len(pending)
+        try:
+            results, url = await _execute_merged([(parsed, vars) for parsed, vars, _ in pending])
+        except BackendAPIError:
+            # Let each caller send its query to get its own result or error.
+            self.stats.fallbacks += 1
+            for _, _, fut in pending:
+                if not fut.done():
+                    fut.set_result(None)
+        except Exception as e:
+            for _, _, fut in pending:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            for result, (_, _, fut) in zip(results, pending):
+                if not fut.done():
+                    fut.set_result(_make_snapshot(result, url))
+
+
+def _make_snapshot(result: Mapping[str, Any], url: URL) -> ResponseSnapshot:
+    body = json.dumps(result).encode('utf8')
+    headers = CIMultiDict({
+        'Content-Type': 'application/json',
+        'Content-Length': str(len(body)),
+    })
+    return ResponseSnapshot(
+        status=200,
+        reason='OK',
+        headers=CIMultiDictProxy(headers),
+        body=body,
+        url=url,
+        method='POST',
+    )
+
+
+class BatchedQuery:
+    """
+    The placeholder of the result of a query added to :class:`GraphQLBatch`.
+    """
+
+    __slots__ = ('query', 'variables', '_done', '_result', '_exception')
+
+    def __init__(self, query: str, variables: Mapping[str, Any]) -> None:
+        self.query = query
+        self.variables = variables
+        self._done = False
+        self._result: Any = None
+        self._exception: Optional[BaseException] = None
+
+    def done(self) -> bool:
+        return self._done
+
+    def result(self) -> Any:
+        """
+        Returns the object parsed from the response like :meth:`Admin.query()
+        <ai.backend.client.func.admin.Admin.query>`, or raises the error of the query.
+        """
+        if not self._done:
+            raise RuntimeError('The batch is not dispatched yet.')
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def _set_result(self, result: Any) -> None:
+        self._result = result
+        self._done = True
+
+    def _set_exception(self, exc: BaseException) -> None:
+        self._exception = exc
+        self._done = True
+
+
+class GraphQLBatch:
+    """
+    Collects GraphQL queries to send them in a single request when the context exits.
+    Use it with ``with`` in synchronous sessions and ``async with`` in asynchronous ones.
+    """
+
+    __slots__ = ('_session', '_queries')
+
+    _queries: List[BatchedQuery]
+
+    def __init__(self, session: BaseSession) -> None:
+        self._session = session
+        self._queries = []
+
+    def query(self, query: str, variables: Mapping[str, Any] = None) -> BatchedQuery:
+        """
+        Adds a GraphQL query to the batch and returns the placeholder of its result.
+        """
+        batched = BatchedQuery(query, variables if variables else {})
+        self._queries.append(batched)
+        return batched
+
+    async def dispatch(self) -> None:
+        """
+        Sends the queries added so far.
+        """
+        queries, self._queries = self._queries, []
+        mergeable: List[Tuple[BatchedQuery, ParsedQuery]] = []
+        individual: List[BatchedQuery] = []
+        for batched in queries:
+            parsed = parse_query(batched.query)
+            if parsed is None:
+                individual.append(batched)
+            else:
+                mergeable.append((batched, parsed))
+        if len(mergeable) < 2:
+            individual.extend(batched for batched, _ in mergeable)
+        else:
+            try:
+                results, _ = await _execute_merged(
+                    [(parsed, batched.variables) for batched, parsed in mergeable])
+            except BackendAPIError:
+                individual.extend(batched for batched, _ in mergeable)
+            except Exception as e:
+                for batched, _ in mergeable:
+                    batched._set_exception(e)
+            else:
+                for result, (batched, _) in zip(results, mergeable):
+                    batched._set_result(result)
+        await asyncio.gather(*[self._send(batched) for batched in individual])
+
+    @staticmethod
+    async def _send(batched: BatchedQuery) -> None:
+        from .request import Request
+        rqst = Request('POST', '/admin/graphql')
+        rqst.set_json({
+            'query': batched.query,
+            'variables': batched.variables,
+        })
+        try:
+            async with rqst.fetch(batch=False) as resp:
+                batched._set_result(await resp.json())
+        except Exception as e:
+            batched._set_exception(e)
+
+    def __enter__(self) -> GraphQLBatch:
+        from .session import AsyncSession
+        if isinstance(self._session, AsyncSession):
+            raise RuntimeError("Use 'async with' for the batches of asynchronous sessions.")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if exc_info[0] is None:
+            self._session.worker_thread.execute(self.dispatch())  # type: ignore
+
+    async def __aenter__(self) -> GraphQLBatch:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if exc_info[0] is None:
+            await self.dispatch()
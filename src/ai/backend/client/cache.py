@@ -0,0 +1,285 @@
+"""
+Provides the response cache for read-mostly API functions.
+
+API functions opt in to caching by passing a :class:`CachePolicy` to
+:meth:`Request.fetch() <ai.backend.client.request.Request.fetch>`, and the
+cache itself is enabled per session via :attr:`APIConfig.response_cache
+<ai.backend.client.config.APIConfig.response_cache>`.
+
+Cached responses are kept in memory with LRU eviction.  If
+:attr:`APIConfig.response_cache_dir
+<ai.backend.client.config.APIConfig.response_cache_dir>` is set, they are
+also written to the directory so that later processes (e.g., subsequent CLI
+invocations) can reuse them.  Expired responses carrying ``ETag`` or
+``Last-Modified`` headers are revalidated with conditional requests instead of
+being fetched again.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import (
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Mapping,
+    Optional,
+)
+
+import attr
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .snapshot import ResponseSnapshot
+
+__all__ = (
+    'CachePolicy',
+    'CacheStats',
+    'ResponseCache',
+    'invalidate_cached_responses',
+)
+
+log = logging.getLogger('ai.backend.client.cache')
+
+
+def _convert_tags(tags: Iterable[str]) -> FrozenSet[str]:
+    return frozenset(tags)
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
+class CachePolicy:
+    """
+    Declares that the response of an API function may be cached.
+
+    :param name: The name of the API function (e.g., ``"Image.list"``) used to
+        override its TTL via :attr:`APIConfig.response_cache_ttls
+        <ai.backend.client.config.APIConfig.response_cache_ttls>`.
+    :param ttl: The default number of seconds to keep the response fresh.
+    :param tags: The tags to invalidate the cached response after mutations.
+    """
+    name: str
+    ttl: float
+    tags: FrozenSet[str] = attr.ib(default=frozenset(), converter=_convert_tags)
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CacheStats:
+    hits: int = 0            # served from fresh cached responses
+    misses: int = 0          # fetched from the server and stored
+    revalidations: int = 0   # served from expired responses confirmed by the server (304)
+    evictions: int = 0       # dropped to keep the maximum number of entries
+    invalidations: int = 0   # dropped by explicit invalidation
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CacheEntry:
+    snapshot: ResponseSnapshot
+    expires_at: float
+    tags: FrozenSet[str]
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.snapshot.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.snapshot.headers.get('Last-Modified')
+
+
+def _serialize_entry(entry: CacheEntry) -> bytes:
+    snapshot = entry.snapshot
+    meta = {
+        'status': snapshot.status,
+        'reason': snapshot.reason,
+        'headers': [*snapshot.headers.items()],
+        'url': str(snapshot.url),
+        'method': snapshot.method,
+        'expires_at': entry.expires_at,
+        'tags': sorted(entry.tags),
+    }
+    return json.dumps(meta).encode('utf-8') + b'\n' + snapshot.body
+
+
+def _deserialize_entry(data: bytes) -> CacheEntry:
+    raw_meta, _, body = data.partition(b'\n')
+    meta = json.loads(raw_meta)
+    snapshot = ResponseSnapshot(
+        status=meta['status'],
+        reason=meta['reason'],
+        headers=CIMultiDictProxy(CIMultiDict(meta['headers'])),
+        body=body,
+        url=URL(meta['url']),
+        method=meta['method'],
+    )
+    return CacheEntry(snapshot, meta['expires_at'], frozenset(meta['tags']))
+
+
+class ResponseCache:
+    """
+    An LRU cache of response snapshots with optional on-disk backing.
+    """
+
+    __slots__ = ('_entries', '_max_entries', '_ttls', '_cache_dir', 'stats')
+
+    _entries: OrderedDict[str, CacheEntry]
+
+    def __init__(
+        self, *,
+        max_entries: int = 256,
+        ttls: Mapping[str, float] = None,
+        cache_dir: Path = None,
+    ) -> None:
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._ttls = ttls if ttls is not None else {}
+        self._cache_dir = cache_dir
+        if cache_dir is not None:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _digest(key: Hashable) -> str:
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_ttl(self, policy: CachePolicy) -> float:
+        return self._ttls.get(policy.name, policy.ttl)
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Returns the cached entry for the given request key, either fresh or expired.
+        Only fresh entries are counted as hits.
+        """
+        digest = self._digest(key)
+        entry = self._entries.get(digest)
+        if entry is not None:
+            self._entries.move_to_end(digest)
+        elif self._cache_dir is not None:
+            entry = self._load(digest)
+            if entry is not None:
+                self._put(digest, entry)
+        if entry is not None and entry.fresh:
+            self.stats.hits += 1
+        return entry
+
+    def store(self, key: Hashable, snapshot: ResponseSnapshot, policy: CachePolicy) -> None:
+        """
+        Stores the given successful response for the given request key.
+        """
+        self.stats.misses += 1
+        if snapshot.status // 100 != 2:
+            return
+        if 'no-store' in snapshot.headers.get('Cache-Control', ''):
+            return
+        entry = CacheEntry(snapshot, time.time() + self.get_ttl(policy), policy.tags)
+        digest = self._digest(key)
+        self._put(digest, entry)
+        self._save(digest, entry)
+
+    def refresh(self, key: Hashable, entry: CacheEntry, policy: CachePolicy) -> None:
+        """
+        Extends the lifetime of an expired entry after the server has confirmed
+        that it is still valid.
+        """
+        self.stats.revalidations += 1
+        entry.expires_at = time.time() + self.get_ttl(policy)
+        self._save(self._digest(key), entry)
+
+    def invalidate(self, *tags: str) -> int:
+        """
+        Drops all cached entries having any of the given tags.
+        Returns the number of dropped entries.
+        """
+        target_tags = frozenset(tags)
+        dropped = 0
+        for digest, entry in [*self._entries.items()]:
+            if entry.tags & target_tags:
+                del self._entries[digest]
+                self._remove(digest)
+                dropped += 1
+        if self._cache_dir is not None:
+            for path in self._cache_dir.iterdir():
+                if path.name.startswith('.') or path.name in self._entries:
+                    continue
+                stored_entry = self._load(path.name)
+                if stored_entry is not None and stored_entry.tags & target_tags:
+                    self._remove(path.name)
+                    dropped += 1
+        self.stats.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        """
+        Drops all cached entries including those stored on the disk.
+        """
+        self.stats.invalidations += len(self._entries)
+        for digest in [*self._entries.keys()]:
+            self._remove(digest)
+        self._entries.clear()
+        if self._cache_dir is not None:
+            for path in self._cache_dir.iterdir():
+                self._remove(path.name)
+
+    def _put(self, digest: str, entry: CacheEntry) -> None:
+        self._entries[digest] = entry
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self._max_entries:
+            evicted_digest, _ = self._entries.popitem(last=False)
+            self._remove(evicted_digest)
+            self.stats.evictions += 1
+
+    def _load(self, digest: str) -> Optional[CacheEntry]:
+        assert self._cache_dir is not None
+        try:
+            return _deserialize_entry((self._cache_dir / digest).read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            log.warning('ResponseCache: ignoring a corrupted cache file: %s', digest)
+            self._remove(digest)
+            return None
+
+    def _save(self, digest: str, entry: CacheEntry) -> None:
+        if self._cache_dir is None:
+            return
+        path = self._cache_dir / digest
+        tmp_path = path.with_name(f'.{digest}.tmp')
+        try:
+            fd = os.open(str(tmp_path), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, 'wb') as f:
+                f.write(_serialize_entry(entry))
+            os.replace(str(tmp_path), str(path))
+        except OSError:
+            log.warning('ResponseCache: failed to write a cache file: %s', digest)
+
+    def _remove(self, digest: str) -> None:
+        if self._cache_dir is None:
+            return
+        try:
+            (self._cache_dir / digest).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def invalidate_cached_responses(*tags: str) -> None:
+    """
+    Drops the cached responses having any of the given tags from the response
+    cache of the current API session, if enabled.  API functions call this
+    after mutating the resources of which responses may have been cached.
+    """
+    from .session import api_session
+    response_cache = api_session.get().response_cache
+    if response_cache is not None:
+        response_cache.invalidate(*tags)
@@ -0,0 +1,182 @@
+"""
+Provides per-endpoint circuit breakers for the request layer.
+
+A circuit breaker counts the consecutive failures (connection errors and
+502/503/504 responses) of an endpoint.  Once the count reaches the threshold,
+the breaker opens and the requests skip the endpoint immediately without
+paying the connection timeout.  After the recovery timeout, the breaker
+becomes half-open and lets a single trial request through: it closes again
+if the trial succeeds and re-opens otherwise.
+"""
+
+from __future__ import annotations
+
+import enum
+import logging
+import time
+from typing import (
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+import attr
+from yarl import URL
+
+__all__ = (
+    'CircuitState',
+    'CircuitBreakerStats',
+    'CircuitBreaker',
+    'CircuitBreakerRegistry',
+)
+
+log = logging.getLogger('ai.backend.client.circuit')
+
+
+class CircuitState(enum.Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+
+StateChangeHandler = Callable[[URL, CircuitState, CircuitState], None]
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CircuitBreakerStats:
+    state: CircuitState = CircuitState.CLOSED
+    consecutive_failures: int = 0
+    successes: int = 0
+    failures: int = 0
+    rejected: int = 0    # requests skipped while open
+    opened: int = 0      # the number of transitions to the open state
+
+
+class CircuitBreaker:
+    """
+    The circuit breaker of a single endpoint.
+
+    :param endpoint: The endpoint guarded by this breaker.
+    :param failure_threshold: The number of consecutive failures to open the circuit.
+    :param recovery_timeout: The number of seconds to keep the circuit open
+        before allowing a trial request.
+    :param on_state_change: The callback invoked with the endpoint and the old and new
+        states whenever the state changes.
+    """
+
+    __slots__ = (
+        'endpoint', '_failure_threshold', '_recovery_timeout', '_on_state_change',
+        '_stats', '_opened_at', '_trial_started_at',
+    )
+
+    def __init__(
+        self,
+        endpoint: URL, *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        on_state_change: StateChangeHandler = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._on_state_change = on_state_change
+        self._stats = CircuitBreakerStats()
+        self._opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> CircuitState:
+        return self._stats.state
+
+    @property
+    def stats(self) -> CircuitBreakerStats:
+        return attr.evolve(self._stats)
+
+    def _transition(self, new_state: CircuitState) -> None:
+        old_state = self._stats.state
+        if old_state == new_state:
+            return
+        self._stats.state = new_state
+        if new_state == CircuitState.OPEN:
+            self._stats.opened += 1
+            self._opened_at = time.monotonic()
+        log.info('circuit breaker of %s: %s -> %s', self.endpoint, old_state.value, new_state.value)
+        if self._on_state_change is not None:
+            self._on_state_change(self.endpoint, old_state, new_state)
+
+    def allow_request(self) -> bool:
+        """
+        Checks if a request may be sent to the endpoint now.
+        """
+        now = time.monotonic()
+        if self._stats.state == CircuitState.OPEN:
+            if now - self._opened_at < self._recovery_timeout:
+                self._stats.rejected += 1
+                return False
+            self._transition(CircuitState.HALF_OPEN)
+            self._trial_started_at = None
+        if self._stats.state == CircuitState.HALF_OPEN:
+            # Allow only one trial request at a time.  If its result is never
+            # recorded (e.g., cancelled), allow another after the recovery timeout.
+            if (
+                self._trial_started_at is not None
+                and now - self._trial_started_at < self._recovery_timeout
+            ):
+                self._stats.rejected += 1
+                return False
+            self._trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        self._stats.successes += 1
+        self._stats.consecutive_failures = 0
+        self._trial_started_at = None
+        self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._stats.failures += 1
+        self._stats.consecutive_failures += 1
+        self._trial_started_at = None
+        if (
+            self._stats.state == CircuitState.HALF_OPEN
+            or self._stats.consecutive_failures >= self._failure_threshold
+        ):
+            if self._stats.state == CircuitState.OPEN:
+                self._opened_at = time.monotonic()
+            self._transition(CircuitState.OPEN)
+
+
+class CircuitBreakerRegistry:
+    """
+    Keeps the circuit breakers of all endpoints used by a session.
+    """
+
+    __slots__ = ('_breakers', )
+
+    _breakers: Dict[URL, CircuitBreaker]
+
+    def __init__(
+        self,
+        endpoints: Sequence[URL], *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        on_state_change: StateChangeHandler = None,
+    ) -> None:
+        self._breakers = {
+            endpoint: CircuitBreaker(
+                endpoint,
+                failure_threshold=failure_threshold,
+                recovery_timeout=recovery_timeout,
+                on_state_change=on_state_change,
+            )
+            for endpoint in endpoints
+        }
+
+    def __getitem__(self, endpoint: URL) -> CircuitBreaker:
+        return self._breakers[endpoint]
+
+    @property
+    def stats(self) -> Mapping[URL, CircuitBreakerStats]:
+        return {endpoint: breaker.stats for endpoint, breaker in self._breakers.items()}
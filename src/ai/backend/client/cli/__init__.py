@@ -4,11 +4,11 @@ import click
 
 from .. import __version__
 from ..config import APIConfig, set_config
-from ai.backend.cli.extensions import ExtendedCommandGroup
+from .lazy import LazyCommandGroup
 
 
 @click.group(
-    cls=ExtendedCommandGroup,
+    cls=LazyCommandGroup,
     context_settings={
         'help_option_names': ['-h', '--help'],
     },
@@ -32,12 +32,36 @@ def main(skip_sslcert_validation):
     warnings.showwarning = show_warning
 
 
-def _attach_command():
-    from . import admin, config, app, files, logs, manager, proxy, ps, run  # noqa
-    from . import vfolder       # noqa
-    from . import session_template  # noqa
-    from . import dotfile  # noqa
-    from . import server_log  # noqa
-
-
-_attach_command()
+# The modules defining the commands are imported only when the commands are invoked.
+# Keep the short help texts in sync with the docstrings of the commands.
+main.add_lazy_commands({  # type: ignore
+    'admin': ('.admin', 'Provides the admin API access.', ()),
+    'config': ('.config', 'Shows the current configuration.', ()),
+    'login': ('.config', 'Log-in to the console API proxy.', ()),
+    'logout': ('.config', 'Log-out from the console API proxy and clears the local cookie data.', ()),
+    'update-password': ('.config', "Update user's password.", ()),
+    'app': ('.app', 'Run a local proxy to a service provided by Backend.AI compute sessions.', ()),
+    'apps': ('.app', 'List available additional arguments and environment variables '
+                     'when starting service.', ()),
+    'upload': ('.files', "Upload files to user's home folder.", ()),
+    'download': ('.files', 'Download files from a running container.', ()),
+    'ls': ('.files', 'List files in a path of a running container.', ()),
+    'logs': ('.logs', 'Shows the output logs of a running container.', ()),
+    'task-logs': ('.logs', 'Shows the output logs of a batch task.', ()),
+    'manager': ('.manager', 'Provides manager-related operations.', ()),
+    'announcement': ('.manager', 'Global announcement related commands', ()),
+    'proxy': ('.proxy', 'Run a non-encrypted non-authorized API proxy server.', ()),
+    'ps': ('.ps', 'Lists the current running compute sessions for the current keypair.', ()),
+    'run': ('.run', 'Run the given code snippet or files in a session.', ()),
+    'start': ('.run', 'Prepare and start a single compute session without executing codes.', ()),
+    'start-template': ('.run', 'Prepare and start a single compute session '
+                               'without executing codes.', ()),
+    'terminate': ('.run', 'Terminate the given session.', ('rm', 'kill')),
+    'restart': ('.run', 'Restart the given session.', ()),
+    'info': ('.run', 'Show detailed information for a running compute session.', ()),
+    'events': ('.run', 'Monitor the lifecycle events of a compute session.', ()),
+    'vfolder': ('.vfolder', 'Provides virtual folder operations.', ()),
+    'session-template': ('.session_template', 'Provides task template operations', ('sesstpl', )),
+    'dotfile': ('.dotfile', 'Provides dotfile operations.', ()),
+    'server-logs': ('.server_log', 'Provides operations related to server logs.', ()),
+}, package=__name__)
@@ -8,12 +8,35 @@ def admin():
     '''
 
 
-def _attach_command():
-    from . import (  # noqa
-        agents, domains, etcd, groups, images, keypairs, resources, resource_policies,
-        scaling_groups, sessions, users, vfolders,
-        license,
-    )
-
-
-_attach_command()
+admin.add_lazy_commands({  # type: ignore
+    'agent': ('.agents', 'Show the information about the given agent.', ()),
+    'agents': ('.agents', 'List and manage agents.', ()),
+    'watcher': ('.agents', 'Provides agent watcher operations.', ()),
+    'domain': ('.domains', 'Show the information about the given domain.', ()),
+    'domains': ('.domains', 'List and manage domains.', ()),
+    'etcd': ('.etcd', 'List and manage ETCD configurations.', ()),
+    'group': ('.groups', 'Show the information about the given group.', ()),
+    'groups': ('.groups', 'List and manage groups.', ()),
+    'images': ('.images', 'Show the list of registered images in this cluster.', ()),
+    'rescan-images': ('.images', 'Update the kernel image metadata '
+                                 'from all configured docker registries.', ()),
+    'alias-image': ('.images', 'Add an image alias.', ()),
+    'dealias-image': ('.images', 'Remove an image alias.', ()),
+    'keypair': ('.keypairs', 'Show the server-side information '
+                             'of the currently configured access key.', ()),
+    'keypairs': ('.keypairs', 'List and manage keypairs.', ()),
+    'resources': ('.resources', 'Manage resources.', ()),
+    'keypair-resource-policy': ('.resource_policies',
+                                'Show details about a keypair resource policy.', ()),
+    'keypair-resource-policies': ('.resource_policies',
+                                  'List and manage keypair resource policies.', ()),
+    'list-scaling-groups': ('.scaling_groups', '', ()),
+    'scaling-group': ('.scaling_groups', 'Show the information about the given scaling group.', ()),
+    'scaling-groups': ('.scaling_groups', 'List and manage scaling groups.', ()),
+    'sessions': ('.sessions', 'List and manage compute sessions.', ()),
+    'session': ('.sessions', 'Show detailed information for a running compute session.', ()),
+    'user': ('.users', 'Show the information about the given user by email.', ()),
+    'users': ('.users', 'List and manage users.', ()),
+    'vfolders': ('.vfolders', 'List and manage virtual folders.', ()),
+    'show-license': ('.license', 'Show the license information (enterprise editions only).', ()),
+}, package=__name__)
@@ -5,12 +5,16 @@ from tabulate import tabulate
 
 from . import admin
 from ...session import Session, is_legacy_server
-from ..pretty import print_error
+from ..pretty import print_done, print_error
 from ..pagination import (
     get_preferred_page_size,
     echo_via_pager,
+    export_items,
+    export_options,
+    select_fields,
     tabulate_items,
 )
+from ...pagination import MAX_PAGE_SIZE
 from ...exceptions import NoItems
 
 
@@ -55,7 +59,8 @@ def agent(agent_id):
               help='Filter agents by the given status.')
 @click.option('--scaling-group', '--sgroup', type=str, default=None,
               help='Filter agents by the scaling group.')
-def agents(status, scaling_group):
+@export_options
+def agents(status, scaling_group, export_path, export_format, export_fields, export_compression):
     '''
     List and manage agents.
     (super-admin privilege required)
@@ -81,6 +86,22 @@ def agents(status, scaling_group):
             del fields[9]
             del fields[6]
         with Session() as session:
+            if export_path is not None:
+                fields = select_fields(fields, export_fields)
+                try:
+                    items = session.Agent.paginated_list(
+                        status,
+                        scaling_group,
+                        fields=[f[1] for f in fields],
+                        page_size=MAX_PAGE_SIZE,
+                        prefetch=1,
+                    )
+                    count = export_items(items, fields, export_path,
+                                         format=export_format, compression=export_compression)
+                except NoItems:
+                    count = 0
+                print_done(f'Exported {count} agents to {export_path}.')
+                return
             page_size = get_preferred_page_size()
             try:
                 items = session.Agent.paginated_list(
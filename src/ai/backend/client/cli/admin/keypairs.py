@@ -9,8 +9,12 @@ from ..pretty import print_done, print_error, print_fail
 from ..pagination import (
     get_preferred_page_size,
     echo_via_pager,
+    export_items,
+    export_options,
+    select_fields,
     tabulate_items,
 )
+from ...pagination import MAX_PAGE_SIZE
 from ...exceptions import NoItems
 
 
@@ -56,7 +60,8 @@ def keypair():
               help='Show keypairs of this given user. [default: show all]')
 @click.option('--is-active', type=bool, default=None,
               help='Filter keypairs by activation.')
-def keypairs(ctx, user_id, is_active):
+@export_options
+def keypairs(ctx, user_id, is_active, export_path, export_format, export_fields, export_compression):
     '''
     List and manage keypairs.
     To show all keypairs or other user's, your access key must have the admin
@@ -90,6 +95,21 @@ def keypairs(ctx, user_id, is_active):
 
     try:
         with Session() as session:
+            if export_path is not None:
+                fields = select_fields(fields, export_fields)
+                try:
+                    items = session.KeyPair.paginated_list(
+                        is_active,
+                        fields=[f[1] for f in fields],
+                        page_size=MAX_PAGE_SIZE,
+                        prefetch=1,
+                    )
+                    count = export_items(items, fields, export_path,
+                                         format=export_format, compression=export_compression)
+                except NoItems:
+                    count = 0
+                print_done(f'Exported {count} keypairs to {export_path}.')
+                return
             page_size = get_preferred_page_size()
             try:
                 items = session.KeyPair.paginated_list(
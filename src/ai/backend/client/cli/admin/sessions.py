@@ -17,12 +17,16 @@ import click
 from . import admin
 from ...session import Session
 from ...versioning import get_naming, apply_version_aware_fields
-from ..pretty import print_error, print_fail
+from ..pretty import print_done, print_error, print_fail
 from ..pagination import (
     get_preferred_page_size,
     echo_via_pager,
+    export_items,
+    export_options,
+    select_fields,
     tabulate_items,
 )
+from ...pagination import MAX_PAGE_SIZE
 from ...exceptions import NoItems
 
 
@@ -84,7 +88,9 @@ def transform_legacy_mem_fields(item: SessionItem) -> SessionItem:
 @click.option('-f', '--format', default=None,  help='Display only specified fields.')
 @click.option('--plain', is_flag=True,
               help='Display the session list without decorative line drawings and the header.')
-def sessions(status, access_key, name_only, dead, running, detail, plain, format):
+@export_options
+def sessions(status, access_key, name_only, dead, running, detail, plain, format,
+             export_path, export_format, export_fields, export_compression):
     '''
     List and manage compute sessions.
     '''
@@ -153,6 +159,21 @@ def sessions(status, access_key, name_only, dead, running, detail, plain, format
     try:
         with Session() as session:
             fields = apply_version_aware_fields(session, fields)
+            if export_path is not None:
+                fields = select_fields(fields, export_fields)
+                try:
+                    items = session.ComputeSession.paginated_list(
+                        status, access_key,
+                        fields=[f[1] for f in fields],
+                        page_size=MAX_PAGE_SIZE,
+                        prefetch=1,
+                    )
+                    count = export_items(items, fields, export_path,
+                                         format=export_format, compression=export_compression)
+                except NoItems:
+                    count = 0
+                print_done(f'Exported {count} sessions to {export_path}.')
+                return
             # let the page size be same to the terminal height.
             page_size = get_preferred_page_size()
             try:
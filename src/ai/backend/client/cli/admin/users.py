@@ -6,12 +6,16 @@ from tabulate import tabulate
 from . import admin
 from ...session import Session
 from ..interaction import ask_yn
-from ..pretty import print_error, print_info, print_fail
+from ..pretty import print_done, print_error, print_info, print_fail
 from ..pagination import (
     get_preferred_page_size,
     echo_via_pager,
+    export_items,
+    export_options,
+    select_fields,
     tabulate_items,
 )
+from ...pagination import MAX_PAGE_SIZE
 from ...exceptions import NoItems
 
 
@@ -61,7 +65,8 @@ def user(email):
               help='Filter users in a specific state (active, inactive, deleted, before-verification).')
 @click.option('-g', '--group', type=str, default=None,
               help='Filter by group ID.')
-def users(ctx, status, group) -> None:
+@export_options
+def users(ctx, status, group, export_path, export_format, export_fields, export_compression) -> None:
     '''
     List and manage users.
     (admin privilege required)
@@ -88,6 +93,21 @@ def users(ctx, status, group) -> None:
 
     try:
         with Session() as session:
+            if export_path is not None:
+                fields = select_fields(fields, export_fields)
+                try:
+                    items = session.User.paginated_list(
+                        status, group,
+                        fields=[f[1] for f in fields],
+                        page_size=MAX_PAGE_SIZE,
+                        prefetch=1,
+                    )
+                    count = export_items(items, fields, export_path,
+                                         format=export_format, compression=export_compression)
+                except NoItems:
+                    count = 0
+                print_done(f'Exported {count} users to {export_path}.')
+                return
             page_size = get_preferred_page_size()
             try:
                 items = session.User.paginated_list(
@@ -0,0 +1,112 @@
+"""
+Provides the command groups which import the modules of their subcommands
+only when the subcommands are invoked.
+
+Importing every command module at startup pulls in the file-transfer,
+proxy and session stacks even for simple commands such as ``backend.ai ps``.
+Instead, a group is given an index of its subcommands with the modules
+defining them and their short help texts, so that the help messages and
+the shell completion work without importing the modules.
+"""
+
+import importlib
+import importlib.util
+from typing import (
+    Dict,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+import click
+
+from ai.backend.cli.extensions import ExtendedCommandGroup
+
+__all__ = (
+    'CommandIndex',
+    'LazyCommand',
+    'LazyCommandGroup',
+)
+
+# command name -> (module name, short help, aliases)
+CommandIndex = Mapping[str, Tuple[str, str, Sequence[str]]]
+
+
+class LazyCommand(click.Command):
+    """
+    A placeholder of a subcommand which imports the module defining
+    the subcommand when it is invoked.  The module replaces the placeholder
+    in the group by registering the actual command with the same name.
+    """
+
+    def __init__(
+        self,
+        group: click.Group,
+        name: str,
+        module: str,
+        help: str,
+        aliases: Sequence[str] = (),
+    ) -> None:
+        super().__init__(name, help=help)
+        self.group = group
+        self.module = module
+        self.aliases = tuple(aliases)
+
+    def resolve(self) -> click.Command:
+        """
+        Imports the module of the command and returns the actual command.
+        """
+        importlib.import_module(self.module)
+        command = self.group.commands.get(self.name)
+        if command is None or isinstance(command, LazyCommand):
+            raise RuntimeError(
+                f'The module {self.module} does not define the command {self.name!r}.')
+        return command
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # The context and the invocation belong to the actual command from here.
+        return self.resolve().make_context(info_name, args, parent=parent, **extra)
+
+    def main(self, *args, **kwargs):
+        return self.resolve().main(*args, **kwargs)
+
+
+class LazyCommandGroup(ExtendedCommandGroup):
+    """
+    A command group which accepts the subcommands to be imported on demand,
+    in addition to the subcommands registered as usual.
+    """
+
+    lazy_commands: Dict[str, LazyCommand]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = {}
+
+    def add_lazy_commands(self, index: CommandIndex, package: str = None) -> None:
+        """
+        Registers the placeholders of the subcommands in the given index.
+
+        :param index: The mapping of the subcommand names to the tuples of
+            the modules defining them, their short help texts, and their aliases.
+        :param package: The package to resolve the relative module names.
+        """
+        for name, (module, short_help, aliases) in index.items():
+            if package is not None:
+                module = importlib.util.resolve_name(module, package)
+            command = LazyCommand(self, name, module, short_help, aliases)
+            self.lazy_commands[name] = command
+            self.commands.setdefault(name, command)
+            if aliases:
+                self._commands[name] = list(aliases)
+                for alias in aliases:
+                    self._aliases[alias] = name
+
+    def load_all_commands(self) -> None:
+        """
+        Imports the modules of all subcommands including the nested ones.
+        """
+        for name, command in self.lazy_commands.items():
+            resolved = command.resolve() if self.commands[name] is command else self.commands[name]
+            if isinstance(resolved, LazyCommandGroup):
+                resolved.load_all_commands()
@@ -3,17 +3,23 @@ import sys
 from typing import (
     Any,
     Callable,
+    Iterable,
     Iterator,
     List,
+    Mapping,
     MutableMapping,
+    Optional,
     Sequence,
     Tuple,
+    TypeVar,
 )
 from typing_extensions import Literal
 
 import click
 from tabulate import tabulate
 
+from .. import records
+from ..export import ExportCompression, ExportFormat, open_record_writer
 from ..pagination import MAX_PAGE_SIZE
 
 
@@ -109,3 +115,71 @@ def echo_via_pager(
                     break
                 click.echo('\r', nl=False)
             line_count = 0
+
+
+_Func = TypeVar('_Func', bound=Callable[..., Any])
+
+
+def export_options(func: _Func) -> _Func:
+    """
+    Adds the options to export the listing as a file instead of displaying it.
+    """
+    func = click.option('--export-compression', type=click.Choice(['gzip', 'zstd']), default=None,
+                        help='Compress the exported file. '
+                             '[default: guessed from the file name (.gz or .zst)]')(func)
+    func = click.option('--export-fields', type=str, default=None, metavar='KEYS',
+                        help='Export only the given comma-separated fields, '
+                             'such as "email,status".')(func)
+    func = click.option('--export-format', type=click.Choice(['ndjson', 'csv', 'parquet']),
+                        default=None,
+                        help='The format of the exported file. '
+                             '[default: guessed from the file name, or ndjson]')(func)
+    func = click.option('--export', 'export_path', type=click.Path(dir_okay=False, writable=True),
+                        default=None, metavar='FILE',
+                        help='Write all items to the given file without the pager.')(func)
+    return func
+
+
+def get_field_key(field: Tuple[str, str]) -> str:
+    """
+    Returns the key of the item value of the given pair of the column name
+    and the GraphQL field, such as ``groups`` of ``groups { id name }``.
+    """
+    return records.get_field_key(field[1])
+
+
+def select_fields(
+    fields: Sequence[Tuple[str, str]],
+    keys: Optional[str],
+) -> List[Tuple[str, str]]:
+    """
+    Projects the fields to the comma-separated keys in the given order.
+    """
+    if keys is None:
+        return list(fields)
+    field_map = {get_field_key(field): field for field in fields}
+    selected = []
+    for key in keys.split(','):
+        key = key.strip()
+        if key not in field_map:
+            raise ValueError(f'There is no such field: {key} '
+                             f'(available fields: {", ".join(field_map)})')
+        selected.append(field_map[key])
+    return selected
+
+
+def export_items(
+    items: Iterable[Mapping[str, Any]],
+    fields: Sequence[Tuple[str, str]],
+    path: str,
+    *,
+    format: ExportFormat = None,
+    compression: ExportCompression = None,
+) -> int:
+    """
+    Writes the items to the given file as they are fetched and returns the number of
+    the written items.  The columns are named after the keys of the fields.
+    """
+    keys = [get_field_key(field) for field in fields]
+    with open_record_writer(path, keys, format=format, compression=compression) as writer:
+        return writer.write_all(items)
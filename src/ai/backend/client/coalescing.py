@@ -0,0 +1,81 @@
+"""
+Provides single-flight coalescing of identical read-only requests.
+
+When enabled via :attr:`APIConfig.coalesce_requests
+<ai.backend.client.config.APIConfig.coalesce_requests>`, identical read-only
+requests made concurrently in the same session share a single upstream
+request.  The response body is buffered once and each waiter gets its own
+response object to decode it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+)
+
+import attr
+
+from .snapshot import ResponseSnapshot
+
+__all__ = (
+    'CoalescingStats',
+    'RequestCoalescer',
+)
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CoalescingStats:
+    issued: int = 0      # the number of requests actually sent to the server
+    coalesced: int = 0   # the number of requests served by another in-flight request
+
+
+class RequestCoalescer:
+    """
+    Keeps track of the in-flight read-only requests of a session.
+    """
+
+    __slots__ = ('_inflight', 'stats')
+
+    _inflight: Dict[Hashable, asyncio.Future[ResponseSnapshot]]
+
+    def __init__(self) -> None:
+        self._inflight = {}
+        self.stats = CoalescingStats()
+
+    @property
+    def inflight_count(self) -> int:
+        return len(self._inflight)
+
+    async def run(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[ResponseSnapshot]],
+    ) -> ResponseSnapshot:
+        """
+        Returns the response snapshot of the in-flight request with the same key,
+        or sends a new request using *fetch* if there is none.
+
+        The upstream request runs as a separate task so that cancelling one of
+        the waiters does not affect the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            self.stats.issued += 1
+
+            def _done(t: asyncio.Future[ResponseSnapshot]) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+                if not t.cancelled():
+                    t.exception()  # mark as retrieved even when all waiters are gone
+
+            task.add_done_callback(_done)
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,121 @@
+"""
+Provides the JSON codecs used to encode the request bodies and decode the
+response bodies.
+
+The ``"orjson"`` codec is used when the `orjson <https://github.com/ijl/orjson>`_
+package is installed, and the standard library's :mod:`json` module is used
+otherwise.  You may choose a specific codec using
+:attr:`APIConfig.json_codec <ai.backend.client.config.APIConfig.json_codec>`.
+"""
+
+import abc
+from collections import OrderedDict
+from datetime import date, datetime, time
+from decimal import Decimal
+import functools
+import json
+from pathlib import PurePath
+from typing import (
+    Any,
+    Union,
+)
+import uuid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+__all__ = (
+    'ExtendedJSONEncoder',
+    'JSONCodec',
+    'StdlibJSONCodec',
+    'OrjsonCodec',
+    'get_json_codec',
+)
+
+
+class ExtendedJSONEncoder(json.JSONEncoder):
+
+    def default(self, obj: Any) -> Any:
+        if isinstance(obj, PurePath):
+            return str(obj)
+        if isinstance(obj, Decimal):
+            return str(obj)
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        if isinstance(obj, (datetime, date, time)):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+class JSONCodec(metaclass=abc.ABCMeta):
+    """
+    The base interface of JSON codecs.
+    """
+
+    name: str
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """
+        Encodes the given object into UTF-8 encoded JSON bytes.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decodes the given JSON bytes or string.
+        """
+        raise NotImplementedError
+
+
+class StdlibJSONCodec(JSONCodec):
+
+    name = 'stdlib'
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, cls=ExtendedJSONEncoder).encode('utf-8')
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data, object_pairs_hook=OrderedDict)
+
+
+def _orjson_default(obj: Any) -> Any:
+    # orjson natively serializes UUIDs and date/time objects.
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class OrjsonCodec(JSONCodec):
+
+    name = 'orjson'
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+@functools.lru_cache(maxsize=None)
+def get_json_codec(name: str = 'auto') -> JSONCodec:
+    """
+    Returns the JSON codec instance with the given name.
+
+    :param name: One of ``"auto"``, ``"orjson"``, and ``"stdlib"``.
+        ``"auto"`` chooses the fastest one available in the current environment.
+    """
+    if name == 'auto':
+        name = 'stdlib' if orjson is None else 'orjson'
+    if name == 'stdlib':
+        return StdlibJSONCodec()
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError('The orjson codec requires the "orjson" package to be installed.')
+        return OrjsonCodec()
+    raise ValueError('Unsupported JSON codec', name)
@@ -0,0 +1,177 @@
+"""
+Provides the content-encoding support for request and response bodies.
+
+The gzip encoding is always available.  The zstd encoding requires the
+`zstandard <https://github.com/indygreg/python-zstandard>`_ package.
+aiohttp natively decodes gzip- and deflate-encoded responses, so this module
+only takes care of the encodings that aiohttp does not understand.
+"""
+
+import asyncio
+import gzip
+from typing import (
+    Any,
+    AsyncIterator,
+    Optional,
+    Tuple,
+)
+
+import aiohttp
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+__all__ = (
+    'SUPPORTED_ENCODINGS',
+    'get_accept_encoding',
+    'compress_body',
+    'DecompressingStreamReader',
+    'wrap_response_stream',
+)
+
+_native_encodings: Tuple[str, ...] = ('gzip', 'deflate')
+
+
+def _get_supported_encodings() -> Tuple[str, ...]:
+    if zstandard is not None:
+        return ('zstd', 'gzip')
+    return ('gzip', )
+
+
+SUPPORTED_ENCODINGS = _get_supported_encodings()
+"""
+The content encodings available for compressing request bodies
+in the current environment.
+"""
+
+
+def get_accept_encoding() -> str:
+    """
+    Returns the value of ``Accept-Encoding`` header listing all response
+    encodings that can be decoded, in the order of preference.
+    """
+    if zstandard is not None:
+        return 'zstd, gzip, deflate'
+    return 'gzip, deflate'
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """
+    Compresses the given request body with the given content encoding.
+    """
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise ValueError('The zstd encoding requires the "zstandard" package to be installed.')
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    raise ValueError('Unsupported content encoding', encoding)
+
+
+class DecompressingStreamReader:
+    """
+    Wraps :class:`aiohttp.StreamReader` to decompress the response body
+    chunk by chunk as it is being read, without buffering the whole body.
+    It provides the reading interfaces of :class:`aiohttp.StreamReader`
+    used by :class:`aiohttp.ClientResponse` and the SDK response objects.
+    """
+
+    def __init__(self, stream: aiohttp.StreamReader, encoding: str) -> None:
+        if encoding != 'zstd' or zstandard is None:
+            raise ValueError('Unsupported content encoding', encoding)
+        self._stream = stream
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+        self._buffer = bytearray()
+        self._eof = False
+
+    async def _pull(self) -> None:
+        chunk = await self._stream.readany()
+        if chunk:
+            self._buffer.extend(self._decompressor.decompress(chunk))
+        else:
+            self._eof = True
+            self._buffer.extend(self._decompressor.flush())
+
+    async def _fill(self) -> None:
+        while not self._buffer and not self._eof:
+            await self._pull()
+
+    def _consume(self, n: int) -> bytes:
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    def at_eof(self) -> bool:
+        return self._eof and not self._buffer
+
+    def exception(self) -> Optional[BaseException]:
+        return self._stream.exception()
+
+    async def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            chunks = []
+            while True:
+                chunk = await self.readany()
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b''.join(chunks)
+        if n == 0:
+            return b''
+        await self._fill()
+        return self._consume(n)
+
+    async def readany(self) -> bytes:
+        await self._fill()
+        return self._consume(len(self._buffer))
+
+    async def readexactly(self, n: int) -> bytes:
+        while len(self._buffer) < n and not self._eof:
+            await self._pull()
+        if len(self._buffer) < n:
+            partial = self._consume(len(self._buffer))
+            raise asyncio.IncompleteReadError(partial, n)
+        return self._consume(n)
+
+    async def readline(self) -> bytes:
+        while True:
+            pos = self._buffer.find(b'\n')
+            if pos >= 0:
+                return self._consume(pos + 1)
+            if self._eof:
+                return self._consume(len(self._buffer))
+            await self._pull()
+
+    async def iter_any(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.readany()
+            if not chunk:
+                break
+            yield chunk
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self.read(n)
+            if not chunk:
+                break
+            yield chunk
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+def wrap_response_stream(raw_response: aiohttp.ClientResponse) -> None:
+    """
+    Replaces the content stream of the given response with a decompressing
+    one if the response is encoded with an encoding that aiohttp does not
+    decode by itself.  Afterwards, all reading methods of the response
+    (including ``read()``, ``text()`` and ``json()``) return decoded bytes.
+    """
+    encoding = raw_response.headers.get('Content-Encoding', '').lower().strip()
+    if not encoding or encoding == 'identity' or encoding in _native_encodings:
+        return
+    if encoding == 'zstd' and zstandard is not None:
+        raw_response.content = DecompressingStreamReader(  # type: ignore
+            raw_response.content, encoding)
@@ -18,6 +18,8 @@ from typing import (
 import appdirs
 from yarl import URL
 
+from .circuit import CircuitState
+
 __all__ = [
     'parse_api_version',
     'get_config',
@@ -96,6 +98,41 @@ def _clean_urls(v: Union[URL, str]) -> List[URL]:
     return urls
 
 
+def _clean_compression(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return None
+    v = v.strip().lower()
+    if v in ('', 'none', 'identity'):
+        return None
+    return v
+
+
+def _clean_path(v: Union[Path, str, None]) -> Optional[Path]:
+    if v is None or v == '':
+        return None
+    return Path(v).expanduser()
+
+
+def _clean_ttls(v: Union[Mapping[str, float], str]) -> Mapping[str, float]:
+    if isinstance(v, str):
+        ttls = {}
+        for entry in v.split(','):
+            if not entry.strip():
+                continue
+            name, sep, ttl = entry.partition('=')
+            if not sep:
+                raise ValueError('Invalid response cache TTL (expected "name=seconds")', entry)
+            ttls[name.strip()] = float(ttl)
+        return ttls
+    return {name: float(ttl) for name, ttl in v.items()}
+
+
+def _clean_optional_float(v: Union[float, str, None]) -> Optional[float]:
+    if v is None or v == '':
+        return None
+    return float(v)
+
+
 def _clean_tokens(v):
     if isinstance(v, str):
         if not v:
@@ -139,6 +176,100 @@ class APIConfig:
         access key) to be automatically mounted upon any
         :func:`Kernel.get_or_create()
         <ai.backend.client.kernel.Kernel.get_or_create>` calls.
+    :param max_connections: The maximum number of simultaneous HTTP connections
+        kept by the underlying connection pool.  Zero means unlimited.
+    :param max_connections_per_host: The maximum number of simultaneous HTTP
+        connections to a single endpoint host.  Zero means unlimited.
+    :param keepalive_timeout: The number of seconds to keep idle connections
+        open for reuse by subsequent requests.
+    :param dns_cache_ttl: The number of seconds to cache resolved endpoint
+        addresses.  Zero or a negative value disables the DNS cache.
+    :param share_connection_pool: If set True, all sessions running on the same
+        event loop with the same connection pool settings share a single
+        connection pool (and thus keep-alive connections and TLS sessions),
+        instead of creating and tearing down their own ones.
+    :param shared_runtime: If set True, all synchronous sessions in the process run
+        their API calls in a single shared event loop thread with a shared connection
+        pool, instead of starting and stopping their own worker threads.
+        Each session still uses its own configuration and keypair.
+    :param sync_generator_prefetch: The number of items that the streaming API
+        functions such as ``paginated_list()`` may fetch in advance while the caller
+        of a synchronous session is processing the current item.  The default is zero,
+        which fetches the next item only when requested.
+    :param json_codec: The JSON codec to encode request bodies and decode responses.
+        One of ``"auto"`` (the default), ``"orjson"``, and ``"stdlib"``.
+        ``"auto"`` uses orjson if installed and falls back to the standard library.
+    :param request_compression: The content encoding (``"gzip"`` or ``"zstd"``) to
+        compress JSON request bodies larger than *request_compression_threshold*.
+        The default is ``None`` which sends all request bodies uncompressed.
+        Please check if the API server accepts the chosen encoding before enabling it.
+    :param request_compression_threshold: The minimum size of JSON request bodies
+        in bytes to apply *request_compression*.
+    :param response_compression: Whether to let the server compress the response bodies
+        with the encodings supported by the client.  The zstd encoding is advertised
+        only when the ``zstandard`` package is installed.
+    :param coalesce_requests: If set True, identical read-only requests (GraphQL queries
+        and the GET requests of the API functions returning small JSON documents)
+        concurrently made in the same session share a single upstream request.
+    :param graphql_batching: If set True, read-only GraphQL queries issued in the same
+        event loop tick of an asynchronous session are merged into a single request
+        using field aliases.
+    :param graphql_batch_size: The maximum number of GraphQL queries merged into
+        a single request.
+    :param graphql_persisted_queries: If set True, the repeated GraphQL queries of
+        paginated listings are sent with the hash of the query text instead of the
+        full text once the server has seen it, falling back to the full text if the
+        server does not recognize the hash.  The server must support the automatic
+        persisted query protocol.
+    :param retry_max_attempts: The maximum number of attempts of a request including the
+        first one, when it fails with transient errors.  Connection failures are retried
+        at least once per endpoint regardless of this value.
+    :param retry_backoff_base: The upper bound of the first randomized backoff delay in
+        seconds, which doubles for each subsequent retry.
+    :param retry_backoff_max: The maximum backoff delay in seconds.
+    :param retry_budget_ratio: The maximum long-term ratio of retries to requests in a
+        session, to prevent retry storms against a misbehaving server.
+    :param rate_limiting: If set True, outgoing requests are paced by a token-bucket
+        limiter following the rate limit advertised by the server via the response
+        headers, so that the requests exceeding the budget wait in the client
+        instead of failing with 429 responses.
+    :param rate_limit: The initial number of requests per second allowed by the
+        limiter before the server advertises its rate limit.
+        The default is ``None`` which does not limit the requests until then.
+    :param hedge_requests: If set True and there are multiple endpoints, an idempotent
+        request not answered within *hedge_delay* is duplicated to another endpoint and
+        the first response is taken, to cut the tail latency.
+    :param hedge_delay: The number of seconds to wait before sending a hedged request.
+        The default is ``None`` which uses the 95th percentile of the observed latency.
+    :param circuit_breaker: If set True, each endpoint gets a circuit breaker which opens
+        after *circuit_breaker_threshold* consecutive failures (connection errors and
+        502/503/504 responses).  Requests skip the endpoints with open circuits immediately
+        instead of waiting for the connection timeout, and a single trial request is
+        allowed after *circuit_breaker_timeout* seconds to check the recovery.
+    :param circuit_breaker_threshold: The number of consecutive failures to open the circuit.
+    :param circuit_breaker_timeout: The number of seconds to keep the circuit open.
+    :param circuit_breaker_handler: A callback invoked with the endpoint URL and the old
+        and new :class:`~ai.backend.client.circuit.CircuitState` whenever a circuit
+        breaker changes its state, e.g., to report metrics.
+    :param endpoint_selection: The strategy to choose the endpoint among multiple ones.
+        ``"rotate"`` (the default) keeps using the same endpoint and rotates to the next
+        one only upon connection failures.  ``"latency"`` routes each request to the
+        healthy endpoint with the lowest moving average of latency and error rate,
+        measured by the requests and the periodic background health probes,
+        and ejects failed endpoints for a cool-down period.
+    :param endpoint_probe_interval: The number of seconds between the background
+        health probes of the endpoints when *endpoint_selection* is ``"latency"``.
+    :param endpoint_cooldown: The number of seconds to stop routing requests to an
+        endpoint after connection failures when *endpoint_selection* is ``"latency"``.
+    :param response_cache: If set True, the responses of read-mostly API functions such as
+        :meth:`Image.list() <ai.backend.client.func.image.Image.list>` are cached
+        for a while and revalidated using ETag/Last-Modified headers when expired.
+    :param response_cache_size: The maximum number of responses kept in memory.
+    :param response_cache_dir: The directory to persist cached responses across
+        processes.  The default is ``None`` which keeps them only in memory.
+    :param response_cache_ttls: The mapping from API function names (e.g., ``"Image.list"``)
+        to the number of seconds to keep their responses fresh, overriding the defaults.
+        As an environment variable, it is written like ``"Image.list=60,System.get_versions=600"``.
     """
 
     DEFAULTS: Mapping[str, Any] = {
@@ -150,6 +281,39 @@ class APIConfig:
         'group': 'default',
         'connection_timeout': 10.0,
         'read_timeout': None,
+        'max_connections': 100,
+        'max_connections_per_host': 0,
+        'keepalive_timeout': 15.0,
+        'dns_cache_ttl': 10,
+        'share_connection_pool': False,
+        'shared_runtime': False,
+        'sync_generator_prefetch': 0,
+        'json_codec': 'auto',
+        'request_compression': None,
+        'request_compression_threshold': 1024,
+        'response_compression': True,
+        'coalesce_requests': False,
+        'graphql_batching': False,
+        'graphql_batch_size': 20,
+        'graphql_persisted_queries': False,
+        'retry_max_attempts': 3,
+        'retry_backoff_base': 0.2,
+        'retry_backoff_max': 10.0,
+        'retry_budget_ratio': 0.2,
+        'rate_limiting': False,
+        'rate_limit': None,
+        'hedge_requests': False,
+        'hedge_delay': None,
+        'circuit_breaker': False,
+        'circuit_breaker_threshold': 5,
+        'circuit_breaker_timeout': 30.0,
+        'endpoint_selection': 'rotate',
+        'endpoint_probe_interval': 10.0,
+        'endpoint_cooldown': 30.0,
+        'response_cache': False,
+        'response_cache_size': 256,
+        'response_cache_dir': None,
+        'response_cache_ttls': {},
     }
     """
     The default values for config parameterse settable via environment variables
@@ -174,6 +338,40 @@ class APIConfig:
         skip_sslcert_validation: bool = None,
         connection_timeout: float = None,
         read_timeout: float = None,
+        max_connections: int = None,
+        max_connections_per_host: int = None,
+        keepalive_timeout: float = None,
+        dns_cache_ttl: int = None,
+        share_connection_pool: bool = None,
+        shared_runtime: bool = None,
+        sync_generator_prefetch: int = None,
+        json_codec: str = None,
+        request_compression: str = None,
+        request_compression_threshold: int = None,
+        response_compression: bool = None,
+        coalesce_requests: bool = None,
+        graphql_batching: bool = None,
+        graphql_batch_size: int = None,
+        graphql_persisted_queries: bool = None,
+        retry_max_attempts: int = None,
+        retry_backoff_base: float = None,
+        retry_backoff_max: float = None,
+        retry_budget_ratio: float = None,
+        rate_limiting: bool = None,
+        rate_limit: float = None,
+        hedge_requests: bool = None,
+        hedge_delay: float = None,
+        circuit_breaker: bool = None,
+        circuit_breaker_threshold: int = None,
+        circuit_breaker_timeout: float = None,
+        circuit_breaker_handler: Callable[[URL, CircuitState, CircuitState], None] = None,
+        endpoint_selection: str = None,
+        endpoint_probe_interval: float = None,
+        endpoint_cooldown: float = None,
+        response_cache: bool = None,
+        response_cache_size: int = None,
+        response_cache_dir: Union[Path, str] = None,
+        response_cache_ttls: Mapping[str, float] = None,
         announcement_handler: Callable[[str], None] = None,
     ) -> None:
         from . import get_user_agent
@@ -208,6 +406,96 @@ class APIConfig:
             get_env('CONNECTION_TIMEOUT', self.DEFAULTS['connection_timeout'])
         self._read_timeout = read_timeout if read_timeout else \
             get_env('READ_TIMEOUT', self.DEFAULTS['read_timeout'])
+        self._max_connections = max_connections if max_connections is not None else \
+            get_env('MAX_CONNECTIONS', self.DEFAULTS['max_connections'], clean=int)
+        self._max_connections_per_host = max_connections_per_host \
+            if max_connections_per_host is not None else \
+            get_env('MAX_CONNECTIONS_PER_HOST', self.DEFAULTS['max_connections_per_host'],
+                    clean=int)
+        self._keepalive_timeout = keepalive_timeout if keepalive_timeout is not None else \
+            get_env('KEEPALIVE_TIMEOUT', self.DEFAULTS['keepalive_timeout'], clean=float)
+        self._dns_cache_ttl = dns_cache_ttl if dns_cache_ttl is not None else \
+            get_env('DNS_CACHE_TTL', self.DEFAULTS['dns_cache_ttl'], clean=int)
+        self._share_connection_pool = share_connection_pool if share_connection_pool is not None else \
+            get_env('SHARE_CONNECTION_POOL', 'no', clean=bool_env)
+        self._shared_runtime = shared_runtime if shared_runtime is not None else \
+            get_env('SHARED_RUNTIME', 'no', clean=bool_env)
+        self._sync_generator_prefetch = sync_generator_prefetch \
+            if sync_generator_prefetch is not None else \
+            get_env('SYNC_GENERATOR_PREFETCH', self.DEFAULTS['sync_generator_prefetch'], clean=int)
+        if self._sync_generator_prefetch < 0:
+            raise ValueError('Invalid sync generator prefetch depth', self._sync_generator_prefetch)
+        self._json_codec = json_codec if json_codec is not None else \
+            get_env('JSON_CODEC', self.DEFAULTS['json_codec'])
+        if self._json_codec not in ('auto', 'orjson', 'stdlib'):
+            raise ValueError('Unsupported JSON codec', self._json_codec)
+        self._request_compression = request_compression if request_compression is not None else \
+            get_env('REQUEST_COMPRESSION', self.DEFAULTS['request_compression'],
+                    clean=_clean_compression)
+        if self._request_compression not in (None, 'gzip', 'zstd'):
+            raise ValueError('Unsupported request compression', self._request_compression)
+        self._request_compression_threshold = request_compression_threshold \
+            if request_compression_threshold is not None else \
+            get_env('REQUEST_COMPRESSION_THRESHOLD',
+                    self.DEFAULTS['request_compression_threshold'], clean=int)
+        self._response_compression = response_compression if response_compression is not None else \
+            get_env('RESPONSE_COMPRESSION', 'yes', clean=bool_env)
+        self._coalesce_requests = coalesce_requests if coalesce_requests is not None else \
+            get_env('COALESCE_REQUESTS', 'no', clean=bool_env)
+        self._graphql_batching = graphql_batching if graphql_batching is not None else \
+            get_env('GRAPHQL_BATCHING', 'no', clean=bool_env)
+        self._graphql_batch_size = graphql_batch_size if graphql_batch_size is not None else \
+            get_env('GRAPHQL_BATCH_SIZE', self.DEFAULTS['graphql_batch_size'], clean=int)
+        self._graphql_persisted_queries = graphql_persisted_queries \
+            if graphql_persisted_queries is not None else \
+            get_env('GRAPHQL_PERSISTED_QUERIES', 'no', clean=bool_env)
+        self._retry_max_attempts = retry_max_attempts if retry_max_attempts is not None else \
+            get_env('RETRY_MAX_ATTEMPTS', self.DEFAULTS['retry_max_attempts'], clean=int)
+        self._retry_backoff_base = retry_backoff_base if retry_backoff_base is not None else \
+            get_env('RETRY_BACKOFF_BASE', self.DEFAULTS['retry_backoff_base'], clean=float)
+        self._retry_backoff_max = retry_backoff_max if retry_backoff_max is not None else \
+            get_env('RETRY_BACKOFF_MAX', self.DEFAULTS['retry_backoff_max'], clean=float)
+        self._retry_budget_ratio = retry_budget_ratio if retry_budget_ratio is not None else \
+            get_env('RETRY_BUDGET_RATIO', self.DEFAULTS['retry_budget_ratio'], clean=float)
+        self._rate_limiting = rate_limiting if rate_limiting is not None else \
+            get_env('RATE_LIMITING', 'no', clean=bool_env)
+        self._rate_limit = rate_limit if rate_limit is not None else \
+            get_env('RATE_LIMIT', self.DEFAULTS['rate_limit'], clean=_clean_optional_float)
+        self._hedge_requests = hedge_requests if hedge_requests is not None else \
+            get_env('HEDGE_REQUESTS', 'no', clean=bool_env)
+        self._hedge_delay = hedge_delay if hedge_delay is not None else \
+            get_env('HEDGE_DELAY', self.DEFAULTS['hedge_delay'], clean=_clean_optional_float)
+        self._circuit_breaker = circuit_breaker if circuit_breaker is not None else \
+            get_env('CIRCUIT_BREAKER', 'no', clean=bool_env)
+        self._circuit_breaker_threshold = circuit_breaker_threshold \
+            if circuit_breaker_threshold is not None else \
+            get_env('CIRCUIT_BREAKER_THRESHOLD', self.DEFAULTS['circuit_breaker_threshold'],
+                    clean=int)
+        self._circuit_breaker_timeout = circuit_breaker_timeout \
+            if circuit_breaker_timeout is not None else \
+            get_env('CIRCUIT_BREAKER_TIMEOUT', self.DEFAULTS['circuit_breaker_timeout'],
+                    clean=float)
+        self._circuit_breaker_handler = circuit_breaker_handler
+        self._endpoint_selection = endpoint_selection if endpoint_selection is not None else \
+            get_env('ENDPOINT_SELECTION', self.DEFAULTS['endpoint_selection'])
+        if self._endpoint_selection not in ('rotate', 'latency'):
+            raise ValueError('Unsupported endpoint selection strategy', self._endpoint_selection)
+        self._endpoint_probe_interval = endpoint_probe_interval \
+            if endpoint_probe_interval is not None else \
+            get_env('ENDPOINT_PROBE_INTERVAL', self.DEFAULTS['endpoint_probe_interval'],
+                    clean=float)
+        self._endpoint_cooldown = endpoint_cooldown if endpoint_cooldown is not None else \
+            get_env('ENDPOINT_COOLDOWN', self.DEFAULTS['endpoint_cooldown'], clean=float)
+        self._response_cache = response_cache if response_cache is not None else \
+            get_env('RESPONSE_CACHE', 'no', clean=bool_env)
+        self._response_cache_size = response_cache_size if response_cache_size is not None else \
+            get_env('RESPONSE_CACHE_SIZE', self.DEFAULTS['response_cache_size'], clean=int)
+        self._response_cache_dir = _clean_path(response_cache_dir) \
+            if response_cache_dir is not None else \
+            get_env('RESPONSE_CACHE_DIR', self.DEFAULTS['response_cache_dir'], clean=_clean_path)
+        self._response_cache_ttls = _clean_ttls(response_cache_ttls) \
+            if response_cache_ttls is not None else \
+            get_env('RESPONSE_CACHE_TTLS', self.DEFAULTS['response_cache_ttls'], clean=_clean_ttls)
         self._announcement_handler = announcement_handler
 
     @property
@@ -295,6 +583,176 @@ class APIConfig:
         """The maximum allowed waiting time for the first byte of the response from the server."""
         return self._read_timeout
 
+    @property
+    def max_connections(self) -> int:
+        """The maximum number of simultaneous connections in the connection pool."""
+        return self._max_connections
+
+    @property
+    def max_connections_per_host(self) -> int:
+        """The maximum number of simultaneous connections to a single endpoint host."""
+        return self._max_connections_per_host
+
+    @property
+    def keepalive_timeout(self) -> float:
+        """The idle timeout of keep-alive connections in the connection pool."""
+        return self._keepalive_timeout
+
+    @property
+    def dns_cache_ttl(self) -> int:
+        """The lifetime of cached DNS resolution results."""
+        return self._dns_cache_ttl
+
+    @property
+    def share_connection_pool(self) -> bool:
+        """Whether to share the connection pool with other sessions in the same process."""
+        return self._share_connection_pool
+
+    @property
+    def shared_runtime(self) -> bool:
+        """Whether synchronous sessions share the process-wide event loop thread."""
+        return self._shared_runtime
+
+    @property
+    def sync_generator_prefetch(self) -> int:
+        """The number of items that streaming API functions may fetch in advance."""
+        return self._sync_generator_prefetch
+
+    @property
+    def json_codec(self) -> str:
+        """The name of the configured JSON codec."""
+        return self._json_codec
+
+    @property
+    def request_compression(self) -> Optional[str]:
+        """The content encoding to compress large JSON request bodies."""
+        return self._request_compression
+
+    @property
+    def request_compression_threshold(self) -> int:
+        """The minimum size of JSON request bodies to be compressed."""
+        return self._request_compression_threshold
+
+    @property
+    def response_compression(self) -> bool:
+        """Whether to accept compressed response bodies."""
+        return self._response_compression
+
+    @property
+    def coalesce_requests(self) -> bool:
+        """Whether to coalesce identical in-flight read-only requests."""
+        return self._coalesce_requests
+
+    @property
+    def graphql_batching(self) -> bool:
+        """Whether to merge GraphQL queries issued in the same event loop tick."""
+        return self._graphql_batching
+
+    @property
+    def graphql_batch_size(self) -> int:
+        """The maximum number of GraphQL queries merged into a single request."""
+        return self._graphql_batch_size
+
+    @property
+    def graphql_persisted_queries(self) -> bool:
+        """Whether to send the hashes of repeated GraphQL queries instead of their text."""
+        return self._graphql_persisted_queries
+
+    @property
+    def retry_max_attempts(self) -> int:
+        """The maximum number of attempts of a request."""
+        return self._retry_max_attempts
+
+    @property
+    def retry_backoff_base(self) -> float:
+        """The upper bound of the first backoff delay of retries."""
+        return self._retry_backoff_base
+
+    @property
+    def retry_backoff_max(self) -> float:
+        """The maximum backoff delay of retries."""
+        return self._retry_backoff_max
+
+    @property
+    def retry_budget_ratio(self) -> float:
+        """The maximum ratio of retries to requests in a session."""
+        return self._retry_budget_ratio
+
+    @property
+    def rate_limiting(self) -> bool:
+        """Whether to pace outgoing requests under the server's rate limit."""
+        return self._rate_limiting
+
+    @property
+    def rate_limit(self) -> Optional[float]:
+        """The initial number of requests per second allowed by the limiter."""
+        return self._rate_limit
+
+    @property
+    def hedge_requests(self) -> bool:
+        """Whether to duplicate slow idempotent requests to another endpoint."""
+        return self._hedge_requests
+
+    @property
+    def hedge_delay(self) -> Optional[float]:
+        """The fixed delay before sending a hedged request, if set."""
+        return self._hedge_delay
+
+    @property
+    def circuit_breaker(self) -> bool:
+        """Whether to use per-endpoint circuit breakers."""
+        return self._circuit_breaker
+
+    @property
+    def circuit_breaker_threshold(self) -> int:
+        """The number of consecutive failures to open the circuit."""
+        return self._circuit_breaker_threshold
+
+    @property
+    def circuit_breaker_timeout(self) -> float:
+        """The duration to keep the circuit open."""
+        return self._circuit_breaker_timeout
+
+    @property
+    def circuit_breaker_handler(self) -> Optional[Callable[[URL, CircuitState, CircuitState], None]]:
+        """The callback invoked upon state changes of the circuit breakers."""
+        return self._circuit_breaker_handler
+
+    @property
+    def endpoint_selection(self) -> str:
+        """The strategy to choose the endpoint among multiple ones."""
+        return self._endpoint_selection
+
+    @property
+    def endpoint_probe_interval(self) -> float:
+        """The interval of the background health probes of the endpoints."""
+        return self._endpoint_probe_interval
+
+    @property
+    def endpoint_cooldown(self) -> float:
+        """The duration to eject failed endpoints."""
+        return self._endpoint_cooldown
+
+    @property
+    def response_cache(self) -> bool:
+        """Whether to cache the responses of read-mostly API functions."""
+        return self._response_cache
+
+    @property
+    def response_cache_size(self) -> int:
+        """The maximum number of cached responses kept in memory."""
+        return self._response_cache_size
+
+    @property
+    def response_cache_dir(self) -> Optional[Path]:
+        """The directory to persist cached responses, if set."""
+        return self._response_cache_dir
+
+    @property
+    def response_cache_ttls(self) -> Mapping[str, float]:
+        """The per-function overrides of the cached response lifetimes."""
+        return self._response_cache_ttls
+
     @property
     def announcement_handler(self) -> Optional[Callable[[str], None]]:
         '''The announcement handler to display server-set announcements.'''
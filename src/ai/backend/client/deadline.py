@@ -0,0 +1,129 @@
+"""
+Provides per-call deadlines for API functions.
+
+A deadline bounds the total time of API function calls made within it,
+including the retries, the endpoint fail-overs, the pagination loops and
+the file transfers:
+
+.. code-block:: python3
+
+  from ai.backend.client.deadline import deadline
+  from ai.backend.client.session import Session
+
+  with Session() as sess:
+    with deadline(30):
+      sess.ComputeSession.get_or_create('python:3.6-ubuntu18.04')
+
+When the deadline passes, the ongoing call is cancelled and
+:exc:`~ai.backend.client.exceptions.DeadlineExceededError` is raised.
+Nested deadlines cannot extend the outer ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+import time
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from .exceptions import DeadlineExceededError
+
+__all__ = (
+    'api_deadline',
+    'deadline',
+    'get_remaining_time',
+    'check_deadline',
+    'run_with_deadline',
+    'iterate_with_deadline',
+)
+
+_T = TypeVar('_T')
+
+# The absolute deadline in terms of time.monotonic().
+api_deadline: ContextVar[Optional[float]] = ContextVar('api_deadline', default=None)
+
+
+@contextmanager
+def deadline(timeout: Optional[float]) -> Iterator[None]:
+    """
+    Sets the deadline of the API function calls made in the context
+    to *timeout* seconds from now.  ``None`` keeps the current deadline.
+    """
+    if timeout is None:
+        yield
+        return
+    expires_at = time.monotonic() + timeout
+    current = api_deadline.get()
+    if current is not None:
+        expires_at = min(current, expires_at)
+    token = api_deadline.set(expires_at)
+    try:
+        yield
+    finally:
+        api_deadline.reset(token)
+
+
+def _get_remaining_time(expires_at: Optional[float]) -> Optional[float]:
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def get_remaining_time() -> Optional[float]:
+    """
+    Returns the number of seconds left until the current deadline,
+    or ``None`` if there is no deadline.
+    """
+    return _get_remaining_time(api_deadline.get())
+
+
+def check_deadline() -> None:
+    """
+    Raises :exc:`~ai.backend.client.exceptions.DeadlineExceededError`
+    if the current deadline has passed.
+    """
+    remaining = get_remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError('The deadline of the API call has passed.')
+
+
+async def run_with_deadline(aw: Awaitable[_T], expires_at: float) -> _T:
+    """
+    Awaits *aw* and cancels it when the deadline *expires_at* passes.
+    """
+    remaining = _get_remaining_time(expires_at)
+    assert remaining is not None
+    if remaining <= 0:
+        if asyncio.iscoroutine(aw):
+            aw.close()  # avoid the "never awaited" warning
+        raise DeadlineExceededError('The deadline of the API call has passed.')
+    try:
+        return await asyncio.wait_for(aw, remaining)
+    except asyncio.TimeoutError as e:
+        if time.monotonic() < expires_at:
+            raise  # a timeout from the inner operations
+        raise DeadlineExceededError('The deadline of the API call has passed.') from e
+
+
+async def iterate_with_deadline(agen: AsyncIterator[_T], expires_at: float) -> AsyncIterator[_T]:
+    """
+    Iterates over *agen* and cancels it when the deadline *expires_at* passes.
+    """
+    try:
+        while True:
+            try:
+                item = await run_with_deadline(agen.__anext__(), expires_at)
+            except StopAsyncIteration:
+                break
+            yield item
+    finally:
+        aclose = getattr(agen, 'aclose', None)
+        if aclose is not None:
+            await aclose()
@@ -0,0 +1,221 @@
+"""
+Provides the latency-aware selection of API endpoints.
+
+When multiple API endpoints are configured, :class:`EndpointSelector` keeps
+the exponentially-weighted moving averages (EWMA) of the response latency and
+the error rate of each endpoint, measured from both the actual requests and
+the periodic background health probes.  Requests are routed to the healthy
+endpoint with the best score, and the endpoints that fail to connect are
+ejected for a cool-down period instead of being retried by every request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+
+import aiohttp
+import attr
+from yarl import URL
+
+__all__ = (
+    'EndpointStats',
+    'EndpointSelector',
+)
+
+log = logging.getLogger('ai.backend.client.endpoints')
+
+ProbeFunc = Callable[[URL], Awaitable[Any]]
+
+
+@attr.s(auto_attribs=True, slots=True)
+class EndpointStats:
+    endpoint: URL
+    latency: Optional[float] = None  # EWMA of the response latency in seconds
+    error_rate: float = 0.0          # EWMA of the ratio of failed requests and probes
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0               # the number of ejections in a row
+    ejected_until: float = 0.0       # in the monotonic clock
+
+    @property
+    def ejected(self) -> bool:
+        return time.monotonic() < self.ejected_until
+
+
+class EndpointSelector:
+    """
+    Routes requests to the best healthy endpoint.
+
+    :param endpoints: The list of candidate endpoints.  The given order is used
+        to break ties between the endpoints without latency measurements.
+    :param probe_interval: The number of seconds between background health probes.
+    :param cooldown: The number of seconds to eject an endpoint after failures.
+        It doubles on repeated ejections up to 8 times of the given value.
+    :param ejection_threshold: The number of consecutive failures to eject an endpoint.
+    :param smoothing: The weight of new samples in the moving averages.
+    :param error_penalty: The multiplier of the error rate added to the latency score.
+    """
+
+    __slots__ = (
+        '_stats', '_probe_interval', '_cooldown', '_ejection_threshold',
+        '_smoothing', '_error_penalty', '_probe_task',
+    )
+
+    _stats: Dict[URL, EndpointStats]
+    _probe_task: Optional[asyncio.Task]
+
+    def __init__(
+        self,
+        endpoints: Sequence[URL], *,
+        probe_interval: float = 10.0,
+        cooldown: float = 30.0,
+        ejection_threshold: int = 1,
+        smoothing: float = 0.3,
+        error_penalty: float = 4.0,
+    ) -> None:
+        self._stats = {endpoint: EndpointStats(endpoint) for endpoint in endpoints}
+        self._probe_interval = probe_interval
+        self._cooldown = cooldown
+        self._ejection_threshold = ejection_threshold
+        self._smoothing = smoothing
+        self._error_penalty = error_penalty
+        self._probe_task = None
+
+    @property
+    def stats(self) -> Sequence[EndpointStats]:
+        """
+        The copies of the current measurements of each endpoint.
+        """
+        return [attr.evolve(s) for s in self._stats.values()]
+
+    def _score(self, stats: EndpointStats) -> float:
+        # Endpoints without measurements are preferred to learn their latency.
+        latency = stats.latency if stats.latency is not None else 0.0
+        return latency * (1 + self._error_penalty * stats.error_rate)
+
+    def select(self, exclude: Collection[URL] = ()) -> URL:
+        """
+        Returns the healthy endpoint with the lowest score.
+        If all endpoints are ejected, returns the one to be restored first.
+        """
+        candidates = [s for s in self._stats.values() if s.endpoint not in exclude]
+        if not candidates:
+            candidates = [*self._stats.values()]
+        healthy = [s for s in candidates if not s.ejected]
+        if healthy:
+            return min(healthy, key=self._score).endpoint
+        return min(candidates, key=lambda s: s.ejected_until).endpoint
+
+    def _update(self, stats: EndpointStats, latency: Optional[float], error: bool) -> None:
+        alpha = self._smoothing
+        stats.requests += 1
+        if latency is not None:
+            stats.latency = latency if stats.latency is None else \
+                (1 - alpha) * stats.latency + alpha * latency
+        stats.error_rate = (1 - alpha) * stats.error_rate + alpha * (1.0 if error else 0.0)
+
+    def record_success(self, endpoint: URL, latency: float, *, error: bool = False) -> None:
+        """
+        Records a response received from the endpoint.
+        Set *error* for server-side errors (5xx), which are counted in the error
+        rate but do not eject the endpoint as it is still reachable.
+        """
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            return
+        self._update(stats, latency, error)
+        stats.consecutive_failures = 0
+        stats.ejections = 0
+        stats.ejected_until = 0.0
+
+    def record_failure(self, endpoint: URL) -> None:
+        """
+        Records a connection failure or a timeout of the endpoint.
+        """
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            return
+        self._update(stats, None, True)
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= self._ejection_threshold:
+            cooldown = self._cooldown * min(2 ** stats.ejections, 8)
+            stats.ejections += 1
+            stats.ejected_until = time.monotonic() + cooldown
+            log.warning('Ejected the endpoint %s for %.1f seconds after %d failure(s)',
+                        endpoint, cooldown, stats.consecutive_failures)
+
+    async def probe(self, probe_func: ProbeFunc, endpoint: URL) -> None:
+        """
+        Measures the health of the given endpoint using *probe_func*.
+        """
+        started = time.perf_counter()
+        try:
+            await probe_func(endpoint)
+        except aiohttp.ClientResponseError as e:
+            self.record_success(endpoint, time.perf_counter() - started, error=e.status >= 500)
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            self.record_failure(endpoint)
+        else:
+            self.record_success(endpoint, time.perf_counter() - started)
+
+    async def probe_all(self, probe_func: ProbeFunc) -> None:
+        """
+        Measures the health of all endpoints concurrently.
+        """
+        await asyncio.gather(*[
+            self.probe(probe_func, endpoint) for endpoint in self._stats
+        ])
+
+    async def _probe_loop(self, probe_func: ProbeFunc) -> None:
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            try:
+                await self.probe_all(probe_func)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception('Unexpected error while probing the endpoints')
+
+    async def start(self, probe_func: ProbeFunc) -> None:
+        """
+        Performs the initial round of health probes and starts the background
+        probing task in the current event loop.
+        """
+        await self.probe_all(probe_func)
+        if self._probe_task is None and len(self._stats) > 1:
+            self._probe_task = asyncio.ensure_future(self._probe_loop(probe_func))
+
+    async def stop(self) -> None:
+        """
+        Stops the background probing task.
+        """
+        if self._probe_task is None:
+            return
+        self._probe_task.cancel()
+        try:
+            await self._probe_task
+        except asyncio.CancelledError:
+            pass
+        self._probe_task = None
+
+    @property
+    def endpoints(self) -> List[URL]:
+        """
+        The list of endpoints in the order of preference.
+        """
+        ranked = sorted(self._stats.values(), key=lambda s: (s.ejected, self._score(s)))
+        return [s.endpoint for s in ranked]
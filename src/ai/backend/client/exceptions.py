@@ -5,6 +5,8 @@ __all__ = (
     'BackendError',
     'BackendAPIError',
     'BackendClientError',
+    'CircuitOpenError',
+    'DeadlineExceededError',
     'APIVersionWarning',
 )
 
@@ -53,6 +55,24 @@ class BackendClientError(BackendError):
     pass
 
 
+class CircuitOpenError(BackendClientError):
+    """
+    Exceptions raised without making requests when the circuit breakers
+    of all API endpoints are open due to repeated failures.
+    """
+
+    pass
+
+
+class DeadlineExceededError(BackendClientError):
+    """
+    Exceptions raised when an API function call does not finish
+    within the deadline set by :func:`ai.backend.client.deadline.deadline`.
+    """
+
+    pass
+
+
 class APIVersionWarning(UserWarning):
     """
     The warning generated if the server's API version is higher.
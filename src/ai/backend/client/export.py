@@ -0,0 +1,296 @@
+"""
+Provides the streaming writers to export the items of paginated listings
+as machine-readable files.
+
+The items are written as they are fetched, so exporting a long listing does
+not hold all items in memory.  The NDJSON and CSV files may be compressed with
+gzip or zstd (which requires the `zstandard
+<https://github.com/indygreg/python-zstandard>`_ package).  The Parquet format
+requires the `pyarrow <https://arrow.apache.org/docs/python/>`_ package and
+compresses its row groups internally.
+"""
+
+import abc
+import csv
+import gzip
+import io
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    BinaryIO,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+from typing_extensions import Literal  # for Python 3.7
+
+from .codec import get_json_codec
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+__all__ = (
+    'ExportFormat',
+    'ExportCompression',
+    'guess_export_options',
+    'RecordWriter',
+    'NDJSONWriter',
+    'CSVWriter',
+    'ParquetWriter',
+    'open_record_writer',
+)
+
+ExportFormat = Literal['ndjson', 'csv', 'parquet']
+ExportCompression = Literal['gzip', 'zstd']
+
+_format_suffixes = {
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+}
+_compression_suffixes = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+
+def guess_export_options(
+    path: Union[str, Path],
+) -> Tuple[Optional[ExportFormat], Optional[ExportCompression]]:
+    """
+    Guesses the export format and the compression from the file name,
+    such as ``users.csv.gz``.  Unknown suffixes are returned as ``None``.
+    """
+    suffixes = [s.lower() for s in Path(path).suffixes]
+    compression = None
+    if suffixes and suffixes[-1] in _compression_suffixes:
+        compression = _compression_suffixes[suffixes.pop()]
+    format = _format_suffixes.get(suffixes[-1]) if suffixes else None
+    return cast(Optional[ExportFormat], format), cast(Optional[ExportCompression], compression)
+
+
+def _open_binary_stream(path: Union[str, Path], compression: Optional[str]) -> BinaryIO:
+    if compression is None:
+        return open(path, 'wb')
+    if compression == 'gzip':
+        return cast(BinaryIO, gzip.open(path, 'wb', compresslevel=6))
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError('The zstd compression requires the "zstandard" package to be installed.')
+        return cast(BinaryIO, zstandard.ZstdCompressor(level=3).stream_writer(
+            open(path, 'wb'), closefd=True,
+        ))
+    raise ValueError('Unsupported compression', compression)
+
+
+class RecordWriter(metaclass=abc.ABCMeta):
+    """
+    The base class of the writers which write the given fields of each item
+    as a record.  The fields missing in an item are written as nulls.
+    """
+
+    fields: Sequence[str]
+    count: int
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.fields = tuple(fields)
+        self.count = 0
+
+    @abc.abstractmethod
+    def _write_record(self, values: List[Any]) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def write(self, item: Mapping[str, Any]) -> None:
+        self._write_record([item.get(field) for field in self.fields])
+        self.count += 1
+
+    def write_all(self, items: Iterable[Mapping[str, Any]]) -> int:
+        """
+        Writes all items from the given iterable, such as the result of
+        ``paginated_list()`` in synchronous sessions, and returns the number
+        of written items.
+        """
+        for item in items:
+            self.write(item)
+        return self.count
+
+    async def write_all_async(self, items: AsyncIterable[Mapping[str, Any]]) -> int:
+        """
+        The asynchronous version of :meth:`write_all`, which takes
+        the results of :func:`~ai.backend.client.pagination.generate_paginated_results`
+        or ``paginated_list()`` in asynchronous sessions.
+        """
+        async for item in items:
+            self.write(item)
+        return self.count
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class NDJSONWriter(RecordWriter):
+    """
+    Writes each item as a JSON object per line.
+    """
+
+    def __init__(self, stream: BinaryIO, fields: Sequence[str]) -> None:
+        super().__init__(fields)
+        self._stream = stream
+        self._codec = get_json_codec()
+
+    def _write_record(self, values: List[Any]) -> None:
+        self._stream.write(self._codec.dumps(dict(zip(self.fields, values))))
+        self._stream.write(b'\n')
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class CSVWriter(RecordWriter):
+    """
+    Writes the items as CSV rows with a header row of the field names.
+    Nested values such as lists and objects are written as JSON strings,
+    and nulls are written as empty cells.
+    """
+
+    def __init__(self, stream: BinaryIO, fields: Sequence[str]) -> None:
+        super().__init__(fields)
+        self._stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._stream)
+        self._codec = get_json_codec()
+        self._writer.writerow(self.fields)
+
+    def _write_record(self, values: List[Any]) -> None:
+        self._writer.writerow([
+            self._codec.dumps(value).decode('utf-8')
+            if isinstance(value, (dict, list)) else value
+            for value in values
+        ])
+
+    def close(self) -> None:
+        self._stream.close()
+
+
+class ParquetWriter(RecordWriter):
+    """
+    Writes the items as a Parquet file, buffering up to *row_group_size* items
+    to build each row group.  The column types are inferred from the first row
+    group, and nested values are written as JSON strings.
+
+    :param compression: The compression codec of the row groups.
+        Snappy is used if not specified.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        fields: Sequence[str],
+        *,
+        compression: Optional[str] = None,
+        row_group_size: int = 10000,
+    ) -> None:
+        super().__init__(fields)
+        # pyarrow takes a while to import, so import it only when used.
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError('The parquet format requires the "pyarrow" package to be installed.')
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self._path = path
+        self._compression = compression or 'snappy'
+        self._row_group_size = row_group_size
+        self._codec = get_json_codec()
+        self._columns: List[List[Any]] = [[] for _ in self.fields]
+        self._buffered = 0
+        self._schema: Any = None
+        self._writer: Any = None
+
+    def _write_record(self, values: List[Any]) -> None:
+        for column, value in zip(self._columns, values):
+            if isinstance(value, (dict, list)):
+                value = self._codec.dumps(value).decode('utf-8')
+            column.append(value)
+        self._buffered += 1
+        if self._buffered >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        pa = self._pa
+        if self._schema is None:
+            table = pa.Table.from_arrays(
+                [pa.array(column) for column in self._columns],
+                names=list(self.fields),
+            )
+            # Let the columns without any values in the first row group accept strings.
+            self._schema = pa.schema([
+                pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ])
+            table = table.cast(self._schema)
+            self._writer = self._pq.ParquetWriter(
+                str(self._path), self._schema, compression=self._compression,
+            )
+        else:
+            table = pa.Table.from_arrays(
+                [pa.array(column, type=field.type)
+                 for column, field in zip(self._columns, self._schema)],
+                schema=self._schema,
+            )
+        self._writer.write_table(table)
+        for column in self._columns:
+            column.clear()
+        self._buffered = 0
+
+    def close(self) -> None:
+        if self._buffered or self._writer is None:
+            self._flush()
+        self._writer.close()
+
+
+def open_record_writer(
+    path: Union[str, Path],
+    fields: Sequence[str],
+    *,
+    format: ExportFormat = None,
+    compression: ExportCompression = None,
+) -> RecordWriter:
+    """
+    Opens a record writer for the given file path.
+
+    :param path: The path of the file to write.
+    :param fields: The names of the fields to write, in the order of the columns.
+    :param format: The file format.  If not specified, it is guessed from the file
+        name and defaults to NDJSON.
+    :param compression: The compression method.  If not specified, it is guessed
+        from the file name (``.gz`` or ``.zst``).
+    """
+    guessed_format, guessed_compression = guess_export_options(path)
+    if format is None:
+        format = guessed_format or 'ndjson'
+    if compression is None:
+        compression = guessed_compression
+    if format == 'parquet':
+        return ParquetWriter(path, fields, compression=compression)
+    if format == 'ndjson':
+        return NDJSONWriter(_open_binary_stream(path, compression), fields)
+    if format == 'csv':
+        return CSVWriter(_open_binary_stream(path, compression), fields)
+    raise ValueError('Unsupported export format', format)
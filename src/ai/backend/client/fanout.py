@@ -0,0 +1,135 @@
+"""
+Provides the helpers to run many API calls concurrently, used by
+:meth:`Session.gather() <ai.backend.client.session.Session.gather>` and
+:meth:`Session.map() <ai.backend.client.session.Session.map>`.
+
+Each call is given as a callable without arguments which returns the result
+or an awaitable of it.  The API functions called inside the event loop of
+a session return coroutines even for synchronous sessions, so the calls are
+scheduled concurrently in the loop.
+"""
+
+import asyncio
+import inspect
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+import attr
+
+__all__ = (
+    'CallOutcome',
+    'gather_calls',
+    'iterate_completed_calls',
+)
+
+
+@attr.s(auto_attribs=True, slots=True)
+class CallOutcome:
+    index: int                                # the position of the call
+    result: Any = None                        # the result if succeeded
+    error: Optional[BaseException] = None     # the exception if failed
+
+    def get(self) -> Any:
+        """
+        Returns the result or raises the exception of the call.
+        """
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def _run_call(
+    index: int,
+    call: Callable[[], Any],
+    semaphore: Optional[asyncio.Semaphore],
+) -> CallOutcome:
+    try:
+        if semaphore is not None:
+            async with semaphore:
+                result = call()
+                if inspect.isawaitable(result):
+                    result = await result
+        else:
+            result = call()
+            if inspect.isawaitable(result):
+                result = await result
+    except Exception as e:
+        return CallOutcome(index, error=e)
+    return CallOutcome(index, result=result)
+
+
+def _schedule_calls(
+    calls: Iterable[Callable[[], Any]],
+    concurrency: Optional[int],
+) -> List[asyncio.Future]:
+    if concurrency is not None and concurrency < 1:
+        raise ValueError('concurrency must be a positive integer')
+    semaphore = asyncio.Semaphore(concurrency) if concurrency is not None else None
+    return [
+        asyncio.ensure_future(_run_call(index, call, semaphore))
+        for index, call in enumerate(calls)
+    ]
+
+
+async def _cancel_calls(tasks: Sequence[asyncio.Future]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def gather_calls(
+    calls: Iterable[Callable[[], Any]],
+    *,
+    concurrency: int = None,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """
+    Runs the calls concurrently and returns their results in the order of the calls.
+
+    :param concurrency: The maximum number of calls running at once.
+        If not specified, it is limited only by the connection pool.
+    :param return_exceptions: If set, the exceptions raised by the calls are
+        returned in the places of their results.  Otherwise, the first exception
+        is raised after cancelling the remaining calls.
+    """
+    tasks = _schedule_calls(calls, concurrency)
+    try:
+        outcomes = []
+        for task in tasks:
+            outcome = await task
+            if outcome.error is not None and not return_exceptions:
+                raise outcome.error
+            outcomes.append(outcome)
+    finally:
+        await _cancel_calls(tasks)
+    return [
+        outcome.error if outcome.error is not None else outcome.result
+        for outcome in outcomes
+    ]
+
+
+async def iterate_completed_calls(
+    calls: Iterable[Callable[[], Any]],
+    *,
+    concurrency: int = None,
+) -> AsyncIterator[CallOutcome]:
+    """
+    Runs the calls concurrently and yields their outcomes as they complete.
+    Stopping the iteration cancels the remaining calls.
+
+    :param concurrency: The maximum number of calls running at once.
+        If not specified, it is limited only by the connection pool.
+    """
+    tasks = _schedule_calls(calls, concurrency)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        await _cancel_calls(tasks)
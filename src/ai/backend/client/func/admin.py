@@ -1,6 +1,7 @@
 from typing import Any, Mapping, Optional
 
 from .base import api_function, BaseFunction
+from ..batching import GraphQLBatch
 from ..request import Request
 from ..session import api_session
 
@@ -44,3 +45,21 @@ class Admin(BaseFunction):
         rqst.set_json(gql_query)
         async with rqst.fetch() as resp:
             return await resp.json()
+
+    @classmethod
+    def batch(cls) -> GraphQLBatch:
+        """
+        Returns a context manager to send multiple GraphQL queries in a single request.
+        The queries added via its ``query()`` method are sent when the context exits,
+        and their results are retrieved from the returned placeholders.
+
+        .. code-block:: python3
+
+          with session.Admin.batch() as batch:
+            users = batch.query('{ users { email } }')
+            agents = batch.query('{ agents { id } }')
+          print(users.result(), agents.result())
+
+        Use ``async with`` for :class:`~ai.backend.client.session.AsyncSession`.
+        """
+        return GraphQLBatch(api_session.get())
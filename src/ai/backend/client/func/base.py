@@ -1,6 +1,8 @@
 import functools
 import inspect
+import threading
 
+from ..deadline import api_deadline, iterate_with_deadline, run_with_deadline
 from ..session import api_session, AsyncSession
 
 __all__ = (
@@ -17,18 +19,31 @@ def _wrap_method(cls, orig_name, meth):
         # We need to keep the original attributes so that they could be correctly
         # bound to the class/instance at runtime.
         func = getattr(cls, orig_name)
-        coro = func(*args, **kwargs)
-        _api_session = api_session.get()
+        _api_session = api_session.get(None)
         if _api_session is None:
             raise RuntimeError(
                 "API functions must be called "
                 "inside the context of a valid API session"
             )
+        coro = func(*args, **kwargs)
+        expires_at = api_deadline.get()
+        if expires_at is not None:
+            if inspect.isasyncgen(coro):
+                coro = iterate_with_deadline(coro, expires_at)
+            else:
+                coro = run_with_deadline(coro, expires_at)
         if isinstance(_api_session, AsyncSession):
             return coro
+        elif threading.current_thread() is _api_session.worker_thread:
+            # Called inside the sync session's event loop, e.g., via Session.gather().
+            return coro
         else:
             if inspect.isasyncgen(coro):
-                return _api_session.worker_thread.execute_generator(coro)
+                return _api_session.worker_thread.execute_generator(
+                    coro,
+                    prefetch=_api_session.config.sync_generator_prefetch,
+                    owner=_api_session,
+                )
             else:
                 return _api_session.worker_thread.execute(coro)
 
@@ -1,6 +1,7 @@
 from typing import Iterable, Sequence
 
 from .base import api_function, BaseFunction
+from ..cache import CachePolicy, invalidate_cached_responses
 from ..request import Request
 from ..session import api_session
 
@@ -45,7 +46,7 @@ class Image(BaseFunction):
             'query': q,
             'variables': variables,
         })
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=CachePolicy('Image.list', ttl=60, tags={'images'})) as resp:
             data = await resp.json()
         return data['images']
 
@@ -67,6 +68,7 @@ class Image(BaseFunction):
         })
         async with rqst.fetch() as resp:
             data = await resp.json()
+        invalidate_cached_responses('images')
         return data['rescan_images']
 
     @api_function
@@ -88,6 +90,7 @@ class Image(BaseFunction):
         })
         async with rqst.fetch() as resp:
             data = await resp.json()
+        invalidate_cached_responses('images')
         return data['alias_image']
 
     @api_function
@@ -108,6 +111,7 @@ class Image(BaseFunction):
         })
         async with rqst.fetch() as resp:
             data = await resp.json()
+        invalidate_cached_responses('images')
         return data['dealias_image']
 
     @api_function
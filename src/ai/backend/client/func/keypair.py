@@ -10,7 +10,7 @@ from typing import (
 from .base import api_function, BaseFunction
 from ..request import Request
 from ..session import api_session
-from ..pagination import generate_paginated_results
+from ..pagination import PaginationMode, generate_paginated_results
 
 __all__ = (
     'KeyPair',
@@ -178,10 +178,18 @@ class KeyPair(BaseFunction):
         user_id: str = None,
         fields: Sequence[str] = _default_list_fields,
         page_size: int = 20,
+        prefetch: int = 0,
+        concurrency: int = None,
+        pagination_mode: PaginationMode = 'auto',
     ) -> AsyncIterator[dict]:
         """
         Lists the keypairs.
         You need an admin privilege for this operation.
+
+        :param prefetch: The number of pages to fetch in advance.
+        :param concurrency: The number of pages to fetch concurrently at once.
+        :param pagination_mode: ``"cursor"``, ``"offset"``, or ``"auto"`` to use the
+            cursor-based pagination if the server supports it.
         """
         variables = {
             'is_active': (is_active, 'Boolean'),
@@ -194,6 +202,10 @@ class KeyPair(BaseFunction):
             variables,
             fields,
             page_size=page_size,
+            prefetch=prefetch,
+            concurrency=concurrency,
+            cursor_root_field='keypair_nodes',
+            mode=pagination_mode,
         ):
             yield item
 
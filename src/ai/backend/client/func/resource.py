@@ -1,6 +1,7 @@
 from typing import Sequence
 
 from .base import api_function, BaseFunction
+from ..cache import CachePolicy
 from ..request import Request
 from ..session import api_session
 
@@ -21,7 +22,8 @@ class Resource(BaseFunction):
         Lists all resource presets.
         """
         rqst = Request('GET', '/resource/presets')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=CachePolicy('Resource.list', ttl=300,
+                                                tags={'resource-presets'})) as resp:
             return await resp.json()
 
     @api_function
@@ -42,7 +44,7 @@ class Resource(BaseFunction):
         Lists all registered docker registries.
         """
         rqst = Request('GET', '/config/docker-registries')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(coalesce=True) as resp:
             return await resp.json()
 
     @api_function
@@ -89,14 +91,15 @@ class Resource(BaseFunction):
         Get supported resource slots of Backend.AI server.
         """
         rqst = Request('GET', '/config/resource-slots')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(coalesce=True) as resp:
             return await resp.json()
 
     @api_function
     @classmethod
     async def get_vfolder_types(cls):
         rqst = Request('GET', '/config/vfolder-types')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=CachePolicy('Resource.get_vfolder_types', ttl=3600,
+                                                tags={'vfolder-types'})) as resp:
             return await resp.json()
 
     @api_function
@@ -3,7 +3,6 @@ from __future__ import annotations
 import json
 import os
 import secrets
-import tarfile
 import tempfile
 from typing import (
     Any, Iterable, Optional, Union,
@@ -16,13 +15,12 @@ from pathlib import Path
 
 import aiohttp
 from aiohttp import hdrs
-from tqdm import tqdm
 
 from .base import api_function, BaseFunction
 from ..compat import current_loop
 from ..config import DEFAULT_CHUNK_SIZE
 from ..exceptions import BackendClientError
-from ..pagination import generate_paginated_results
+from ..pagination import PaginationMode, generate_paginated_results
 from ..request import (
     Request, AttachedFile,
     WebSocketResponse,
@@ -82,12 +80,19 @@ class ComputeSession(BaseFunction):
         *,
         fields: Sequence[str] = None,
         page_size: int = 20,
+        prefetch: int = 0,
+        concurrency: int = None,
+        pagination_mode: PaginationMode = 'auto',
     ) -> AsyncIterator[dict]:
         """
         Fetches the list of users. Domain admins can only get domain users.
 
         :param is_active: Fetches active or inactive users only if not None.
         :param fields: Additional per-user query fields to fetch.
+        :param prefetch: The number of pages to fetch in advance.
+        :param concurrency: The number of pages to fetch concurrently at once.
+        :param pagination_mode: ``"cursor"``, ``"offset"``, or ``"auto"`` to use the
+            cursor-based pagination if the server supports it.
         """
         if fields is None:
             fields = [
@@ -107,6 +112,10 @@ class ComputeSession(BaseFunction):
             },
             fields,
             page_size=page_size,
+            prefetch=prefetch,
+            concurrency=concurrency,
+            cursor_root_field='compute_session_nodes',
+            mode=pagination_mode,
         ):
             yield item
 
@@ -236,6 +245,9 @@ class ComputeSession(BaseFunction):
         mounts.extend(api_session.get().config.vfolder_mounts)
         prefix = get_naming(api_session.get().api_version, 'path')
         rqst = Request('POST', f'/{prefix}')
+        if not no_reuse:
+            # Replaying the request returns the session created by the first one.
+            rqst.set_idempotency_key()
         params: Dict[str, Any] = {
             'tag': tag,
             get_naming(api_session.get().api_version, 'name_arg'): name,
@@ -384,6 +396,9 @@ class ComputeSession(BaseFunction):
             mounts.extend(api_session.get().config.vfolder_mounts)
         prefix = get_naming(api_session.get().api_version, 'path')
         rqst = Request('POST', f'/{prefix}/_/create-from-template')
+        if name is not undefined and no_reuse is not True:
+            # Replaying the request returns the session created by the first one.
+            rqst.set_idempotency_key()
         params: Dict[str, Any]
         params = {
             'template_id': template_id,
@@ -533,7 +548,7 @@ class ComputeSession(BaseFunction):
             'GET', f'/{prefix}/{self.name}',
             params=params,
         )
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(coalesce=True) as resp:
             return await resp.json()
 
     @api_function
@@ -666,6 +681,7 @@ class ComputeSession(BaseFunction):
         total_size = 0
         for file_path in files:
             total_size += Path(file_path).stat().st_size
+        from tqdm import tqdm
         tqdm_obj = tqdm(desc='Uploading files',
                         unit='bytes', unit_scale=True,
                         total=total_size,
@@ -717,6 +733,9 @@ class ComputeSession(BaseFunction):
         rqst.set_json({
             'files': [*map(str, files)],
         })
+        # These are needed only for the downloads.
+        import tarfile
+        from tqdm import tqdm
         file_names = []
         async with rqst.fetch() as resp:
             loop = current_loop()
@@ -1,6 +1,7 @@
 from typing import Any, List, Mapping
 
 from .base import api_function, BaseFunction
+from ..cache import CachePolicy, invalidate_cached_responses
 from ..request import Request
 from ..session import api_session
 
@@ -34,7 +35,8 @@ class SessionTemplate(BaseFunction):
         rqst.set_json(body)
         async with rqst.fetch() as resp:
             response = await resp.json()
-            return cls(response['id'], owner_access_key=owner_access_key)
+        invalidate_cached_responses('session-templates')
+        return cls(response['id'], owner_access_key=owner_access_key)
 
     @api_function
     @classmethod
@@ -55,7 +57,8 @@ class SessionTemplate(BaseFunction):
             params['owner_access_key'] = self.owner_access_key
         rqst = Request('GET', f'/template/session/{self.template_id}',
                        params=params)
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=CachePolicy('SessionTemplate.get', ttl=60,
+                                                tags={'session-templates'})) as resp:
             data = await resp.text()
         return data
 
@@ -69,7 +72,9 @@ class SessionTemplate(BaseFunction):
         rqst = Request('PUT', f'/template/session/{self.template_id}')
         rqst.set_json(body)
         async with rqst.fetch() as resp:
-            return await resp.json()
+            data = await resp.json()
+        invalidate_cached_responses('session-templates')
+        return data
 
     @api_function
     async def delete(self) -> Any:
@@ -79,4 +84,6 @@ class SessionTemplate(BaseFunction):
         rqst = Request('DELETE', f'/template/session/{self.template_id}',
                        params=params)
         async with rqst.fetch() as resp:
-            return await resp.json()
+            data = await resp.json()
+        invalidate_cached_responses('session-templates')
+        return data
@@ -1,6 +1,7 @@
 from typing import Mapping
 
 from .base import api_function, BaseFunction
+from ..cache import CachePolicy
 from ..request import Request
 from ..session import api_session
 
@@ -8,6 +9,8 @@ __all__ = (
     'System',
 )
 
+_versions_cache_policy = CachePolicy('System.get_versions', ttl=600, tags={'system'})
+
 
 class System(BaseFunction):
     """
@@ -18,14 +21,14 @@ class System(BaseFunction):
     @classmethod
     async def get_versions(cls) -> Mapping[str, str]:
         rqst = Request('GET', '/')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=_versions_cache_policy) as resp:
             return await resp.json()
 
     @api_function
     @classmethod
     async def get_manager_version(cls) -> str:
         rqst = Request('GET', '/')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=_versions_cache_policy) as resp:
             ret = await resp.json()
             return ret['manager']
 
@@ -33,6 +36,6 @@ class System(BaseFunction):
     @classmethod
     async def get_api_version(cls) -> str:
         rqst = Request('GET', '/')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=_versions_cache_policy) as resp:
             ret = await resp.json()
             return ret['version']
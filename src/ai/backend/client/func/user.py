@@ -6,7 +6,7 @@ from .base import api_function, BaseFunction
 from ..auth import AuthToken, AuthTokenTypes
 from ..request import Request
 from ..session import api_session
-from ..pagination import generate_paginated_results
+from ..pagination import PaginationMode, generate_paginated_results
 
 __all__ = (
     'User',
@@ -99,6 +99,9 @@ class User(BaseFunction):
         *,
         fields: Sequence[str] = _default_list_fields,
         page_size: int = 20,
+        prefetch: int = 0,
+        concurrency: int = None,
+        pagination_mode: PaginationMode = 'auto',
     ) -> AsyncIterator[dict]:
         """
         Fetches the list of users. Domain admins can only get domain users.
@@ -107,6 +110,10 @@ class User(BaseFunction):
                        (active, inactive, deleted, before-verification).
         :param group: Fetch users in a specific group.
         :param fields: Additional per-user query fields to fetch.
+        :param prefetch: The number of pages to fetch in advance.
+        :param concurrency: The number of pages to fetch concurrently at once.
+        :param pagination_mode: ``"cursor"``, ``"offset"``, or ``"auto"`` to use the
+            cursor-based pagination if the server supports it.
         """
         async for item in generate_paginated_results(
             'user_list',
@@ -116,6 +123,10 @@ class User(BaseFunction):
             },
             fields,
             page_size=page_size,
+            prefetch=prefetch,
+            concurrency=concurrency,
+            cursor_root_field='user_nodes',
+            mode=pagination_mode,
         ):
             yield item
 
@@ -6,15 +6,13 @@ from typing import (
 )
 
 import aiohttp
-import janus
-from tqdm import tqdm
-
 from yarl import URL
-from aiotusclient import client
 
 from .base import api_function, BaseFunction
+from ..cache import CachePolicy
 from ..compat import current_loop
 from ..config import DEFAULT_CHUNK_SIZE, MAX_INFLIGHT_CHUNKS
+from ..deadline import check_deadline
 from ..request import Request
 from ..session import api_session
 
@@ -71,21 +69,22 @@ class VFolder(BaseFunction):
     @classmethod
     async def list_hosts(cls):
         rqst = Request('GET', '/folders/_/hosts')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(coalesce=True) as resp:
             return await resp.json()
 
     @api_function
     @classmethod
     async def list_all_hosts(cls):
         rqst = Request('GET', '/folders/_/all_hosts')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(coalesce=True) as resp:
             return await resp.json()
 
     @api_function
     @classmethod
     async def list_allowed_types(cls):
         rqst = Request('GET', '/folders/_/allowed_types')
-        async with rqst.fetch() as resp:
+        async with rqst.fetch(cache=CachePolicy('VFolder.list_allowed_types', ttl=3600,
+                                                tags={'vfolder-types'})) as resp:
             return await resp.json()
 
     @api_function
@@ -119,8 +118,12 @@ class VFolder(BaseFunction):
         chunk_size: int = DEFAULT_CHUNK_SIZE,
         show_progress: bool = False,
     ) -> None:
+        # Import the file transfer dependencies only when used, to keep the package import fast.
+        import janus
+        from tqdm import tqdm
         base_path = (Path.cwd() if basedir is None else Path(basedir).resolve())
         for relpath in relative_paths:
+            check_deadline()
             file_path = base_path / relpath
             rqst = Request('POST',
                            '/folders/{}/request-download'.format(self.name))
@@ -183,12 +186,14 @@ class VFolder(BaseFunction):
         chunk_size: int = DEFAULT_CHUNK_SIZE,
         show_progress: bool = False,
     ) -> None:
+        from aiotusclient import client
         base_path = (Path.cwd() if basedir is None else Path(basedir).resolve())
         if basedir:
             files = [basedir / Path(file) for file in files]
         else:
             files = [Path(file).resolve() for file in files]
         for file_path in files:
+            check_deadline()
             file_size = Path(file_path).stat().st_size
             rqst = Request('POST',
                            '/folders/{}/request-upload'.format(self.name))
@@ -0,0 +1,96 @@
+"""
+Provides the bookkeeping of hedged requests.
+
+When an idempotent request has not been answered within the hedging delay,
+a duplicate is sent to another endpoint and the first response is taken.
+The delay is either fixed or the observed 95th percentile of the response
+latency, so that only the slowest 5% of requests are duplicated.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import math
+from typing import (
+    Deque,
+    Optional,
+)
+
+import attr
+
+__all__ = (
+    'HedgingStats',
+    'LatencyTracker',
+    'RequestHedger',
+)
+
+
+@attr.s(auto_attribs=True, slots=True)
+class HedgingStats:
+    requests: int = 0   # the number of hedgeable requests
+    fired: int = 0      # the number of requests which sent a duplicate
+    won: int = 0        # the number of requests answered by the duplicate first
+
+
+class LatencyTracker:
+    """
+    Keeps the recent latency samples to estimate their percentiles.
+    """
+
+    __slots__ = ('_samples', )
+
+    _samples: Deque[float]
+
+    def __init__(self, max_samples: int = 256) -> None:
+        self._samples = deque(maxlen=max_samples)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Returns the *q*-th quantile (0 to 1) of the samples,
+        or ``None`` if there are no samples.
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+
+class RequestHedger:
+    """
+    Determines the hedging delay and counts the hedged requests of a session.
+
+    :param delay: The fixed number of seconds to wait before sending a duplicate.
+        If ``None``, the 95th percentile of the observed latency is used.
+    :param initial_delay: The delay used until enough latency samples are collected.
+    :param min_samples: The number of latency samples required to use the percentile.
+    """
+
+    __slots__ = ('_delay', '_initial_delay', '_min_samples', 'latency', 'stats')
+
+    def __init__(
+        self,
+        delay: float = None, *,
+        initial_delay: float = 1.0,
+        min_samples: int = 20,
+    ) -> None:
+        self._delay = delay
+        self._initial_delay = initial_delay
+        self._min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.stats = HedgingStats()
+
+    def get_delay(self) -> float:
+        if self._delay is not None:
+            return self._delay
+        if len(self.latency) < self._min_samples:
+            return self._initial_delay
+        p95 = self.latency.percentile(0.95)
+        assert p95 is not None
+        return p95
@@ -1,39 +1,66 @@
+import asyncio
+from collections import deque
+import functools
+import re
 import textwrap
 from typing import (
     cast,
     Any,
     AsyncIterator,
+    Deque,
+    Dict,
     Mapping,
+    Optional,
+    Pattern,
     Sequence,
     Tuple,
 )
 from typing_extensions import (  # for Python 3.7
     Final,
+    Literal,
     TypedDict,
 )
 
-from .exceptions import NoItems
+from .deadline import check_deadline
+from .exceptions import BackendAPIError, NoItems
+from .persisted import (
+    PersistedQueryRegistry,
+    get_persisted_query_error,
+    get_query_hash,
+    make_persisted_query_extension,
+)
+from .records import RecordTable
 from .session import api_session
 from .request import Request
 
 MAX_PAGE_SIZE: Final = 100
 
 
+PaginationMode = Literal['auto', 'cursor', 'offset']
+
+
 class PaginatedResult(TypedDict):
     total_count: int
     items: Sequence[Any]
 
 
-async def execute_paginated_query(
+class CursorPaginatedResult(TypedDict):
+    total_count: int
+    items: Sequence[Any]
+    end_cursor: Optional[str]
+    has_next_page: bool
+
+
+@functools.lru_cache(maxsize=256)
+def _build_paginated_query(
     root_field: str,
-    variables: Mapping[str, Tuple[Any, str]],
-    fields: Sequence[str],
-    *,
-    limit: int,
-    offset: int,
-) -> PaginatedResult:
-    if limit > MAX_PAGE_SIZE:
-        raise ValueError(f"The page size cannot exceed {MAX_PAGE_SIZE}")
+    var_signature: Tuple[Tuple[str, str], ...],
+    fields: Tuple[str, ...],
+) -> Tuple[str, str]:
+    """
+    Returns the query text and its hash for the given root field,
+    the names and types of the variables, and the fields.
+    """
     query = '''
     query($limit:Int!, $offset:Int!, $var_decls) {
       $root_field(
@@ -46,50 +73,412 @@ async def execute_paginated_query(
     query = query.replace('$fields', ' '.join(fields))
     query = query.replace(
         '$var_decls',
-        ', '.join(f'${key}: {value[1]}'
-                  for key, value in variables.items()),
+        ', '.join(f'${key}: {type_}'
+                  for key, type_ in var_signature),
     )
     query = query.replace(
         '$var_args',
         ', '.join(f'{key}:${key}'
-                  for key in variables.keys())
+                  for key, _ in var_signature)
     )
     query = textwrap.dedent(query).strip()
+    return query, get_query_hash(query)
+
+
+@functools.lru_cache(maxsize=256)
+def _build_cursor_paginated_query(
+    root_field: str,
+    var_signature: Tuple[Tuple[str, str], ...],
+    fields: Tuple[str, ...],
+) -> Tuple[str, str]:
+    """
+    Returns the query text and its hash of a Relay-style connection
+    for the given root field, the names and types of the variables, and the fields.
+    """
+    query = '''
+    query($first:Int!, $after:String, $var_decls) {
+      $root_field(
+          first:$first, after:$after, $var_args) {
+        edges { cursor node { $fields } }
+        pageInfo { endCursor hasNextPage }
+        count
+      }
+    }'''
+    query = query.replace('$root_field', root_field)
+    query = query.replace('$fields', ' '.join(fields))
+    query = query.replace(
+        '$var_decls',
+        ', '.join(f'${key}: {type_}'
+                  for key, type_ in var_signature),
+    )
+    query = query.replace(
+        '$var_args',
+        ', '.join(f'{key}:${key}'
+                  for key, _ in var_signature)
+    )
+    query = textwrap.dedent(query).strip()
+    return query, get_query_hash(query)
+
+
+async def _send_query(payload: Mapping[str, Any]) -> Any:
+    rqst = Request('POST', '/admin/graphql')
+    rqst.set_json(payload)
+    # Merging the query with others would lose the persisted query extension.
+    async with rqst.fetch(batch='extensions' not in payload) as resp:
+        return await resp.json()
+
+
+async def _send_persisted_query(
+    registry: PersistedQueryRegistry,
+    query: str,
+    query_hash: str,
+    variables: Mapping[str, Any],
+) -> Any:
+    if registry.is_registered(query_hash):
+        registry.stats.hash_only += 1
+        try:
+            data = await _send_query({
+                'variables': variables,
+                'extensions': make_persisted_query_extension(query_hash),
+            })
+            error = get_persisted_query_error(data)
+        except BackendAPIError as e:
+            if e.status // 100 != 4:
+                raise
+            error = get_persisted_query_error(e.data) or 'not-supported'
+        if error is None:
+            return data
+        registry.stats.misses += 1
+        if error == 'not-found':
+            registry.forget(query_hash)
+        else:
+            registry.disable()
+    payload: Dict[str, Any] = {
+        'query': query,
+        'variables': variables,
+    }
+    if registry.supported:
+        payload['extensions'] = make_persisted_query_extension(query_hash)
+    registry.stats.full_text += 1
+    data = await _send_query(payload)
+    if registry.supported:
+        registry.register(query_hash)
+    return data
+
+
+async def execute_paginated_query(
+    root_field: str,
+    variables: Mapping[str, Tuple[Any, str]],
+    fields: Sequence[str],
+    *,
+    limit: int,
+    offset: int,
+) -> PaginatedResult:
+    if limit > MAX_PAGE_SIZE:
+        raise ValueError(f"The page size cannot exceed {MAX_PAGE_SIZE}")
+    query, query_hash = _build_paginated_query(
+        root_field,
+        tuple((key, value[1]) for key, value in variables.items()),
+        tuple(fields),
+    )
     var_values = {key: value[0] for key, value in variables.items()}
     var_values['limit'] = limit
     var_values['offset'] = offset
-    rqst = Request('POST', '/admin/graphql')
-    rqst.set_json({
-        'query': query,
-        'variables': var_values,
-    })
-    async with rqst.fetch() as resp:
-        data = await resp.json()
+    data = await _execute_query(query, query_hash, var_values)
     return cast(PaginatedResult, data[root_field])
 
 
+async def execute_cursor_paginated_query(
+    root_field: str,
+    variables: Mapping[str, Tuple[Any, str]],
+    fields: Sequence[str],
+    *,
+    first: int,
+    after: Optional[str] = None,
+) -> CursorPaginatedResult:
+    """
+    Fetches a page of the Relay-style connection *root_field* after the opaque
+    cursor *after*.  Unlike the offset-based pages, the pages are not shifted by
+    the items inserted or deleted in the middle of the iteration.
+    """
+    if first > MAX_PAGE_SIZE:
+        raise ValueError(f"The page size cannot exceed {MAX_PAGE_SIZE}")
+    query, query_hash = _build_cursor_paginated_query(
+        root_field,
+        tuple((key, value[1]) for key, value in variables.items()),
+        tuple(fields),
+    )
+    var_values = {key: value[0] for key, value in variables.items()}
+    var_values['first'] = first
+    var_values['after'] = after
+    data = await _execute_query(query, query_hash, var_values)
+    connection = data.get(root_field) if isinstance(data, dict) else None
+    if connection is None:
+        # The query is not rejected by the HTTP status but has errors.
+        raise BackendAPIError(400, 'Bad Request', data)
+    return {
+        'total_count': connection['count'],
+        'items': [edge['node'] for edge in connection['edges']],
+        'end_cursor': connection['pageInfo']['endCursor'],
+        'has_next_page': connection['pageInfo']['hasNextPage'],
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def _get_unsupported_field_patterns(field: str) -> Tuple[Pattern[str], ...]:
+    # graphql-core 2 quotes the names with double quotes and graphql-core 3 with
+    # single quotes, also prefixing the field name with its parent type.
+    q = '["\']'
+    name = rf'(?:\w+\.)?{re.escape(field)}'
+    return (
+        # e.g., Cannot query field "user_nodes" on type "Queries".
+        re.compile(rf'Cannot query field {q}{name}{q}'),
+        # e.g., Unknown argument "status" on field "user_nodes" of type "Queries".
+        re.compile(rf'Unknown argument {q}\w+{q} on field {q}{name}{q}'),
+        # e.g., Field "user_nodes" argument "filter" of type "String!" is required, ...
+        re.compile(rf'Field {q}{name}{q} argument {q}\w+{q} of type .+ is required'),
+        # e.g., Variable "$status" of type "String" used in position expecting type "UserStatus".
+        re.compile(rf'Variable {q}\$\w+{q} of type .+ used in position expecting'),
+    )
+
+
+def _is_unsupported_field_error(data: Any, field: str) -> bool:
+    """
+    Checks if the error data reports that the server's schema does not have
+    the given root field or that the field does not take the arguments
+    as this client passes them.
+    """
+    if not isinstance(data, dict):
+        return False
+    messages = [data.get('msg')]
+    errors = data.get('errors')
+    if isinstance(errors, list):
+        messages.extend(error.get('message') for error in errors if isinstance(error, dict))
+    patterns = _get_unsupported_field_patterns(field)
+    return any(
+        isinstance(message, str) and any(pattern.search(message) for pattern in patterns)
+        for message in messages
+    )
+
+
+async def _execute_query(query: str, query_hash: str, var_values: Mapping[str, Any]) -> Any:
+    registry = api_session.get().persisted_queries
+    if registry is None:
+        return await _send_query({
+            'query': query,
+            'variables': var_values,
+        })
+    return await _send_persisted_query(registry, query, query_hash, var_values)
+
+
+async def _iterate_cursor_pages(
+    root_field: str,
+    variables: Mapping[str, Tuple[Any, str]],
+    fields: Sequence[str],
+    result: CursorPaginatedResult,
+    *,
+    page_size: int,
+    prefetch: int,
+) -> AsyncIterator[Any]:
+    async def _fetch_page(after: Optional[str]) -> CursorPaginatedResult:
+        check_deadline()
+        return await execute_cursor_paginated_query(
+            root_field, variables, fields,
+            first=page_size, after=after,
+        )
+
+    next_page: Optional[asyncio.Future[CursorPaginatedResult]] = None
+    try:
+        while True:
+            # The next page can be requested in advance as soon as its cursor is known.
+            if prefetch > 0 and result['has_next_page']:
+                next_page = asyncio.ensure_future(_fetch_page(result['end_cursor']))
+            for item in result['items']:
+                yield item
+            if next_page is not None:
+                result = await next_page
+                next_page = None
+            elif result['has_next_page']:
+                result = await _fetch_page(result['end_cursor'])
+            else:
+                break
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+            await asyncio.gather(next_page, return_exceptions=True)
+
+
+async def generate_cursor_paginated_results(
+    root_field: str,
+    variables: Mapping[str, Tuple[Any, str]],
+    fields: Sequence[str],
+    *,
+    page_size: int,
+    prefetch: int = 0,
+) -> AsyncIterator[Any]:
+    """
+    Iterates over the items of a Relay-style connection using the opaque cursors.
+
+    :param prefetch: If positive, fetches the next page in advance while the items
+        of the current page are consumed.  Since each page depends on the cursor of
+        the previous one, at most one page is fetched in advance.
+    """
+    check_deadline()
+    result = await execute_cursor_paginated_query(
+        root_field, variables, fields,
+        first=page_size,
+    )
+    if result['total_count'] == 0:
+        raise NoItems
+    async for item in _iterate_cursor_pages(
+        root_field, variables, fields, result,
+        page_size=page_size, prefetch=prefetch,
+    ):
+        yield item
+
+
 async def generate_paginated_results(
     root_field: str,
     variables: Mapping[str, Tuple[Any, str]],
     fields: Sequence[str],
     *,
     page_size: int,
+    prefetch: int = 0,
+    concurrency: int = None,
+    cursor_root_field: str = None,
+    mode: PaginationMode = 'auto',
 ) -> AsyncIterator[Any]:
+    """
+    Iterates over the items of a paginated GraphQL query.
+
+    :param cursor_root_field: The root field of the Relay-style connection serving
+        the same items with the cursor-based pagination.
+    :param mode: ``"cursor"`` to iterate over *cursor_root_field* using the cursors,
+        ``"offset"`` to iterate over *root_field* using the offsets, or ``"auto"``
+        to use the cursors if the server supports them and fall back to the offsets
+        otherwise.  The support is checked once per session by the first page.
+
+    :param prefetch: The number of subsequent pages to fetch in advance
+        while the items of the current page are consumed.
+    :param concurrency: If set, fetches all remaining pages at once as soon as
+        the total count is known, with up to this number of concurrent requests.
+        The fetched pages are buffered until consumed, so use it for
+        non-interactive consumers such as exports.  The offset-based pagination is
+        used in this case unless *mode* is ``"cursor"``.
+
+    Regardless of the options, the items are yielded in order.
+    """
     if page_size > MAX_PAGE_SIZE:
         raise ValueError(f"The page size cannot exceed {MAX_PAGE_SIZE}")
-    offset = 0
-    total_count = -1
-    while True:
-        limit = page_size
-        result = await execute_paginated_query(
+    if prefetch < 0:
+        raise ValueError("The prefetch depth must not be negative")
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("The concurrency must be a positive integer")
+    if cursor_root_field is None:
+        if mode == 'cursor':
+            raise ValueError("The cursor-based pagination requires cursor_root_field")
+        mode = 'offset'
+    elif mode == 'auto' and concurrency is not None:
+        mode = 'offset'
+    if mode != 'offset':
+        assert cursor_root_field is not None
+        features = api_session.get().server_features
+        feature_key = f'cursor-pagination:{cursor_root_field}'
+        if mode == 'cursor' or features.get(feature_key, True):
+            check_deadline()
+            try:
+                cursor_result = await execute_cursor_paginated_query(
+                    cursor_root_field, variables, fields,
+                    first=page_size,
+                )
+            except BackendAPIError as e:
+                if (
+                    mode == 'cursor' or e.status != 400 or
+                    not _is_unsupported_field_error(e.data, cursor_root_field)
+                ):
+                    raise
+                # The server does not know the connection field
+                # or its arguments differ from those of the offset-based field.
+                features[feature_key] = False
+            else:
+                features[feature_key] = True
+                if cursor_result['total_count'] == 0:
+                    raise NoItems
+                async for item in _iterate_cursor_pages(
+                    cursor_root_field, variables, fields, cursor_result,
+                    page_size=page_size, prefetch=prefetch,
+                ):
+                    yield item
+                return
+    semaphore = asyncio.Semaphore(concurrency) if concurrency is not None else None
+
+    async def _fetch_page(offset: int) -> PaginatedResult:
+        check_deadline()
+        if semaphore is None:
+            return await execute_paginated_query(
+                root_field, variables, fields,
+                limit=page_size, offset=offset,
+            )
+        async with semaphore:
+            return await execute_paginated_query(
+                root_field, variables, fields,
+                limit=page_size, offset=offset,
+            )
+
+    result = await _fetch_page(0)
+    total_count = result['total_count']
+    if total_count == 0:
+        raise NoItems
+    offset = page_size
+    pending_pages: Deque[asyncio.Future[PaginatedResult]] = deque()
+    try:
+        while True:
+            # Request the next pages before yielding the items
+            # so that they are fetched while the consumer processes the items.
+            while offset < total_count and (
+                concurrency is not None or len(pending_pages) < prefetch
+            ):
+                pending_pages.append(asyncio.ensure_future(_fetch_page(offset)))
+                offset += page_size
+            for item in result['items']:
+                yield item
+            if pending_pages:
+                result = await pending_pages.popleft()
+            elif offset < total_count:
+                result = await _fetch_page(offset)
+                offset += page_size
+            else:
+                break
+            total_count = result['total_count']
+    finally:
+        for fut in pending_pages:
+            fut.cancel()
+        if pending_pages:
+            await asyncio.gather(*pending_pages, return_exceptions=True)
+
+
+async def collect_paginated_results(
+    root_field: str,
+    variables: Mapping[str, Tuple[Any, str]],
+    fields: Sequence[str],
+    *,
+    page_size: int,
+    **kwargs,
+) -> RecordTable:
+    """
+    Collects all items of a paginated GraphQL query into
+    a :class:`~ai.backend.client.records.RecordTable`, which takes much less
+    memory than the list of items for large listings.
+    The other keyword arguments are the same as :func:`generate_paginated_results`.
+    Returns an empty table if there are no items.
+    """
+    table = RecordTable(fields)
+    try:
+        await table.extend_async(generate_paginated_results(
             root_field, variables, fields,
-            limit=limit, offset=offset,
-        )
-        offset += page_size
-        total_count = result['total_count']
-        if total_count == 0:
-            raise NoItems
-        for item in result['items']:
-            yield item
-        if offset >= total_count:
-            break
+            page_size=page_size,
+            **kwargs,
+        ))
+    except NoItems:
+        pass
+    return table
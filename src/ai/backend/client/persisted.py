@@ -0,0 +1,109 @@
+"""
+Provides the client-side bookkeeping of persisted GraphQL queries.
+
+Following the automatic persisted query protocol, a query is sent with its
+SHA-256 hash in the ``extensions.persistedQuery`` field of the request body.
+Once the server has seen the full text with the hash, subsequent requests may
+send the hash only, reducing the request size of repeated queries such as
+the pages of a paginated listing.  If the server does not recognize the hash,
+the client falls back to sending the full text again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Set,
+)
+
+import attr
+
+__all__ = (
+    'get_query_hash',
+    'make_persisted_query_extension',
+    'get_persisted_query_error',
+    'PersistedQueryStats',
+    'PersistedQueryRegistry',
+)
+
+_NOT_FOUND_ERRORS = frozenset(['PersistedQueryNotFound', 'PERSISTED_QUERY_NOT_FOUND'])
+_NOT_SUPPORTED_ERRORS = frozenset(['PersistedQueryNotSupported', 'PERSISTED_QUERY_NOT_SUPPORTED'])
+
+
+def get_query_hash(query: str) -> str:
+    return hashlib.sha256(query.encode('utf8')).hexdigest()
+
+
+def make_persisted_query_extension(query_hash: str) -> Dict[str, Any]:
+    return {
+        'persistedQuery': {
+            'version': 1,
+            'sha256Hash': query_hash,
+        },
+    }
+
+
+def get_persisted_query_error(data: Any) -> Optional[str]:
+    """
+    Returns ``"not-found"`` or ``"not-supported"`` if the response data (or the
+    error data) reports that the server could not resolve a persisted query.
+    """
+    errors = data.get('errors') if isinstance(data, dict) else None
+    if not isinstance(errors, list):
+        return None
+    for error in errors:
+        if not isinstance(error, dict):
+            continue
+        extensions = error.get('extensions')
+        codes = {error.get('message'), extensions.get('code') if isinstance(extensions, dict) else None}
+        if codes & _NOT_FOUND_ERRORS:
+            return 'not-found'
+        if codes & _NOT_SUPPORTED_ERRORS:
+            return 'not-supported'
+    return None
+
+
+@attr.s(auto_attribs=True, slots=True)
+class PersistedQueryStats:
+    hash_only: int = 0      # the number of requests sent with the hash only
+    full_text: int = 0      # the number of requests sent with the full text
+    misses: int = 0         # the number of hashes not recognized by the server
+
+
+class PersistedQueryRegistry:
+    """
+    Keeps the hashes of the queries which the server has seen in a session.
+
+    :param max_entries: The maximum number of hashes to remember.
+    """
+
+    __slots__ = ('_max_entries', '_registered', 'supported', 'stats')
+
+    _registered: Set[str]
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._max_entries = max_entries
+        self._registered = set()
+        self.supported = True
+        self.stats = PersistedQueryStats()
+
+    def is_registered(self, query_hash: str) -> bool:
+        return self.supported and query_hash in self._registered
+
+    def register(self, query_hash: str) -> None:
+        if len(self._registered) >= self._max_entries:
+            self._registered.clear()
+        self._registered.add(query_hash)
+
+    def forget(self, query_hash: str) -> None:
+        self._registered.discard(query_hash)
+
+    def disable(self) -> None:
+        """
+        Stops sending the hashes because the server does not support them.
+        """
+        self.supported = False
+        self._registered.clear()
@@ -0,0 +1,237 @@
+"""
+Manages the HTTP connection pools used by the API sessions.
+
+By default each session owns a private connection pool which is closed
+together with the session.  If :attr:`APIConfig.share_connection_pool
+<ai.backend.client.config.APIConfig.share_connection_pool>` is set, the
+sessions running on the same event loop with the same pool settings share
+a single process-wide connection pool, so that short-lived sessions can reuse
+the keep-alive connections and TLS sessions established by the previous ones.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ssl
+import threading
+from types import SimpleNamespace
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import weakref
+
+import aiohttp
+import attr
+
+from .config import APIConfig
+
+__all__ = (
+    'ConnectionPool',
+    'ConnectionPoolStats',
+    'acquire_connection_pool',
+    'release_connection_pool',
+    'close_shared_pools',
+    'get_shared_pool_stats',
+)
+
+_PoolKey = Tuple[bool, int, int, float, int]
+
+_shared_pools: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    Dict[_PoolKey, ConnectionPool],
+] = weakref.WeakKeyDictionary()
+_shared_pools_lock = threading.Lock()
+_default_ssl_context: Optional[ssl.SSLContext] = None
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
+class ConnectionPoolStats:
+    """
+    A snapshot of the utilization counters of a connection pool.
+    """
+    shared: bool
+    sessions: int    # the number of sessions currently using the pool
+    limit: int
+    limit_per_host: int
+    acquired: int    # the number of connections currently serving requests
+    idle: int        # the number of keep-alive connections waiting for reuse
+    created: int     # the cumulative number of newly established connections
+    reused: int      # the cumulative number of requests served by keep-alive connections
+    queued: int      # the cumulative number of requests that waited for a free connection
+
+
+class ConnectionPool:
+    """
+    Wraps an :class:`aiohttp.TCPConnector` with the utilization counters.
+    """
+
+    __slots__ = (
+        'key', 'connector', 'shared', 'sessions',
+        'created', 'reused', 'queued',
+        'trace_config',
+    )
+
+    def __init__(self, key: _PoolKey, connector: aiohttp.TCPConnector, *, shared: bool) -> None:
+        self.key = key
+        self.connector = connector
+        self.shared = shared
+        self.sessions = 0
+        self.created = 0
+        self.reused = 0
+        self.queued = 0
+        trace_config = aiohttp.TraceConfig()
+        # aiohttp 3.8 declares the trace signals for aiosignal < 1.4,
+        # whose Signal type is parameterized differently in the later versions.
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)  # type: ignore
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)  # type: ignore
+        trace_config.on_connection_queued_start.append(self._on_connection_queued_start)  # type: ignore
+        trace_config.freeze()
+        self.trace_config = trace_config
+
+    async def _on_connection_create_end(
+        self,
+        session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        self.created += 1
+
+    async def _on_connection_reuseconn(
+        self,
+        session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceConnectionReuseconnParams,
+    ) -> None:
+        self.reused += 1
+
+    async def _on_connection_queued_start(
+        self,
+        session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceConnectionQueuedStartParams,
+    ) -> None:
+        self.queued += 1
+
+    def create_session(self, **kwargs) -> aiohttp.ClientSession:
+        self.sessions += 1
+        return aiohttp.ClientSession(
+            connector=self.connector,
+            connector_owner=not self.shared,
+            trace_configs=[self.trace_config],
+            **kwargs,
+        )
+
+    def get_stats(self) -> ConnectionPoolStats:
+        connector = self.connector
+        if connector.closed:
+            acquired = 0
+            idle = 0
+        else:
+            acquired = len(connector._acquired)
+            idle = sum(len(conns) for conns in connector._conns.values())
+        return ConnectionPoolStats(
+            shared=self.shared,
+            sessions=self.sessions,
+            limit=connector.limit,
+            limit_per_host=connector.limit_per_host,
+            acquired=acquired,
+            idle=idle,
+            created=self.created,
+            reused=self.reused,
+            queued=self.queued,
+        )
+
+
+def _get_ssl_context(config: APIConfig) -> Union[bool, ssl.SSLContext]:
+    # Reuse a single verified TLS context across all connectors in the process
+    # instead of letting each connector load the system CA certificates again.
+    global _default_ssl_context
+    if config.skip_sslcert_validation:
+        return False
+    if _default_ssl_context is None:
+        _default_ssl_context = ssl.create_default_context()
+    return _default_ssl_context
+
+
+def _get_pool_key(config: APIConfig) -> _PoolKey:
+    return (
+        config.skip_sslcert_validation,
+        config.max_connections,
+        config.max_connections_per_host,
+        config.keepalive_timeout,
+        config.dns_cache_ttl,
+    )
+
+
+def _create_connector(config: APIConfig) -> aiohttp.TCPConnector:
+    return aiohttp.TCPConnector(
+        ssl=_get_ssl_context(config),
+        limit=config.max_connections,
+        limit_per_host=config.max_connections_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        use_dns_cache=config.dns_cache_ttl > 0,
+        ttl_dns_cache=config.dns_cache_ttl if config.dns_cache_ttl > 0 else None,
+    )
+
+
+def acquire_connection_pool(config: APIConfig, *, shared: Optional[bool] = None) -> ConnectionPool:
+    """
+    Returns a connection pool for a new session using the given configuration.
+    It must be called in the thread running the event loop of the session.
+
+    :param shared: Whether to use the shared pool.  If not specified, it follows
+        :attr:`APIConfig.share_connection_pool
+        <ai.backend.client.config.APIConfig.share_connection_pool>`.
+    """
+    key = _get_pool_key(config)
+    if shared is None:
+        shared = config.share_connection_pool
+    if not shared:
+        return ConnectionPool(key, _create_connector(config), shared=False)
+    loop = asyncio.get_event_loop()
+    with _shared_pools_lock:
+        pools = _shared_pools.setdefault(loop, {})
+        pool = pools.get(key)
+        if pool is None or pool.connector.closed:
+            pool = ConnectionPool(key, _create_connector(config), shared=True)
+            pools[key] = pool
+        return pool
+
+
+def release_connection_pool(pool: ConnectionPool) -> None:
+    """
+    Marks that a session has stopped using the given connection pool.
+    Shared pools are kept open for later sessions until
+    :func:`close_shared_pools` is called.
+    """
+    pool.sessions = max(0, pool.sessions - 1)
+
+
+async def close_shared_pools() -> None:
+    """
+    Closes all shared connection pools bound to the current event loop.
+    Call this before shutting down the event loop when using
+    :attr:`APIConfig.share_connection_pool
+    <ai.backend.client.config.APIConfig.share_connection_pool>`
+    with :class:`~ai.backend.client.session.AsyncSession`.
+    """
+    loop = asyncio.get_event_loop()
+    with _shared_pools_lock:
+        pools = _shared_pools.pop(loop, {})
+    for pool in pools.values():
+        await pool.connector.close()
+
+
+def get_shared_pool_stats() -> List[ConnectionPoolStats]:
+    """
+    Returns the utilization counters of all shared connection pools bound to
+    the current event loop.
+    """
+    loop = asyncio.get_event_loop()
+    with _shared_pools_lock:
+        pools = [*_shared_pools.get(loop, {}).values()]
+    return [pool.get_stats() for pool in pools]
@@ -0,0 +1,174 @@
+"""
+Provides the awareness of the server-side rate limits and a client-side
+token-bucket limiter to pace outgoing requests under them.
+
+The Backend.AI manager limits the number of requests per access key within
+a sliding window, and advertises the budget via the following headers:
+
+* ``X-RateLimit-Limit``: the maximum number of requests in a window
+* ``X-RateLimit-Remaining``: the number of requests left in the current window
+* ``X-RateLimit-Window``: the length of the window in seconds
+
+The IETF-style ``RateLimit-Limit``, ``RateLimit-Remaining`` and
+``RateLimit-Reset`` headers are recognized as well.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import (
+    Mapping,
+    Optional,
+)
+
+import attr
+
+__all__ = (
+    'RateLimitInfo',
+    'RateLimiterStats',
+    'TokenBucketLimiter',
+    'parse_rate_limit_headers',
+)
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
+class RateLimitInfo:
+    limit: Optional[int] = None       # the maximum number of requests in a window
+    remaining: Optional[int] = None   # the number of requests left in the current window
+    window: Optional[float] = None    # the length of the window in seconds
+    reset: Optional[float] = None     # the number of seconds until the budget is replenished
+
+
+def _get_number(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            # Take the first item if multiple policies are listed.
+            return float(value.split(',')[0].split(';')[0].strip())
+        except ValueError:
+            continue
+    return None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> Optional[RateLimitInfo]:
+    """
+    Extracts the rate limit information from the response headers,
+    or returns ``None`` if there is no rate-limit header.
+    """
+    limit = _get_number(headers, 'X-RateLimit-Limit', 'RateLimit-Limit')
+    remaining = _get_number(headers, 'X-RateLimit-Remaining', 'RateLimit-Remaining')
+    window = _get_number(headers, 'X-RateLimit-Window')
+    reset = _get_number(headers, 'X-RateLimit-Reset', 'RateLimit-Reset')
+    if limit is None and remaining is None:
+        return None
+    return RateLimitInfo(
+        limit=int(limit) if limit is not None else None,
+        remaining=int(remaining) if remaining is not None else None,
+        window=window,
+        reset=reset,
+    )
+
+
+@attr.s(auto_attribs=True, slots=True)
+class RateLimiterStats:
+    acquired: int = 0       # the number of requests let through
+    delayed: int = 0        # the number of requests which had to wait
+    wait_time: float = 0.0  # the total seconds spent on waiting
+    throttled: int = 0      # the number of 429 responses received
+
+
+class TokenBucketLimiter:
+    """
+    Paces outgoing requests with a token bucket whose refill rate and capacity
+    follow the budget advertised by the server.  Requests exceeding the budget
+    wait in the FIFO order until the tokens are refilled, instead of being
+    rejected with 429 by the server.
+
+    If the server advertises when its budget is replenished (``RateLimit-Reset``)
+    but not the window length, the refill rate is unknown.  Then the requests
+    wait until the reset time once the server reports the budget exhausted
+    or rejects a request with 429.
+
+    :param rate: The initial number of requests allowed per second.
+        ``None`` means unlimited until the server advertises its limit.
+    :param capacity: The initial maximum number of tokens (the burst size).
+    """
+
+    __slots__ = ('_rate', '_capacity', '_tokens', '_updated_at', '_blocked_until', '_lock', 'stats')
+
+    def __init__(self, rate: float = None, capacity: float = None) -> None:
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else max(1.0, rate or 1.0)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self.stats = RateLimiterStats()
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._rate is not None:
+            elapsed = now - self._updated_at
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Takes a token, waiting until one becomes available.
+        """
+        if self._lock is None:
+            # Create the lock lazily to bind it to the running event loop.
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            waited = 0.0
+            while True:
+                self._refill()
+                delay = self._blocked_until - self._updated_at
+                if delay <= 0:
+                    if self._rate is None or self._tokens >= 1.0:
+                        break
+                    delay = (1.0 - self._tokens) / self._rate
+                await asyncio.sleep(delay)
+                waited += delay
+            if self._rate is not None:
+                self._tokens -= 1.0
+            self.stats.acquired += 1
+            if waited > 0:
+                self.stats.delayed += 1
+                self.stats.wait_time += waited
+
+    def update(self, info: Optional[RateLimitInfo], status: int) -> None:
+        """
+        Adjusts the bucket using the rate limit information of a response.
+        """
+        self._refill()
+        if info is not None:
+            if info.limit is not None and info.limit > 0 and info.limit != self._capacity:
+                if info.window:
+                    self._rate = info.limit / info.window
+                # Start over with the newly advertised budget.
+                self._capacity = float(info.limit)
+                self._tokens = self._capacity
+            if info.remaining is not None:
+                # Never exceed what the server says is left in the current window.
+                self._tokens = min(self._tokens, float(info.remaining))
+        if status == 429:
+            self.stats.throttled += 1
+            self._tokens = min(self._tokens, 0.0)
+        if info is not None and info.reset is not None:
+            exhausted = info.remaining is not None and info.remaining <= 0
+            if status == 429 or (exhausted and self._rate is None):
+                # Hold the requests until the server replenishes the budget.
+                self._blocked_until = max(self._blocked_until, self._updated_at + info.reset)
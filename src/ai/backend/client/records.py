@@ -0,0 +1,194 @@
+"""
+Provides a compact container of the items of large paginated listings.
+
+Each item of a GraphQL listing is decoded as a dict with its own copies of
+the keys' hash table and the repeated string values such as statuses and
+image names.  :class:`RecordTable` instead stores the values of each field in
+a column list sharing the schema built from the requested fields, and
+deduplicates the repeated strings of low-cardinality columns.  The rows are
+accessed via lazy :class:`RecordView` objects, and the columns can be
+converted to NumPy arrays or a pandas DataFrame without going through
+per-row dicts.
+"""
+
+from collections.abc import Mapping as _MappingABC
+from typing import (
+    Any,
+    AsyncIterable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    overload,
+)
+
+__all__ = (
+    'get_field_key',
+    'RecordView',
+    'RecordTable',
+)
+
+
+def get_field_key(field: str) -> str:
+    """
+    Returns the key of the item value of the given GraphQL field,
+    such as ``groups`` of ``groups { id name }``.
+    """
+    return field.split('{', 1)[0].strip()
+
+
+class RecordView(_MappingABC):
+    """
+    A read-only mapping view of a row in :class:`RecordTable`.
+    The values are read from the table's columns on access.
+    """
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'RecordTable', index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table._columns[self._table._key_index[key]][self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.keys)
+
+    def __len__(self) -> int:
+        return len(self._table.keys)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({dict(self)!r})'
+
+
+class RecordTable(Sequence[RecordView]):
+    """
+    Stores the items of a listing column by column.
+
+    :param fields: The GraphQL fields requested for the items.
+        The keys of the nested selections such as ``groups { id name }``
+        become the column names (``groups``).
+    :param max_shared_values: The maximum number of distinct strings to
+        deduplicate per column.  Once a column has more distinct strings
+        (e.g., IDs), its values are stored as they are.
+    """
+
+    __slots__ = ('keys', '_key_index', '_columns', '_shared_values', '_max_shared_values', '_length')
+
+    keys: Tuple[str, ...]
+    _key_index: Dict[str, int]
+    _columns: List[List[Any]]
+    _shared_values: List[Dict[str, str]]
+
+    def __init__(self, fields: Iterable[str], *, max_shared_values: int = 1024) -> None:
+        self.keys = tuple(get_field_key(field) for field in fields)
+        self._key_index = {key: idx for idx, key in enumerate(self.keys)}
+        self._columns = [[] for _ in self.keys]
+        self._shared_values = [{} for _ in self.keys]
+        self._max_shared_values = max_shared_values
+        self._length = 0
+
+    def append(self, item: Mapping[str, Any]) -> None:
+        """
+        Adds an item as a row.  The fields missing in the item are stored as ``None``.
+        """
+        for key, column, shared_values in zip(self.keys, self._columns, self._shared_values):
+            value = item.get(key)
+            if type(value) is str:
+                shared = shared_values.get(value)
+                if shared is not None:
+                    value = shared
+                elif len(shared_values) < self._max_shared_values:
+                    shared_values[value] = value
+            column.append(value)
+        self._length += 1
+
+    def extend(self, items: Iterable[Mapping[str, Any]]) -> 'RecordTable':
+        """
+        Adds all items from the given iterable, such as the result of
+        ``paginated_list()`` in synchronous sessions.
+        """
+        for item in items:
+            self.append(item)
+        return self
+
+    async def extend_async(self, items: AsyncIterable[Mapping[str, Any]]) -> 'RecordTable':
+        """
+        The asynchronous version of :meth:`extend`.
+        """
+        async for item in items:
+            self.append(item)
+        return self
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, index: int) -> RecordView:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[RecordView]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RecordView(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('record index out of range')
+        return RecordView(self, index)
+
+    def __iter__(self) -> Iterator[RecordView]:
+        return (RecordView(self, i) for i in range(self._length))
+
+    def column(self, key: str) -> Sequence[Any]:
+        """
+        Returns the values of the given field in the order of rows.
+        The returned list is shared with the table and must not be modified.
+        """
+        return self._columns[self._key_index[key]]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """
+        Returns the rows as a list of plain dicts.
+        """
+        return [dict(zip(self.keys, values)) for values in zip(*self._columns)]
+
+    def to_numpy(self, key: str, dtype: Any = None) -> Any:
+        """
+        Returns the values of the given field as a NumPy array.
+        The dtype is inferred from the values if not given, and the columns having
+        ``None`` or nested values become object arrays.
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ValueError('The conversion requires the "numpy" package to be installed.')
+        column = self.column(key)
+        if dtype is None and any(value is None or isinstance(value, (dict, list))
+                                 for value in column):
+            dtype = object
+        if dtype is object:
+            # Fill the array one by one to keep the nested lists as the elements.
+            array = numpy.empty(len(column), dtype=object)
+            for idx, value in enumerate(column):
+                array[idx] = value
+            return array
+        return numpy.asarray(column, dtype=dtype)
+
+    def to_pandas(self) -> Any:
+        """
+        Returns the table as a pandas DataFrame whose columns are built
+        directly from the column lists.
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ValueError('The conversion requires the "pandas" package to be installed.')
+        return pandas.DataFrame(dict(zip(self.keys, self._columns)), columns=list(self.keys))
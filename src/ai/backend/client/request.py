@@ -3,23 +3,23 @@ from __future__ import annotations
 import asyncio
 from collections import OrderedDict, namedtuple
 from datetime import datetime
-from decimal import Decimal
 import functools
+import hashlib
 import io
 import logging
-import json as modjson
 from pathlib import Path
 import sys
+import time
+import uuid
 from typing import (
     Any, Callable, Optional, Union,
     Awaitable, AsyncIterator, Type, TypeVar,
-    Mapping, Sequence, List,
+    Dict, Hashable, Mapping, Sequence, List, Tuple,
     cast,
 )
 
 import aiohttp
 from aiohttp.client import _RequestContextManager, _WSRequestContextManager
-import aiohttp.web
 import appdirs
 import attr
 from dateutil.tz import tzutc
@@ -27,8 +27,19 @@ from multidict import CIMultiDict
 from yarl import URL
 
 from .auth import generate_signature
-from .exceptions import BackendClientError, BackendAPIError
+from .batching import ParsedQuery, parse_query
+from .cache import CachePolicy
+from .codec import ExtendedJSONEncoder  # noqa: F401 (for backward compatibility)
+from .codec import JSONCodec, get_json_codec
+from .compression import compress_body, get_accept_encoding, wrap_response_stream
+from .deadline import check_deadline, get_remaining_time
+from .exceptions import BackendClientError, BackendAPIError, CircuitOpenError
+from .hedging import RequestHedger
+from .ratelimit import RateLimitInfo, parse_rate_limit_headers
+from .retry import IDEMPOTENT_METHODS, parse_retry_after
 from .session import BaseSession, Session as SyncSession, AsyncSession, api_session
+from .snapshot import ResponseSnapshot, SnapshotClientResponse
+from .types import Sentinel, sentinel
 
 log = logging.getLogger('ai.backend.client.request')
 
@@ -78,14 +89,21 @@ async def _coro_return(val: _T) -> _T:
     return val
 
 
-class ExtendedJSONEncoder(modjson.JSONEncoder):
-
-    def default(self, obj: Any) -> Any:
-        if isinstance(obj, Path):
-            return str(obj)
-        if isinstance(obj, Decimal):
-            return str(obj)
-        return super().default(obj)
+async def _read_json(raw_response: aiohttp.ClientResponse, codec: JSONCodec) -> Any:
+    # Decode the raw body bytes directly, skipping the charset decoding step
+    # of aiohttp.ClientResponse.json().
+    body = await raw_response.read()
+    if not raw_response.content_type.endswith('json'):
+        raise aiohttp.ContentTypeError(
+            raw_response.request_info,
+            raw_response.history,
+            message='Attempt to decode JSON with unexpected mimetype: '
+                    f'{raw_response.content_type}',
+            headers=raw_response.headers,
+        )
+    if not body.strip():
+        return None
+    return codec.loads(body)
 
 
 class Request:
@@ -100,11 +118,15 @@ class Request:
         'params', 'content_type',
         'api_version',
         '_content', '_attached_files',
+        '_compressed_content', '_graphql_query',
         'reporthook',
     )
 
     _content: RequestContent
     _attached_files: Optional[Sequence[AttachedFile]]
+    _compressed_content: Optional[bytes]
+    # The memoized result of _load_graphql_query()
+    _graphql_query: Union[Tuple[str, Mapping[str, Any]], None, Sentinel]
 
     date: Optional[datetime]
     api_version: str
@@ -157,6 +179,8 @@ class Request:
         ])
         self._content = b''
         self._attached_files = None
+        self._compressed_content = None
+        self._graphql_query = sentinel
         self.set_content(content, content_type=content_type)
         self.reporthook = reporthook
 
@@ -192,13 +216,14 @@ class Request:
             self._content = value
         self.content_type = (content_type if content_type is not None
                              else guessed_content_type)
+        self._graphql_query = sentinel
 
     def set_json(self, value: Any) -> None:
         """
         A shortcut for set_content() with JSON objects.
         """
-        self.set_content(modjson.dumps(value, cls=ExtendedJSONEncoder),
-                         content_type='application/json')
+        codec = get_json_codec(self.config.json_codec)
+        self.set_content(codec.dumps(value), content_type='application/json')
 
     def attach_files(self, files: Sequence[AttachedFile]) -> None:
         """
@@ -214,12 +239,16 @@ class Request:
         access_key: str = None,
         secret_key: str = None,
         hash_type: str = None,
+        endpoint: URL = None,
     ) -> None:
         """
         Calculates the signature of the given request and adds the
         Authorization HTTP header.
         It should be called at the very end of request preparation and before
         sending the request to the server.
+
+        :param endpoint: The API endpoint where the request is sent, whose host
+            is a part of the signature.  Defaults to the configured endpoint.
         """
         if access_key is None:
             access_key = self.config.access_key
@@ -232,7 +261,7 @@ class Request:
             hdrs, _ = generate_signature(
                 method=self.method,
                 version=self.api_version,
-                endpoint=self.config.endpoint,
+                endpoint=endpoint if endpoint is not None else self.config.endpoint,
                 date=self.date,
                 rel_url=str(rel_url),
                 content_type=self.content_type,
@@ -264,23 +293,142 @@ class Request:
             # multipart boundaries.
             self.headers.pop('Content-Type', None)
             return data
+        elif self._compressed_content is not None:
+            return self._compressed_content
         else:
             return self._content
 
-    def _build_url(self) -> URL:
-        base_url = self.config.endpoint.path.rstrip('/')
+    def _compress_content(self) -> None:
+        """
+        Compresses the JSON request body if configured so.
+        The signature is not affected since it does not cover the request body.
+        """
+        encoding = self.config.request_compression
+        if (
+            encoding is None
+            or self._attached_files is not None
+            or self.content_type != 'application/json'
+            or 'Content-Encoding' in self.headers
+            or not isinstance(self._content, (bytes, bytearray))
+            or len(self._content) < self.config.request_compression_threshold
+        ):
+            return
+        self._compressed_content = compress_body(bytes(self._content), encoding)
+        self.headers['Content-Encoding'] = encoding
+
+    def set_idempotency_key(self, key: str = None) -> None:
+        """
+        Marks the request as safe to replay by attaching an ``Idempotency-Key``
+        header, so that it may be retried upon transient errors even if it uses
+        a non-idempotent HTTP method.  Only use this for the requests whose
+        duplicate execution has the same effect as a single one.
+
+        :param key: The key to identify duplicate requests.
+                    A random one is generated if not given.
+        """
+        self.headers['Idempotency-Key'] = key if key is not None else str(uuid.uuid4())
+
+    @property
+    def replayable(self) -> bool:
+        """
+        If the request body can be sent again, e.g., for retries.
+        Attached files and streamed contents are consumed by the first attempt.
+        """
+        return self._attached_files is None and isinstance(self._content, (bytes, bytearray))
+
+    def _is_idempotent(self) -> bool:
+        if not self.replayable:
+            return False
+        return (
+            self.method in IDEMPOTENT_METHODS
+            or 'Idempotency-Key' in self.headers
+            or (self.method == 'POST' and self._is_graphql_query())
+        )
+
+    def _load_graphql_query(self) -> Optional[Tuple[str, Mapping[str, Any]]]:
+        """
+        Returns the query and variables if the request is a read-only GraphQL query.
+        The request body is decoded only once until the content is replaced.
+        """
+        if self._graphql_query is sentinel:
+            self._graphql_query = self._decode_graphql_query()
+        return cast(Optional[Tuple[str, Mapping[str, Any]]], self._graphql_query)
+
+    def _decode_graphql_query(self) -> Optional[Tuple[str, Mapping[str, Any]]]:
+        if self.path is None or self.path.rstrip('/') != 'admin/graphql':
+            return None
+        if self.content_type != 'application/json':
+            return None
+        try:
+            body = get_json_codec(self.config.json_codec).loads(cast(bytes, self._content))
+        except ValueError:
+            return None
+        query = body.get('query') if isinstance(body, dict) else None
+        if not isinstance(query, str) or query.lstrip().startswith('mutation'):
+            return None
+        return query, body.get('variables') or {}
+
+    def _is_graphql_query(self) -> bool:
+        return self._load_graphql_query() is not None
+
+    def _get_coalescing_key(self) -> Optional[Hashable]:
+        """
+        Returns the key to identify identical read-only requests,
+        or ``None`` if the request must not be coalesced.
+        """
+        if self._attached_files is not None or not isinstance(self._content, (bytes, bytearray)):
+            return None
+        if self.method not in ('GET', 'HEAD') and not (
+            self.method == 'POST' and self._is_graphql_query()
+        ):
+            return None
+        params = tuple(sorted((k, str(v)) for k, v in self.params.items())) if self.params else ()
+        headers = tuple(sorted(
+            (k.lower(), v) for k, v in self.headers.items()
+            if k.lower() not in ('date', 'authorization')
+        ))
+        return (
+            self.method,
+            self.path,
+            params,
+            headers,
+            hashlib.sha256(self._content).digest(),
+        )
+
+    def _get_cache_key(self) -> Optional[Hashable]:
+        """
+        Returns the key to identify the cached responses of this request,
+        or ``None`` if the response must not be cached.
+        Unlike the coalescing key, it distinguishes the API endpoints and the
+        access keys as the cache may be shared by multiple sessions via the disk.
+        """
+        request_key = self._get_coalescing_key()
+        if request_key is None:
+            return None
+        return (
+            tuple(sorted(str(endpoint) for endpoint in self.config.endpoints)),
+            self.config.access_key,
+            request_key,
+        )
+
+    def _select_endpoint(self) -> URL:
+        selector = self.session.endpoint_selector
+        return selector.select() if selector is not None else self.config.endpoint
+
+    def _build_url(self, endpoint: URL = None) -> URL:
+        if endpoint is None:
+            endpoint = self._select_endpoint()
+        base_url = endpoint.path.rstrip('/')
         query_path = self.path.lstrip('/') if self.path is not None and len(self.path) > 0 else ''
         if self.config.endpoint_type == 'session':
             if not query_path.startswith('server'):
                 query_path = 'func/{0}'.format(query_path)
         path = '{0}/{1}'.format(base_url, query_path)
-        url = self.config.endpoint.with_path(path)
+        url = endpoint.with_path(path)
         if self.params:
             url = url.with_query(self.params)
         return url
 
-    # TODO: attach rate-limit information
-
     def fetch(self, **kwargs) -> FetchContextManager:
         """
         Sends the request to the server and reads the response.
@@ -307,6 +455,21 @@ class Request:
             rqst = Request('GET', ...)
             async with rqst.fetch() as resp:
               print(await resp.text())
+
+        Read-only requests may pass a :class:`~ai.backend.client.cache.CachePolicy`
+        as the ``cache`` keyword argument to reuse the responses stored in the
+        session's response cache, if enabled.
+
+        Read-only GraphQL queries are merged with the others issued in the same
+        event loop tick if the session's GraphQL batcher is enabled, unless
+        ``batch=False`` is passed or they are served from the response cache.
+
+        If :attr:`APIConfig.coalesce_requests
+        <ai.backend.client.config.APIConfig.coalesce_requests>` is set, identical
+        read-only GraphQL queries in flight share a single response.  GET and HEAD
+        requests share one only if ``coalesce=True`` or a cache policy is passed,
+        since the shared response is buffered in memory before being handed to
+        the waiters.  Do not pass it for the requests whose responses are read as streams.
         """
         assert self.method in self._allowed_methods, \
                'Disallowed HTTP method: {}'.format(self.method)
@@ -315,23 +478,62 @@ class Request:
         self.headers['Date'] = self.date.isoformat()
         if self.content_type is not None and 'Content-Type' not in self.headers:
             self.headers['Content-Type'] = self.content_type
+        if 'Accept-Encoding' not in self.headers:
+            self.headers['Accept-Encoding'] = (
+                get_accept_encoding() if self.config.response_compression else 'identity'
+            )
+        self._compress_content()
         force_anonymous = kwargs.pop('anonymous', False)
-
-        def _rqst_ctx_builder():
+        cache_policy: Optional[CachePolicy] = kwargs.pop('cache', None)
+        if cache_policy is not None and self.session.response_cache is not None:
+            cache_key = self._get_cache_key()
+            if cache_key is not None:
+                kwargs['cache_policy'] = cache_policy
+                kwargs['cache_key'] = cache_key
+        batcher = self.session.graphql_batcher
+        if (
+            kwargs.pop('batch', True)
+            and batcher is not None
+            # The cached queries are served from the response cache instead.
+            and 'cache_key' not in kwargs
+            and kwargs.get('check_status', True)
+            and self.method == 'POST'
+            and self._attached_files is None
+            and isinstance(self._content, (bytes, bytearray))
+        ):
+            graphql_query = self._load_graphql_query()
+            if graphql_query is not None:
+                parsed = parse_query(graphql_query[0])
+                if parsed is not None:
+                    kwargs['batch_query'] = (parsed, graphql_query[1])
+        kwargs.setdefault('idempotent', self._is_idempotent())
+        kwargs.setdefault('replayable', self.replayable)
+        # The cached responses are buffered anyway.
+        coalesce = kwargs.pop('coalesce', False) or cache_policy is not None
+        if self.config.coalesce_requests and (coalesce or self._is_graphql_query()):
+            kwargs['coalescing_key'] = self._get_coalescing_key()
+
+        def _rqst_ctx_builder(extra_headers: Mapping[str, str] = None, endpoint: URL = None):
             timeout_config = aiohttp.ClientTimeout(
                 total=None, connect=None,
                 sock_connect=self.config.connection_timeout,
                 sock_read=self.config.read_timeout,
             )
-            full_url = self._build_url()
+            if endpoint is None:
+                endpoint = self._select_endpoint()
+            full_url = self._build_url(endpoint)
             if not self.config.is_anonymous and not force_anonymous:
-                self._sign(full_url.relative())
+                self._sign(full_url.relative(), endpoint=endpoint)
+            # Copy the headers as the hedged requests sign them for other endpoints.
+            headers = CIMultiDict(self.headers)
+            if extra_headers:
+                headers.update(extra_headers)
             return self.session.aiohttp_session.request(
                 self.method,
                 str(full_url),
                 data=self._pack_content(),
                 timeout=timeout_config,
-                headers=self.headers)
+                headers=headers)
 
         return FetchContextManager(self.session, _rqst_ctx_builder, **kwargs)
 
@@ -354,9 +556,10 @@ class Request:
         self.content_type = 'application/octet-stream'
 
         def _ws_ctx_builder():
-            full_url = self._build_url()
+            endpoint = self._select_endpoint()
+            full_url = self._build_url(endpoint)
             if not self.config.is_anonymous:
-                self._sign(full_url.relative())
+                self._sign(full_url.relative(), endpoint=endpoint)
             return self.session.aiohttp_session.ws_connect(
                 str(full_url),
                 autoping=True, heartbeat=30.0,
@@ -387,9 +590,10 @@ class Request:
                 sock_connect=self.config.connection_timeout,
                 sock_read=self.config.read_timeout,
             )
-            full_url = self._build_url()
+            endpoint = self._select_endpoint()
+            full_url = self._build_url(endpoint)
             if not self.config.is_anonymous:
-                self._sign(full_url.relative())
+                self._sign(full_url.relative(), endpoint=endpoint)
             return self.session.aiohttp_session.request(
                 self.method,
                 str(full_url),
@@ -407,7 +611,10 @@ class AsyncResponseMixin:
     async def text(self) -> str:
         return await self._raw_response.text()
 
-    async def json(self, *, loads=modjson.loads) -> Any:
+    async def json(self, *, loads=None) -> Any:
+        if loads is None:
+            codec = get_json_codec(self._session.config.json_codec)
+            return await _read_json(self._raw_response, codec)
         loads = functools.partial(loads, object_pairs_hook=OrderedDict)
         return await self._raw_response.json(loads=loads)
 
@@ -429,9 +636,14 @@ class SyncResponseMixin:
             self._raw_response.text()
         )
 
-    def json(self, *, loads=modjson.loads) -> Any:
-        loads = functools.partial(loads, object_pairs_hook=OrderedDict)
+    def json(self, *, loads=None) -> Any:
         sync_session = cast(SyncSession, self._session)
+        if loads is None:
+            codec = get_json_codec(sync_session.config.json_codec)
+            return sync_session.worker_thread.execute(
+                _read_json(self._raw_response, codec)
+            )
+        loads = functools.partial(loads, object_pairs_hook=OrderedDict)
         return sync_session.worker_thread.execute(
             self._raw_response.json(loads=loads)
         )
@@ -502,6 +714,14 @@ class BaseResponse:
     def raw_response(self) -> aiohttp.ClientResponse:
         return self._raw_response
 
+    @property
+    def rate_limit(self) -> Optional[RateLimitInfo]:
+        """
+        The rate limit information advertised by the server via the response
+        headers, or ``None`` if the server did not send it.
+        """
+        return parse_rate_limit_headers(self._raw_response.headers)
+
     @property
     def content_type(self) -> str:
         return self._raw_response.content_type
@@ -528,9 +748,10 @@ class FetchContextManager:
 
     __slots__ = (
         'session', 'rqst_ctx_builder', 'response_cls',
-        'check_status',
+        'check_status', 'coalescing_key',
+        'cache_policy', 'cache_key', 'idempotent', 'replayable', 'batch_query',
         '_async_mode',
-        '_rqst_ctx',
+        '_rqst_ctx', '_endpoint',
     )
 
     _rqst_ctx: Optional[_RequestContextManager]
@@ -538,41 +759,311 @@ class FetchContextManager:
     def __init__(
         self,
         session: BaseSession,
-        rqst_ctx_builder: Callable[[], _RequestContextManager],
+        rqst_ctx_builder: Callable[..., _RequestContextManager],
         *,
         response_cls: Type[Response] = Response,
         check_status: bool = True,
+        coalescing_key: Hashable = None,
+        cache_policy: CachePolicy = None,
+        cache_key: Hashable = None,
+        idempotent: bool = False,
+        replayable: bool = True,
+        batch_query: Tuple[ParsedQuery, Mapping[str, Any]] = None,
     ) -> None:
         self.session = session
         self.rqst_ctx_builder = rqst_ctx_builder
         self.check_status = check_status
+        self.coalescing_key = coalescing_key
+        self.cache_policy = cache_policy
+        self.cache_key = cache_key
+        self.idempotent = idempotent
+        self.replayable = replayable
+        self.batch_query = batch_query
         self.response_cls = response_cls
         self._async_mode = isinstance(session, AsyncSession)
         self._rqst_ctx = None
+        self._endpoint: Optional[URL] = None
 
     async def __aenter__(self) -> Response:
-        max_retries = len(self.session.config.endpoints)
-        retry_count = 0
+        if self.batch_query is not None:
+            batcher = self.session.graphql_batcher
+            assert batcher is not None
+            batched_snapshot = await batcher.submit(*self.batch_query)
+            if batched_snapshot is not None:
+                return self.response_cls(
+                    self.session,
+                    cast(aiohttp.ClientResponse, SnapshotClientResponse(batched_snapshot)),
+                    async_mode=self._async_mode)
+            # Send the query by itself if it is not merged with others.
+        if self.cache_key is not None:
+            snapshot = await self._fetch_cached()
+        elif self.coalescing_key is not None:
+            snapshot = await self.session.request_coalescer.run(
+                self.coalescing_key, self._fetch_snapshot)
+        else:
+            raw_resp = await self._send()
+            return self.response_cls(self.session, raw_resp,
+                                     async_mode=self._async_mode)
+        return self.response_cls(self.session,
+                                 cast(aiohttp.ClientResponse, SnapshotClientResponse(snapshot)),
+                                 async_mode=self._async_mode)
+
+    async def _fetch_cached(self) -> ResponseSnapshot:
+        cache = self.session.response_cache
+        assert cache is not None
+        assert self.cache_policy is not None
+        entry = cache.lookup(self.cache_key)
+        if entry is not None and entry.fresh:
+            return entry.snapshot
+        extra_headers = {}
+        if entry is not None:
+            # Revalidate the expired response instead of fetching it again.
+            if entry.etag is not None:
+                extra_headers['If-None-Match'] = entry.etag
+            if entry.last_modified is not None:
+                extra_headers['If-Modified-Since'] = entry.last_modified
+        fetch = functools.partial(self._fetch_snapshot, extra_headers)
+        if self.coalescing_key is not None:
+            snapshot = await self.session.request_coalescer.run(
+                (self.coalescing_key, tuple(sorted(extra_headers.items()))), fetch)
+        else:
+            snapshot = await fetch()
+        if snapshot.status == 304 and entry is not None:
+            cache.refresh(self.cache_key, entry, self.cache_policy)
+            return entry.snapshot
+        cache.store(self.cache_key, snapshot, self.cache_policy)
+        return snapshot
+
+    async def _fetch_snapshot(
+        self,
+        extra_headers: Optional[Mapping[str, str]] = None,
+    ) -> ResponseSnapshot:
+        raw_resp = await self._send(extra_headers)
+        try:
+            body = await raw_resp.read()
+        finally:
+            assert self._rqst_ctx is not None
+            await self._rqst_ctx.__aexit__(None, None, None)
+            self._rqst_ctx = None
+        return ResponseSnapshot.from_response(raw_resp, body)
+
+    def _build_rqst_ctx(
+        self,
+        extra_headers: Optional[Mapping[str, str]],
+        endpoint: Optional[URL],
+    ) -> _RequestContextManager:
+        # Pass only the given options to support custom builders without them.
+        kwargs: dict = {}
+        if extra_headers:
+            kwargs['extra_headers'] = extra_headers
+        if endpoint is not None:
+            kwargs['endpoint'] = endpoint
+        return self.rqst_ctx_builder(**kwargs)
+
+    def _choose_endpoint(self, tried_endpoints: Sequence[URL]) -> Optional[URL]:
+        selector = self.session.endpoint_selector
+        breakers = self.session.circuit_breakers
+        if breakers is None:
+            if selector is not None:
+                return selector.select(exclude=tried_endpoints)
+            if tried_endpoints:
+                # Avoid the endpoints already taken (e.g., by the hedged request).
+                for endpoint in self.session.config.endpoints:
+                    if endpoint not in tried_endpoints:
+                        return endpoint
+            return None  # use the configured endpoint
+        candidates: Sequence[URL]
+        if selector is not None:
+            candidates = selector.endpoints
+        else:
+            candidates = self.session.config.endpoints
+        # Prefer the endpoints not tried yet by this request.
+        for endpoint in sorted(candidates, key=lambda endpoint: endpoint in tried_endpoints):
+            if breakers[endpoint].allow_request():
+                return endpoint
+        raise CircuitOpenError(
+            'Request to the API endpoint is not made because the circuit breakers '
+            'of all endpoints are open due to repeated failures.')
+
+    def _record_result(
+        self,
+        endpoint: Optional[URL],
+        latency: Optional[float],
+        status: int = None,
+    ) -> None:
+        if endpoint is None:
+            return
+        selector = self.session.endpoint_selector
+        if selector is not None:
+            if latency is None:
+                selector.record_failure(endpoint)
+            else:
+                assert status is not None
+                selector.record_success(endpoint, latency, error=status >= 500)
+        breakers = self.session.circuit_breakers
+        if breakers is not None:
+            if latency is None or status in (502, 503, 504):
+                breakers[endpoint].record_failure()
+            else:
+                breakers[endpoint].record_success()
+
+    async def _send(
+        self,
+        extra_headers: Optional[Mapping[str, str]] = None,
+    ) -> aiohttp.ClientResponse:
+        # Record the request once even if it is sent multiple times by hedging.
+        self.session.retry_budget.deposit()
+        hedger = self.session.request_hedger
+        if hedger is not None and self.idempotent:
+            return await self._send_hedged(hedger, extra_headers)
+        return await self._send_with_retries(extra_headers)
+
+    def _fork(self) -> FetchContextManager:
+        return FetchContextManager(
+            self.session, self.rqst_ctx_builder,
+            response_cls=self.response_cls,
+            check_status=self.check_status,
+            idempotent=self.idempotent,
+            replayable=self.replayable,
+        )
+
+    async def _send_hedged(
+        self,
+        hedger: RequestHedger,
+        extra_headers: Optional[Mapping[str, str]],
+    ) -> aiohttp.ClientResponse:
+        hedger.stats.requests += 1
+        started = time.perf_counter()
+        primary = self._fork()
+        attempts: Dict[asyncio.Future, FetchContextManager] = {
+            asyncio.ensure_future(primary._send_with_retries(extra_headers)): primary,
+        }
+        winner: Optional[asyncio.Future] = None
+        try:
+            done, pending = await asyncio.wait(attempts.keys(), timeout=hedger.get_delay())
+            if not done:
+                hedger.stats.fired += 1
+                hedge = self._fork()
+                avoid_endpoints = [primary._endpoint] if primary._endpoint is not None else []
+                attempts[asyncio.ensure_future(
+                    hedge._send_with_retries(extra_headers, avoid_endpoints),
+                )] = hedge
+                pending = set(attempts.keys())
+            while True:
+                for task in done:
+                    # Take the first response including API errors,
+                    # but wait for the other on client-side failures.
+                    exc = task.exception()
+                    if exc is None or not isinstance(exc, BackendClientError) or not pending:
+                        winner = task
+                        break
+                if winner is not None:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task, attempt in attempts.items():
+                if task is not winner:
+                    await self._discard_attempt(task, attempt)
+        assert winner is not None
+        hedger.latency.add(time.perf_counter() - started)
+        if attempts[winner] is not primary:
+            hedger.stats.won += 1
+        self._rqst_ctx = attempts[winner]._rqst_ctx
+        self._endpoint = attempts[winner]._endpoint
+        return winner.result()
+
+    @staticmethod
+    async def _discard_attempt(task: asyncio.Future, attempt: FetchContextManager) -> None:
+        if not task.done():
+            task.cancel()
+            await asyncio.wait([task])
+        if task.cancelled() or task.exception() is not None:
+            return
+        # Release the connection of the response arrived too late.
+        if attempt._rqst_ctx is not None:
+            await attempt._rqst_ctx.__aexit__(None, None, None)
+            attempt._rqst_ctx = None
+
+    async def _send_with_retries(
+        self,
+        extra_headers: Optional[Mapping[str, str]] = None,
+        avoid_endpoints: Sequence[URL] = (),
+    ) -> aiohttp.ClientResponse:
+        policy = self.session.retry_policy
+        budget = self.session.retry_budget
+        num_endpoints = len(self.session.config.endpoints)
+        # Connection failures are retried at least once per endpoint for fail-over.
+        max_connect_attempts = max(policy.max_attempts, num_endpoints)
+        attempt = 0
+        tried_endpoints: List[URL] = [*avoid_endpoints]
+        limiter = self.session.rate_limiter
+
+        def _can_wait(delay: float) -> bool:
+            # Do not retry if the deadline would pass while backing off.
+            remaining = get_remaining_time()
+            return remaining is None or delay < remaining
+
         while True:
+            check_deadline()
+            endpoint = self._choose_endpoint(tried_endpoints)
+            if endpoint is not None:
+                tried_endpoints.append(endpoint)
+            self._endpoint = endpoint if endpoint is not None else self.session.config.endpoint
+            if limiter is not None:
+                await limiter.acquire()
             try:
-                retry_count += 1
-                self._rqst_ctx = self.rqst_ctx_builder()
+                attempt += 1
+                self._rqst_ctx = self._build_rqst_ctx(extra_headers, endpoint)
                 assert self._rqst_ctx is not None
+                started = time.perf_counter()
                 raw_resp = await self._rqst_ctx.__aenter__()
-                if self.check_status and raw_resp.status // 100 != 2:
+                self._record_result(endpoint, time.perf_counter() - started, raw_resp.status)
+                if limiter is not None:
+                    limiter.update(parse_rate_limit_headers(raw_resp.headers), raw_resp.status)
+                wrap_response_stream(raw_resp)
+                if (
+                    attempt < policy.max_attempts
+                    and policy.is_retriable_status(raw_resp.status, self.idempotent, self.replayable)
+                ):
+                    retry_after = parse_retry_after(raw_resp.headers.get('Retry-After'))
+                    delay = policy.get_delay(attempt, retry_after)
+                    if delay is not None and _can_wait(delay) and budget.withdraw():
+                        log.debug('retrying %s %s in %.2f sec (status: %d)',
+                                  raw_resp.method, raw_resp.url, delay, raw_resp.status)
+                        await self._rqst_ctx.__aexit__(None, None, None)
+                        self._rqst_ctx = None
+                        await asyncio.sleep(delay)
+                        continue
+                not_modified = bool(extra_headers) and raw_resp.status == 304
+                if self.check_status and raw_resp.status // 100 != 2 and not not_modified:
                     msg = await raw_resp.text()
                     await raw_resp.__aexit__(None, None, None)
                     raise BackendAPIError(raw_resp.status, raw_resp.reason or '', msg)
-                return self.response_cls(self.session, raw_resp,
-                                         async_mode=self._async_mode)
+                return raw_resp
             except aiohttp.ClientConnectionError as e:
-                if retry_count == max_retries:
+                self._record_result(endpoint, None)
+                # The request has not been sent at all if the connection could not be made.
+                retriable = self.idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                # Fail over to other endpoints immediately,
+                # but back off when revisiting the failed ones.
+                backoff = 0.0
+                if attempt >= num_endpoints:
+                    backoff = policy.get_backoff(attempt - num_endpoints + 1)
+                if (
+                    not retriable
+                    or attempt >= max_connect_attempts
+                    or not _can_wait(backoff)
+                    or not budget.withdraw()
+                ):
                     msg = 'Request to the API endpoint has failed.\n' \
                           'Check your network connection and/or the server status.\n' \
                           '\u279c {!r}'.format(e)
                     raise BackendClientError(msg) from e
                 else:
-                    self.session.config.rotate_endpoints()
+                    if self.session.endpoint_selector is None:
+                        self.session.config.rotate_endpoints()
+                    if backoff > 0:
+                        await asyncio.sleep(backoff)
                     continue
             except aiohttp.ClientResponseError as e:
                 msg = 'API endpoint response error.\n' \
@@ -581,7 +1072,9 @@ class FetchContextManager:
                 raise BackendClientError(msg) from e
 
     async def __aexit__(self, *exc_info) -> Optional[bool]:
-        assert self._rqst_ctx is not None
+        if self._rqst_ctx is None:
+            # The response was served from a buffered snapshot.
+            return None
         ret = await self._rqst_ctx.__aexit__(*exc_info)
         self._rqst_ctx = None
         return ret
@@ -0,0 +1,163 @@
+"""
+Provides the retry policy of API requests.
+
+Failed requests are retried with exponential backoff and full jitter when
+the failure is known to be transient:
+
+* Connection failures before the request is sent, for all requests.
+* Other connection failures and 502/504 responses, only for idempotent
+  requests (``GET``, ``HEAD``, ``OPTIONS``, ``PUT``, ``DELETE`` and those
+  carrying an ``Idempotency-Key`` header) since the server may have
+  processed them already.
+* 429 and 503 responses, for all requests, waiting at least as long as
+  the ``Retry-After`` header says.
+
+All retries made in a session are limited by a :class:`RetryBudget`, so that
+a misbehaving server cannot trigger retry storms from the client.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+import random
+from typing import (
+    FrozenSet,
+    Optional,
+)
+
+import attr
+from dateutil.tz import tzutc
+
+__all__ = (
+    'IDEMPOTENT_METHODS',
+    'RetryPolicy',
+    'RetryBudget',
+    'RetryStats',
+    'parse_retry_after',
+)
+
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses the value of ``Retry-After`` header, either in seconds or
+    an HTTP date, into the number of seconds to wait.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=tzutc())
+    return max(0.0, (retry_at - datetime.now(tzutc())).total_seconds())
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
+class RetryPolicy:
+    """
+    Determines whether and when to retry failed requests.
+
+    :param max_attempts: The maximum number of attempts including the first one.
+    :param backoff_base: The upper bound of the first backoff delay in seconds.
+        The upper bound doubles for each retry and the actual delay is chosen
+        randomly below it (full jitter).
+    :param backoff_max: The maximum backoff delay in seconds.
+    :param retry_after_max: The maximum number of seconds to honor ``Retry-After``.
+        Requests asked to wait longer than this are not retried.
+    :param retry_statuses: The response status codes to retry.
+    """
+    max_attempts: int = 3
+    backoff_base: float = 0.2
+    backoff_max: float = 10.0
+    retry_after_max: float = 60.0
+    retry_statuses: FrozenSet[int] = frozenset({429, 502, 503, 504})
+
+    def is_retriable_status(self, status: int, idempotent: bool, replayable: bool = True) -> bool:
+        """
+        Returns whether to retry the request answered with the given status.
+
+        :param idempotent: If the request is safe to execute more than once.
+        :param replayable: If the request body can be sent again.  Streamed bodies
+            such as uploaded files are consumed by the first attempt.
+        """
+        if status not in self.retry_statuses or not replayable:
+            return False
+        # 429 and 503 mean that the server has not processed the request.
+        return idempotent or status in (429, 503)
+
+    def get_backoff(self, retry_count: int) -> float:
+        """
+        Returns a randomized backoff delay before the *retry_count*-th retry
+        (starting from 1).
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (retry_count - 1)))
+
+    def get_delay(self, retry_count: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        Returns the number of seconds to wait before the *retry_count*-th retry
+        (starting from 1) considering the ``Retry-After`` value from the server,
+        or ``None`` if it should not be retried.
+        """
+        delay = self.get_backoff(retry_count)
+        if retry_after is not None:
+            if retry_after > self.retry_after_max:
+                return None
+            delay = max(delay, retry_after)
+        return delay
+
+
+@attr.s(auto_attribs=True, slots=True)
+class RetryStats:
+    requests: int = 0     # the number of first attempts
+    retries: int = 0      # the number of retried attempts
+    exhausted: int = 0    # the number of retries denied by the budget
+
+
+class RetryBudget:
+    """
+    Limits the retries to a fraction of the requests made in a session.
+
+    Each request deposits *ratio* tokens and each retry withdraws one token.
+    The balance starts from and is capped at *reserve* tokens, which allows
+    short bursts of retries when there were only a few requests.
+
+    :param ratio: The long-term ratio of retries to requests.
+    :param reserve: The number of retries allowed regardless of the ratio.
+    """
+
+    __slots__ = ('_ratio', '_reserve', '_balance', 'stats')
+
+    def __init__(self, ratio: float = 0.2, reserve: float = 10.0) -> None:
+        self._ratio = ratio
+        self._reserve = reserve
+        self._balance = reserve
+        self.stats = RetryStats()
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+    def deposit(self) -> None:
+        """
+        Records a new request.
+        """
+        self.stats.requests += 1
+        self._balance = min(self._reserve, self._balance + self._ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Takes a token for a retry.  Returns False if the budget is exhausted.
+        """
+        if self._balance < 1.0:
+            self.stats.exhausted += 1
+            return False
+        self._balance -= 1.0
+        self.stats.retries += 1
+        return True
@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import abc
 import asyncio
-from contextvars import Context, ContextVar, copy_context
-import inspect
+import atexit
+import concurrent.futures
+from contextlib import contextmanager
+from contextvars import ContextVar
+import functools
+import importlib
 import threading
 from typing import (
     Any,
     AsyncIterator,
     Awaitable,
+    Callable,
     Coroutine,
+    Dict,
+    Iterable,
     Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
     Tuple,
     Union,
     TypeVar,
@@ -21,9 +32,27 @@ import warnings
 
 import aiohttp
 from multidict import CIMultiDict
+from yarl import URL
 
+from .batching import GraphQLBatcher
+from .cache import ResponseCache
+from .circuit import CircuitBreakerRegistry
+from .coalescing import RequestCoalescer
 from .config import APIConfig, get_config, parse_api_version
+from .endpoints import EndpointSelector
 from .exceptions import APIVersionWarning, BackendAPIError, BackendClientError
+from .fanout import CallOutcome, gather_calls, iterate_completed_calls
+from .hedging import RequestHedger
+from .persisted import PersistedQueryRegistry
+from .pool import (
+    ConnectionPool,
+    ConnectionPoolStats,
+    acquire_connection_pool,
+    close_shared_pools,
+    release_connection_pool,
+)
+from .ratelimit import TokenBucketLimiter
+from .retry import RetryBudget, RetryPolicy
 from .types import Sentinel, sentinel
 
 
@@ -32,6 +61,7 @@ __all__ = (
     'Session',
     'AsyncSession',
     'api_session',
+    'shutdown_shared_runtime',
 )
 
 
@@ -51,32 +81,40 @@ def is_legacy_server() -> bool:
     return legacy
 
 
+async def _probe_endpoint(
+    http_session: aiohttp.ClientSession,
+    config: APIConfig,
+    endpoint: URL,
+) -> Mapping[str, Any]:
+    timeout_config = aiohttp.ClientTimeout(
+        total=None, connect=None,
+        sock_connect=config.connection_timeout,
+        sock_read=config.read_timeout,
+    )
+    headers = CIMultiDict([
+        ('User-Agent', config.user_agent),
+    ])
+    probe_url = endpoint / 'func/' if config.endpoint_type == 'session' else endpoint
+    async with http_session.get(probe_url, timeout=timeout_config, headers=headers) as resp:
+        resp.raise_for_status()
+        return await resp.json()
+
+
 async def _negotiate_api_version(
     http_session: aiohttp.ClientSession,
     config: APIConfig,
 ) -> Tuple[int, str]:
     client_version = parse_api_version(config.version)
     try:
-        timeout_config = aiohttp.ClientTimeout(
-            total=None, connect=None,
-            sock_connect=config.connection_timeout,
-            sock_read=config.read_timeout,
-        )
-        headers = CIMultiDict([
-            ('User-Agent', config.user_agent),
-        ])
-        probe_url = config.endpoint / 'func/' if config.endpoint_type == 'session' else config.endpoint
-        async with http_session.get(probe_url, timeout=timeout_config, headers=headers) as resp:
-            resp.raise_for_status()
-            server_info = await resp.json()
-            server_version = parse_api_version(server_info['version'])
-            if server_version > client_version:
-                warnings.warn(
-                    'The server API version is higher than the client. '
-                    'Please upgrade the client package.',
-                    category=APIVersionWarning,
-                )
-            return min(server_version, client_version)
+        server_info = await _probe_endpoint(http_session, config, config.endpoint)
+        server_version = parse_api_version(server_info['version'])
+        if server_version > client_version:
+            warnings.warn(
+                'The server API version is higher than the client. '
+                'Please upgrade the client package.',
+                category=APIVersionWarning,
+            )
+        return min(server_version, client_version)
     except (asyncio.TimeoutError, aiohttp.ClientError):
         # fallback to the configured API version
         return client_version
@@ -89,7 +127,8 @@ async def _close_aiohttp_session(session: aiohttp.ClientSession) -> None:
     # (https://github.com/aio-libs/aiohttp/issues/1925#issuecomment-592596034)
     transports = 0
     all_is_lost = asyncio.Event()
-    if session.connector is None:
+    if session.connector is None or not session.connector_owner:
+        # Shared connectors are kept open after closing the session.
         all_is_lost.set()
     else:
         if len(session.connector._conns) == 0:
@@ -128,110 +167,348 @@ async def _close_aiohttp_session(session: aiohttp.ClientSession) -> None:
 _Item = TypeVar('_Item')
 
 
-class _SyncWorkerThread(threading.Thread):
+class _GeneratorStream:
+    """
+    Carries the items of an async generator executed in the worker thread
+    to a synchronous consumer.  The generator may run ahead of the consumer
+    by up to *depth* items.
 
-    work_queue: queue.Queue[Union[
-        Tuple[Union[AsyncIterator, Coroutine], Context],
-        Sentinel,
-    ]]
-    done_queue: queue.Queue[Union[Any, Exception]]
-    stream_queue: queue.Queue[Union[Any, Exception, Sentinel]]
-    stream_block: threading.Event
-    agen_shutdown: bool
+    The counters are updated by a single thread each (*produced* by the worker
+    thread and *consumed* by the consumer), and the consumer wakes up the
+    producer only when it is *waiting* for the consumer to catch up.
+
+    The *owner* is the session which has started the generator, so that
+    the session may stop its own generators when it is closed.
+    """
 
     __slots__ = (
-        'work_queue',
-        'done_queue',
-        'stream_queue',
-        'stream_block',
-        'agen_shutdown',
+        'queue', 'depth', 'produced', 'consumed', 'waiting', 'resume', 'shutdown',
+        'owner', 'task',
     )
 
+    queue: queue.Queue[Union[Any, Exception, Sentinel]]
+    depth: int
+    produced: int
+    consumed: int
+    waiting: bool
+    resume: Optional[asyncio.Event]
+    shutdown: bool
+    owner: Any
+    task: Optional[asyncio.Task]
+
+    def __init__(self, depth: int = 0, owner: Any = None) -> None:
+        self.queue = queue.Queue()
+        self.depth = depth
+        self.produced = 0
+        self.consumed = 0
+        self.waiting = False
+        self.resume = None
+        self.shutdown = False
+        self.owner = owner
+        self.task = None
+
+    def is_full(self) -> bool:
+        return self.produced - self.consumed > self.depth and not self.shutdown
+
+
+class _CallWaiter:
+    """
+    Hands off the outcome of a coroutine executed in the worker thread
+    to the caller thread blocked on a pre-acquired lock.
+    """
+
+    __slots__ = ('_lock', 'task', 'result', 'error', 'done', 'cancelled')
+
+    task: Optional[asyncio.Task]
+    result: Any
+    error: Optional[BaseException]
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._lock.acquire()
+        self.task = None
+        self.result = None
+        self.error = None
+        self.done = False
+        self.cancelled = False
+
+    def start(self, coro: Coroutine) -> None:
+        # Invoked in the worker thread.
+        if self.cancelled:
+            coro.close()
+            return
+        self.task = asyncio.ensure_future(self._run(coro))
+
+    def cancel(self) -> None:
+        # Invoked in the worker thread.
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _run(self, coro: Coroutine) -> None:
+        # Release the caller within the task's last step,
+        # instead of waiting for its done-callbacks to be scheduled.
+        try:
+            self.result = await coro
+        except asyncio.CancelledError:
+            self.error = concurrent.futures.CancelledError()
+        except Exception as e:
+            self.error = e
+        except BaseException as e:
+            # Let SystemExit and KeyboardInterrupt stop the event loop as well.
+            self.error = e
+            raise
+        finally:
+            self.done = True
+            self._lock.release()
+
+    def wait(self) -> Any:
+        self._lock.acquire()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _SyncWorkerThread(threading.Thread):
+    """
+    Runs a long-lived event loop which executes the coroutines submitted by
+    the synchronous callers.  Each call gets its own future, so multiple threads
+    may call API functions of the same session concurrently.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    loop_ready: threading.Event
+    streams: Set[_GeneratorStream]
+    streams_lock: threading.Lock
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
-        self.work_queue = queue.Queue()
-        self.done_queue = queue.Queue()
-        self.stream_queue = queue.Queue()
-        self.stream_block = threading.Event()
-        self.agen_shutdown = False
+        self.loop_ready = threading.Event()
+        self.streams = set()
+        self.streams_lock = threading.Lock()
+
+    def start(self) -> None:
+        super().start()
+        self.loop_ready.wait()
 
     def run(self) -> None:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        self.loop = loop
+        self.loop_ready.set()
         try:
-            while True:
-                item = self.work_queue.get()
-                if item is sentinel:
-                    break
-                coro, ctx = item
-                if inspect.isasyncgen(coro):
-                    ctx.run(loop.run_until_complete,
-                            self.agen_wrapper(coro))
-                else:
-                    try:
-                        result = ctx.run(loop.run_until_complete, coro)
-                    except Exception as e:
-                        self.done_queue.put_nowait(e)
-                    else:
-                        self.done_queue.put_nowait(result)
-                self.work_queue.task_done()
+            loop.run_forever()
         except (SystemExit, KeyboardInterrupt):
             pass
         finally:
+            remaining_tasks = asyncio.all_tasks(loop)
+            for task in remaining_tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*remaining_tasks, return_exceptions=True))
             loop.run_until_complete(loop.shutdown_asyncgens())
-            loop.stop()
             loop.close()
 
+    def stop(self) -> None:
+        """
+        Stops the event loop after cancelling the remaining tasks
+        and waits until the thread terminates.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedules the coroutine in the worker thread's event loop.
+        The coroutine runs with a copy of the caller's context.
+        """
+        if threading.current_thread() is self:
+            coro.close()
+            raise RuntimeError('Cannot wait for a coroutine in the worker thread itself')
+        # call_soon_threadsafe() copies the caller's context for the new task.
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
     def execute(self, coro: Coroutine) -> Any:
-        ctx = copy_context()  # preserve context for the worker thread
+        """
+        Runs the coroutine in the worker thread's event loop and
+        blocks until it completes.  It is equivalent to ``submit(coro).result()``
+        but avoids the overheads of chaining a concurrent future.
+        """
+        if threading.current_thread() is self:
+            coro.close()
+            raise RuntimeError('Cannot wait for a coroutine in the worker thread itself')
+        waiter = _CallWaiter()
+        # call_soon_threadsafe() copies the caller's context for the new task.
+        self.loop.call_soon_threadsafe(waiter.start, coro)
         try:
-            self.work_queue.put((coro, ctx))
-            result = self.done_queue.get()
-            self.done_queue.task_done()
-            if isinstance(result, Exception):
-                raise result
-            return result
-        finally:
-            del ctx
-
-    async def agen_wrapper(self, agen):
-        self.agen_shutdown = False
+            return waiter.wait()
+        except BaseException:
+            # Let the coroutine stop when the caller is interrupted.
+            if not waiter.done:
+                waiter.cancelled = True
+                self.loop.call_soon_threadsafe(waiter.cancel)
+            raise
+
+    async def agen_wrapper(self, agen, stream: _GeneratorStream):
+        stream.resume = asyncio.Event()
+        stream.task = asyncio.current_task()
         try:
+            if stream.shutdown:
+                # The owner has been closed before the generator starts.
+                return
             async for item in agen:
-                self.stream_block.clear()
-                self.stream_queue.put(item)
+                stream.queue.put(item)
+                stream.produced += 1
                 # flow-control the generator.
-                self.stream_block.wait()
-                if self.agen_shutdown:
+                while stream.is_full():
+                    stream.resume.clear()
+                    stream.waiting = True
+                    # Check again in case the consumer has taken an item
+                    # before seeing the waiting flag.
+                    if stream.is_full():
+                        await stream.resume.wait()
+                    stream.waiting = False
+                if stream.shutdown:
                     break
         except Exception as e:
-            self.stream_queue.put(e)
+            stream.queue.put(e)
         finally:
-            self.stream_queue.put(sentinel)
+            stream.queue.put(sentinel)
             await agen.aclose()
 
-    def execute_generator(self, asyncgen: AsyncIterator[_Item]) -> Iterator[_Item]:
-        ctx = copy_context()  # preserve context for the worker thread
+    def _resume_stream(self, stream: _GeneratorStream) -> None:
+        if stream.resume is not None:
+            stream.resume.set()
+
+    def execute_generator(
+        self,
+        asyncgen: AsyncIterator[_Item],
+        *,
+        prefetch: int = 0,
+        owner: Any = None,
+    ) -> Iterator[_Item]:
+        """
+        Iterates over the async generator executed in the worker thread's event loop.
+
+        :param prefetch: The number of items the generator may produce in advance
+            while the caller is processing the current item.  If zero, the generator
+            is resumed only when the caller requests the next item.
+        :param owner: The session which starts the generator.
+            :meth:`shutdown_generators` stops the generators of the given owner only.
+        """
+        stream = _GeneratorStream(depth=prefetch, owner=owner)
+        with self.streams_lock:
+            self.streams.add(stream)
         try:
-            self.work_queue.put((asyncgen, ctx))
+            self.submit(self.agen_wrapper(asyncgen, stream))
             while True:
-                item = self.stream_queue.get()
+                item = stream.queue.get()
                 try:
-                    if item is sentinel:
+                    if item is sentinel or stream.shutdown:
+                        # Drop the items fetched in advance upon interruption.
                         break
                     if isinstance(item, Exception):
                         raise item
                     yield item
                 finally:
-                    self.stream_block.set()
-                    self.stream_queue.task_done()
+                    stream.consumed += 1
+                    # The interrupted generator has been woken up already.
+                    if stream.waiting and not stream.shutdown:
+                        self.loop.call_soon_threadsafe(self._resume_stream, stream)
         finally:
-            del ctx
+            # Stop the generator if the consumer has stopped the iteration early.
+            if not stream.shutdown:
+                stream.shutdown = True
+                self.loop.call_soon_threadsafe(self._resume_stream, stream)
+            with self.streams_lock:
+                self.streams.discard(stream)
+
+    def _get_streams(self, owner: Any = None) -> List[_GeneratorStream]:
+        with self.streams_lock:
+            return [
+                stream for stream in self.streams
+                if owner is None or stream.owner is owner
+            ]
+
+    def interrupt_generator(self, owner: Any = None) -> None:
+        """
+        Lets the generators stop after producing their current items
+        and wakes up their consumers.  If *owner* is given, only the generators
+        started by it are interrupted.
+        """
+        for stream in self._get_streams(owner):
+            stream.shutdown = True
+            self.loop.call_soon_threadsafe(self._resume_stream, stream)
+            stream.queue.put(sentinel)
+
+    async def shutdown_generators(self, owner: Any = None) -> None:
+        """
+        Cancels the generators and waits until they are finalized,
+        so that they no longer use the resources of their owner.
+        If *owner* is given, only the generators started by it are stopped.
+        It must be executed in the worker thread's event loop.
+        """
+        tasks = []
+        for stream in self._get_streams(owner):
+            stream.shutdown = True
+            stream.queue.put(sentinel)
+            if stream.task is not None and not stream.task.done():
+                stream.task.cancel()
+                tasks.append(stream.task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
 
-    def interrupt_generator(self):
-        self.agen_shutdown = True
-        self.stream_block.set()
-        self.stream_queue.put(sentinel)
+_shared_runtime: Optional[_SyncWorkerThread] = None
+_shared_runtime_lock = threading.Lock()
+
+
+def _get_shared_runtime() -> _SyncWorkerThread:
+    global _shared_runtime
+    with _shared_runtime_lock:
+        if _shared_runtime is None:
+            worker_thread = _SyncWorkerThread(name='backend.ai-client-runtime', daemon=True)
+            worker_thread.start()
+            _shared_runtime = worker_thread
+            atexit.register(shutdown_shared_runtime)
+        return _shared_runtime
+
+
+def shutdown_shared_runtime() -> None:
+    """
+    Closes the shared connection pools and stops the event loop thread shared by
+    the synchronous sessions using :attr:`APIConfig.shared_runtime
+    <ai.backend.client.config.APIConfig.shared_runtime>`.
+    It is called automatically upon the interpreter exit, and the next session
+    starts a new runtime.
+    """
+    global _shared_runtime
+    with _shared_runtime_lock:
+        worker_thread, _shared_runtime = _shared_runtime, None
+    if worker_thread is None:
+        return
+    atexit.unregister(shutdown_shared_runtime)
+    worker_thread.execute(worker_thread.shutdown_generators())
+    worker_thread.execute(close_shared_pools())
+    worker_thread.stop()
+
+
+class _FunctionClass:
+    """
+    Exposes an API function class as a session attribute, importing
+    the module defining it on the first access.
+    """
+
+    __slots__ = ('module', 'name', 'value')
+
+    def __init__(self, module: str, name: str) -> None:
+        self.module = module
+        self.name = name
+        self.value: Any = None
+
+    def __get__(self, instance: Optional[BaseSession], owner: type) -> Any:
+        value = self.value
+        if value is None:
+            module = importlib.import_module(self.module, __package__)
+            value = self.value = getattr(module, self.name)
+        return value
 
 
 class BaseSession(metaclass=abc.ABCMeta):
@@ -241,24 +518,55 @@ class BaseSession(metaclass=abc.ABCMeta):
 
     __slots__ = (
         '_config', '_closed', '_context_token', '_proxy_mode',
+        '_connection_pool', '_request_coalescer', '_graphql_batcher', '_persisted_queries',
+        '_server_features', '_response_cache',
+        '_endpoint_selector', '_circuit_breakers',
+        '_retry_policy', '_retry_budget', '_rate_limiter', '_request_hedger',
         'aiohttp_session', 'api_version',
-        'System', 'Manager', 'Admin',
-        'Agent', 'AgentWatcher', 'ScalingGroup',
-        'Image', 'ComputeSession', 'SessionTemplate',
-        'Domain', 'Group', 'Auth', 'User', 'KeyPair',
-        'BackgroundTask',
-        'EtcdConfig',
-        'Resource', 'KeypairResourcePolicy',
-        'VFolder', 'Dotfile',
-        'ServerLog',
     )
 
+    # The function modules are imported when used, as they import
+    # heavy dependencies such as tqdm and aiotusclient.
+    System = _FunctionClass('.func.system', 'System')
+    Admin = _FunctionClass('.func.admin', 'Admin')
+    Agent = _FunctionClass('.func.agent', 'Agent')
+    AgentWatcher = _FunctionClass('.func.agent', 'AgentWatcher')
+    Auth = _FunctionClass('.func.auth', 'Auth')
+    BackgroundTask = _FunctionClass('.func.bgtask', 'BackgroundTask')
+    EtcdConfig = _FunctionClass('.func.etcd', 'EtcdConfig')
+    Domain = _FunctionClass('.func.domain', 'Domain')
+    Group = _FunctionClass('.func.group', 'Group')
+    Image = _FunctionClass('.func.image', 'Image')
+    ComputeSession = _FunctionClass('.func.session', 'ComputeSession')
+    KeyPair = _FunctionClass('.func.keypair', 'KeyPair')
+    Manager = _FunctionClass('.func.manager', 'Manager')
+    Resource = _FunctionClass('.func.resource', 'Resource')
+    KeypairResourcePolicy = _FunctionClass('.func.keypair_resource_policy', 'KeypairResourcePolicy')
+    User = _FunctionClass('.func.user', 'User')
+    ScalingGroup = _FunctionClass('.func.scaling_group', 'ScalingGroup')
+    SessionTemplate = _FunctionClass('.func.session_template', 'SessionTemplate')
+    VFolder = _FunctionClass('.func.vfolder', 'VFolder')
+    Dotfile = _FunctionClass('.func.dotfile', 'Dotfile')
+    ServerLog = _FunctionClass('.func.server_log', 'ServerLog')
+
     aiohttp_session: aiohttp.ClientSession
     api_version: Tuple[int, str]
 
     _closed: bool
     _config: APIConfig
     _proxy_mode: bool
+    _connection_pool: ConnectionPool
+    _request_coalescer: RequestCoalescer
+    _graphql_batcher: Optional[GraphQLBatcher]
+    _persisted_queries: Optional[PersistedQueryRegistry]
+    _server_features: Dict[str, bool]
+    _response_cache: Optional[ResponseCache]
+    _endpoint_selector: Optional[EndpointSelector]
+    _circuit_breakers: Optional[CircuitBreakerRegistry]
+    _retry_policy: RetryPolicy
+    _retry_budget: RetryBudget
+    _rate_limiter: Optional[TokenBucketLimiter]
+    _request_hedger: Optional[RequestHedger]
 
     def __init__(
         self, *,
@@ -268,51 +576,50 @@ class BaseSession(metaclass=abc.ABCMeta):
         self._closed = False
         self._config = config if config else get_config()
         self._proxy_mode = proxy_mode
+        self._request_coalescer = RequestCoalescer()
+        self._graphql_batcher = None
+        if self._config.graphql_batching:
+            self._graphql_batcher = GraphQLBatcher(max_size=self._config.graphql_batch_size)
+        self._persisted_queries = None
+        if self._config.graphql_persisted_queries:
+            self._persisted_queries = PersistedQueryRegistry()
+        self._server_features = {}
+        self._response_cache = None
+        if self._config.response_cache:
+            self._response_cache = ResponseCache(
+                max_entries=self._config.response_cache_size,
+                ttls=self._config.response_cache_ttls,
+                cache_dir=self._config.response_cache_dir,
+            )
+        self._retry_policy = RetryPolicy(
+            max_attempts=self._config.retry_max_attempts,
+            backoff_base=self._config.retry_backoff_base,
+            backoff_max=self._config.retry_backoff_max,
+        )
+        self._retry_budget = RetryBudget(ratio=self._config.retry_budget_ratio)
+        self._rate_limiter = None
+        if self._config.rate_limiting:
+            self._rate_limiter = TokenBucketLimiter(rate=self._config.rate_limit)
+        self._request_hedger = None
+        if self._config.hedge_requests and len(self._config.endpoints) > 1:
+            self._request_hedger = RequestHedger(delay=self._config.hedge_delay)
+        self._endpoint_selector = None
+        if self._config.endpoint_selection == 'latency' and len(self._config.endpoints) > 1:
+            self._endpoint_selector = EndpointSelector(
+                self._config.endpoints,
+                probe_interval=self._config.endpoint_probe_interval,
+                cooldown=self._config.endpoint_cooldown,
+            )
+        self._circuit_breakers = None
+        if self._config.circuit_breaker:
+            self._circuit_breakers = CircuitBreakerRegistry(
+                self._config.endpoints,
+                failure_threshold=self._config.circuit_breaker_threshold,
+                recovery_timeout=self._config.circuit_breaker_timeout,
+                on_state_change=self._config.circuit_breaker_handler,
+            )
         self.api_version = parse_api_version(self._config.version)
 
-        from .func.system import System
-        from .func.admin import Admin
-        from .func.agent import Agent, AgentWatcher
-        from .func.auth import Auth
-        from .func.bgtask import BackgroundTask
-        from .func.domain import Domain
-        from .func.etcd import EtcdConfig
-        from .func.group import Group
-        from .func.image import Image
-        from .func.session import ComputeSession
-        from .func.keypair import KeyPair
-        from .func.manager import Manager
-        from .func.resource import Resource
-        from .func.keypair_resource_policy import KeypairResourcePolicy
-        from .func.scaling_group import ScalingGroup
-        from .func.session_template import SessionTemplate
-        from .func.user import User
-        from .func.vfolder import VFolder
-        from .func.dotfile import Dotfile
-        from .func.server_log import ServerLog
-
-        self.System = System
-        self.Admin = Admin
-        self.Agent = Agent
-        self.AgentWatcher = AgentWatcher
-        self.Auth = Auth
-        self.BackgroundTask = BackgroundTask
-        self.EtcdConfig = EtcdConfig
-        self.Domain = Domain
-        self.Group = Group
-        self.Image = Image
-        self.ComputeSession = ComputeSession
-        self.KeyPair = KeyPair
-        self.Manager = Manager
-        self.Resource = Resource
-        self.KeypairResourcePolicy = KeypairResourcePolicy
-        self.User = User
-        self.ScalingGroup = ScalingGroup
-        self.SessionTemplate = SessionTemplate
-        self.VFolder = VFolder
-        self.Dotfile = Dotfile
-        self.ServerLog = ServerLog
-
     @property
     def proxy_mode(self) -> bool:
         """
@@ -320,6 +627,129 @@ class BaseSession(metaclass=abc.ABCMeta):
         """
         return self._proxy_mode
 
+    def _create_aiohttp_session(self, *, shared_pool: Optional[bool] = None) -> aiohttp.ClientSession:
+        self._connection_pool = acquire_connection_pool(self._config, shared=shared_pool)
+        return self._connection_pool.create_session()
+
+    @property
+    def connection_pool_stats(self) -> ConnectionPoolStats:
+        """
+        The utilization counters of the connection pool used by this session.
+        If the pool is shared, the counters include the requests made by
+        other sessions sharing it.
+        """
+        return self._connection_pool.get_stats()
+
+    @property
+    def request_coalescer(self) -> RequestCoalescer:
+        """
+        The registry of in-flight read-only requests used when
+        :attr:`APIConfig.coalesce_requests
+        <ai.backend.client.config.APIConfig.coalesce_requests>` is set.
+        """
+        return self._request_coalescer
+
+    @property
+    def graphql_batcher(self) -> Optional[GraphQLBatcher]:
+        """
+        The batcher merging GraphQL queries issued in the same event loop tick,
+        or ``None`` if :attr:`APIConfig.graphql_batching
+        <ai.backend.client.config.APIConfig.graphql_batching>` is not set.
+        """
+        return self._graphql_batcher
+
+    @property
+    def persisted_queries(self) -> Optional[PersistedQueryRegistry]:
+        """
+        The registry of the GraphQL queries persisted in the server, or ``None`` if
+        :attr:`APIConfig.graphql_persisted_queries
+        <ai.backend.client.config.APIConfig.graphql_persisted_queries>` is not set.
+        """
+        return self._persisted_queries
+
+    @property
+    def server_features(self) -> Dict[str, bool]:
+        """
+        The optional server features detected while using this session,
+        such as the cursor-based pagination of each listing.
+        """
+        return self._server_features
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """
+        The cache of the responses of read-mostly API functions, or ``None`` if
+        :attr:`APIConfig.response_cache
+        <ai.backend.client.config.APIConfig.response_cache>` is not set.
+        """
+        return self._response_cache
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """
+        The policy to retry requests failed with transient errors.
+        """
+        return self._retry_policy
+
+    @property
+    def retry_budget(self) -> RetryBudget:
+        """
+        The budget limiting the retries made in this session.
+        """
+        return self._retry_budget
+
+    @property
+    def rate_limiter(self) -> Optional[TokenBucketLimiter]:
+        """
+        The limiter pacing outgoing requests, or ``None`` if
+        :attr:`APIConfig.rate_limiting
+        <ai.backend.client.config.APIConfig.rate_limiting>` is not set.
+        """
+        return self._rate_limiter
+
+    @property
+    def request_hedger(self) -> Optional[RequestHedger]:
+        """
+        The hedger of slow idempotent requests, or ``None`` if
+        :attr:`APIConfig.hedge_requests
+        <ai.backend.client.config.APIConfig.hedge_requests>` is not set
+        or there is only one endpoint.
+        """
+        return self._request_hedger
+
+    @property
+    def endpoint_selector(self) -> Optional[EndpointSelector]:
+        """
+        The latency-aware endpoint selector, or ``None`` if
+        :attr:`APIConfig.endpoint_selection
+        <ai.backend.client.config.APIConfig.endpoint_selection>` is not ``"latency"``
+        or there is only one endpoint.
+        """
+        return self._endpoint_selector
+
+    @property
+    def circuit_breakers(self) -> Optional[CircuitBreakerRegistry]:
+        """
+        The circuit breakers of the endpoints, or ``None`` if
+        :attr:`APIConfig.circuit_breaker
+        <ai.backend.client.config.APIConfig.circuit_breaker>` is not set.
+        """
+        return self._circuit_breakers
+
+    async def _start_endpoint_selector(self) -> None:
+        if self._endpoint_selector is None:
+            return
+
+        async def _probe(endpoint: URL) -> Any:
+            return await _probe_endpoint(self.aiohttp_session, self._config, endpoint)
+
+        await self._endpoint_selector.start(_probe)
+
+    async def _stop_endpoint_selector(self) -> None:
+        if self._endpoint_selector is None:
+            return
+        await self._endpoint_selector.stop()
+
     @abc.abstractmethod
     def open(self) -> Union[None, Awaitable[None]]:
         """
@@ -366,10 +796,21 @@ class Session(BaseSession):
     A context manager for API client sessions that makes API requests synchronously.
     You may call simple request-response APIs like a plain Python function,
     but cannot use streaming APIs based on WebSocket and Server-Sent Events.
+
+    A session may be shared by multiple threads.  The API calls made by them
+    run concurrently in the session's event loop, sharing its connection pool.
+    Use :meth:`activate` in the threads other than the one which has opened
+    the session.
+
+    If :attr:`APIConfig.shared_runtime
+    <ai.backend.client.config.APIConfig.shared_runtime>` is set, the session
+    uses the process-wide event loop thread and connection pool shared with
+    other sessions, which are kept running after the session is closed.
     """
 
     __slots__ = (
         '_worker_thread',
+        '_uses_shared_runtime',
     )
 
     def __init__(
@@ -378,38 +819,48 @@ class Session(BaseSession):
         proxy_mode: bool = False,
     ) -> None:
         super().__init__(config=config, proxy_mode=proxy_mode)
-        self._worker_thread = _SyncWorkerThread()
-        self._worker_thread.start()
+        self._uses_shared_runtime = self._config.shared_runtime
+        if self._uses_shared_runtime:
+            self._worker_thread = _get_shared_runtime()
+        else:
+            self._worker_thread = _SyncWorkerThread()
+            self._worker_thread.start()
 
         async def _create_aiohttp_session() -> aiohttp.ClientSession:
-            ssl = None
-            if self._config.skip_sslcert_validation:
-                ssl = False
-            connector = aiohttp.TCPConnector(ssl=ssl)
-            return aiohttp.ClientSession(connector=connector)
+            return self._create_aiohttp_session(shared_pool=self._uses_shared_runtime or None)
 
         self.aiohttp_session = self.worker_thread.execute(_create_aiohttp_session())
 
     def open(self) -> None:
         self._context_token = api_session.set(self)
+        self.worker_thread.execute(self._start_endpoint_selector())
         if not self._proxy_mode:
             self.api_version = self.worker_thread.execute(
                 _negotiate_api_version(self.aiohttp_session, self.config))
 
     def close(self) -> None:
         """
-        Terminates the session.  It schedules the ``close()`` coroutine
-        of the underlying aiohttp session and then enqueues a sentinel
-        object to indicate termination.  Then it waits until the worker
-        thread to self-terminate by joining.
+        Terminates the session.  It executes the ``close()`` coroutine
+        of the underlying aiohttp session and then stops the event loop
+        of the worker thread, cancelling the calls still running in other
+        threads.  Then it waits until the worker thread terminates.
+        The shared runtime is kept running for other sessions,
+        but the generators started by this session are stopped.
         """
         if self._closed:
             return
         self._closed = True
-        self._worker_thread.interrupt_generator()
+        # A private worker thread runs the generators of this session only.
+        owner = self if self._uses_shared_runtime else None
+        self._worker_thread.execute(self._worker_thread.shutdown_generators(owner))
+        self._worker_thread.execute(self._stop_endpoint_selector())
         self._worker_thread.execute(_close_aiohttp_session(self.aiohttp_session))
-        self._worker_thread.work_queue.put(sentinel)
-        self._worker_thread.join()
+        release_connection_pool(self._connection_pool)
+        if not self._uses_shared_runtime:
+            # The worker thread's event loop is private to this session,
+            # so shared pools bound to it cannot outlive the session.
+            self._worker_thread.execute(close_shared_pools())
+            self._worker_thread.stop()
         api_session.reset(self._context_token)
 
     @property
@@ -420,6 +871,97 @@ class Session(BaseSession):
         """
         return self._worker_thread
 
+    @contextmanager
+    def activate(self) -> Iterator[Session]:
+        """
+        Makes this session the current API session of the calling thread,
+        so that the thread can call the API functions via this session.
+
+        .. code-block:: python
+
+           def handle_request(email):
+               with shared_session.activate() as session:
+                   return session.User.detail(email=email)
+        """
+        assert not self.closed, 'Cannot use closed session'
+        token = api_session.set(self)
+        try:
+            yield self
+        finally:
+            api_session.reset(token)
+
+    def gather(
+        self,
+        *calls: Callable[[], Any],
+        concurrency: int = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Runs the given API calls concurrently in the session's event loop
+        and returns their results in order.
+
+        Each call is a callable without arguments, such as a lambda or
+        :func:`functools.partial` wrapping an API function.  Inside the event loop,
+        the API functions return coroutines and do not block each other.
+        The calls must not perform blocking operations by themselves.
+
+        .. code-block:: python
+
+           with Session() as session:
+               infos = session.gather(
+                   lambda: session.Agent.detail('i-001'),
+                   lambda: session.Agent.detail('i-002'),
+               )
+
+        :param concurrency: The maximum number of calls running at once.
+            If not specified, it is limited only by the connection pool.
+        :param return_exceptions: If set, the exceptions raised by the calls are
+            returned in the places of their results.  Otherwise, the first exception
+            is raised after cancelling the remaining calls.
+        """
+        return self._worker_thread.execute(gather_calls(
+            calls,
+            concurrency=concurrency,
+            return_exceptions=return_exceptions,
+        ))
+
+    def map(
+        self,
+        fn: Callable[[_Item], Any],
+        items: Iterable[_Item],
+        *,
+        concurrency: int = None,
+        return_exceptions: bool = False,
+        as_completed: bool = False,
+    ) -> Union[List[Any], Iterator[CallOutcome]]:
+        """
+        Calls *fn* with each item concurrently like :meth:`gather`.
+
+        .. code-block:: python
+
+           with Session() as session:
+               session.map(
+                   lambda sess_id: session.ComputeSession(sess_id).destroy(),
+                   session_ids,
+                   concurrency=10,
+                   return_exceptions=True,
+               )
+
+        :param as_completed: If set, returns an iterator yielding
+            :class:`~ai.backend.client.fanout.CallOutcome` objects with the index
+            and the result or the exception of each call as they complete,
+            instead of the list of the results.  Stopping the iteration
+            cancels the remaining calls.
+        """
+        calls = [functools.partial(fn, item) for item in items]
+        if as_completed:
+            return self._worker_thread.execute_generator(
+                iterate_completed_calls(calls, concurrency=concurrency),
+                prefetch=self.config.sync_generator_prefetch,
+                owner=self,
+            )
+        return self.gather(*calls, concurrency=concurrency, return_exceptions=return_exceptions)
+
     def __enter__(self) -> Session:
         assert not self.closed, 'Cannot reuse closed session'
         self.open()
@@ -451,14 +993,11 @@ class AsyncSession(BaseSession):
         proxy_mode: bool = False,
     ) -> None:
         super().__init__(config=config, proxy_mode=proxy_mode)
-        ssl = None
-        if self._config.skip_sslcert_validation:
-            ssl = False
-        connector = aiohttp.TCPConnector(ssl=ssl)
-        self.aiohttp_session = aiohttp.ClientSession(connector=connector)
+        self.aiohttp_session = self._create_aiohttp_session()
 
     async def _aopen(self) -> None:
         self._context_token = api_session.set(self)
+        await self._start_endpoint_selector()
         if not self._proxy_mode:
             self.api_version = await _negotiate_api_version(self.aiohttp_session, self.config)
 
@@ -469,7 +1008,9 @@ class AsyncSession(BaseSession):
         if self._closed:
             return
         self._closed = True
+        await self._stop_endpoint_selector()
         await _close_aiohttp_session(self.aiohttp_session)
+        release_connection_pool(self._connection_pool)
         api_session.reset(self._context_token)
 
     def close(self) -> Awaitable[None]:
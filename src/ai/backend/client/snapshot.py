@@ -0,0 +1,180 @@
+"""
+Provides fully-buffered copies of API responses that can be shared by
+multiple consumers, such as the coalesced waiters of in-flight requests
+and the response cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import (
+    Any,
+    AsyncIterator,
+    Optional,
+    Tuple,
+)
+
+import aiohttp
+import attr
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+__all__ = (
+    'ResponseSnapshot',
+    'SnapshotClientResponse',
+)
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
+class ResponseSnapshot:
+    """
+    An immutable copy of the status, headers, and the whole body of a response.
+    """
+    status: int
+    reason: str
+    headers: CIMultiDictProxy[str]
+    body: bytes
+    url: URL
+    method: str
+
+    @classmethod
+    def from_response(cls, raw_response: aiohttp.ClientResponse, body: bytes) -> ResponseSnapshot:
+        headers = CIMultiDict(raw_response.headers)
+        # The body is already decoded by the content-encoding handlers.
+        headers.popall('Content-Encoding', None)
+        headers.popall('Transfer-Encoding', None)
+        headers['Content-Length'] = str(len(body))
+        return cls(
+            status=raw_response.status,
+            reason=raw_response.reason or '',
+            headers=CIMultiDictProxy(headers),
+            body=body,
+            url=raw_response.url,
+            method=raw_response.method,
+        )
+
+
+class _SnapshotStreamReader:
+    """
+    Provides the reading interfaces of :class:`aiohttp.StreamReader`
+    over a snapshot body.
+    """
+
+    def __init__(self, body: bytes) -> None:
+        self._body = body
+        self._pos = 0
+
+    def at_eof(self) -> bool:
+        return self._pos >= len(self._body)
+
+    def exception(self) -> Optional[BaseException]:
+        return None
+
+    async def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            n = len(self._body) - self._pos
+        data = self._body[self._pos:self._pos + n]
+        self._pos += len(data)
+        return data
+
+    async def readany(self) -> bytes:
+        return await self.read()
+
+    async def readexactly(self, n: int) -> bytes:
+        data = await self.read(n)
+        if len(data) < n:
+            raise asyncio.IncompleteReadError(data, n)
+        return data
+
+    async def readline(self) -> bytes:
+        pos = self._body.find(b'\n', self._pos)
+        end = len(self._body) if pos < 0 else pos + 1
+        return await self.read(end - self._pos)
+
+    async def iter_any(self) -> AsyncIterator[bytes]:
+        while not self.at_eof():
+            yield await self.readany()
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        while not self.at_eof():
+            yield await self.read(n)
+
+
+class SnapshotClientResponse:
+    """
+    Mimics the subset of :class:`aiohttp.ClientResponse` interfaces used by
+    :class:`~ai.backend.client.request.Response` on top of a
+    :class:`ResponseSnapshot`.  Each instance has its own read position,
+    so that each consumer decodes its own copy of the content.
+    """
+
+    history: Tuple[aiohttp.ClientResponse, ...] = ()
+    request_info: Any = None
+
+    def __init__(self, snapshot: ResponseSnapshot) -> None:
+        self._snapshot = snapshot
+        self.content = _SnapshotStreamReader(snapshot.body)
+
+    @property
+    def snapshot(self) -> ResponseSnapshot:
+        return self._snapshot
+
+    @property
+    def status(self) -> int:
+        return self._snapshot.status
+
+    @property
+    def reason(self) -> str:
+        return self._snapshot.reason
+
+    @property
+    def headers(self) -> CIMultiDictProxy[str]:
+        return self._snapshot.headers
+
+    @property
+    def url(self) -> URL:
+        return self._snapshot.url
+
+    @property
+    def method(self) -> str:
+        return self._snapshot.method
+
+    @property
+    def content_type(self) -> str:
+        ctype = self._snapshot.headers.get('Content-Type', 'application/octet-stream')
+        return ctype.partition(';')[0].strip().lower()
+
+    @property
+    def charset(self) -> Optional[str]:
+        ctype = self._snapshot.headers.get('Content-Type', '')
+        for param in ctype.split(';')[1:]:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'charset':
+                return value.strip().strip('"')
+        return None
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return len(self._snapshot.body)
+
+    @property
+    def closed(self) -> bool:
+        return True
+
+    async def read(self) -> bytes:
+        return self._snapshot.body
+
+    async def text(self, encoding: str = None, errors: str = 'strict') -> str:
+        return self._snapshot.body.decode(encoding or self.charset or 'utf-8', errors)
+
+    async def json(self, *, encoding: str = None, loads=json.loads, **kwargs) -> Any:
+        if not self._snapshot.body.strip():
+            return None
+        return loads(self._snapshot.body.decode(encoding or self.charset or 'utf-8'))
+
+    def release(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
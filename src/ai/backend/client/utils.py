@@ -1,8 +1,6 @@
 import io
 import os
 
-from tqdm import tqdm
-
 
 class ProgressReportingReader(io.BufferedReader):
 
@@ -10,6 +8,7 @@ class ProgressReportingReader(io.BufferedReader):
         super().__init__(open(file_path, 'rb'))
         self._filename = os.path.basename(file_path)
         if tqdm_instance is None:
+            from tqdm import tqdm
             self._owns_tqdm = True
             self.tqdm = tqdm(
                 unit='bytes',
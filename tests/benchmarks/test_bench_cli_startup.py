@@ -0,0 +1,37 @@
+'''
+Measures the time to import the command line interface, which is paid by
+every invocation of the ``backend.ai`` command before running any command.
+'''
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# module-level marker
+pytestmark = pytest.mark.benchmark
+
+NUM_RUNS = 5
+
+# It used to take more than 350 msec when all command modules and the session
+# module were imported at startup.
+CLI_IMPORT_BUDGET = 0.2
+
+
+def _measure_cli_import() -> float:
+    code = textwrap.dedent('''
+        import time
+        begin = time.perf_counter()
+        import ai.backend.client.cli
+        print(time.perf_counter() - begin)
+    ''')
+    proc = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True)
+    return float(proc.stdout)
+
+
+@pytest.mark.timeout(60)
+def test_cli_import_time():
+    elapsed = min(_measure_cli_import() for _ in range(NUM_RUNS))
+    print(f'\ncli import: {elapsed * 1000:.1f} msec (budget: {CLI_IMPORT_BUDGET * 1000:.0f} msec)')
+    assert elapsed < CLI_IMPORT_BUDGET
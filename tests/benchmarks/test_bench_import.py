@@ -0,0 +1,40 @@
+'''
+Measures the time to import the client library and an API function class,
+which is paid by every short-lived process using the library.
+'''
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# module-level marker
+pytestmark = pytest.mark.benchmark
+
+NUM_RUNS = 5
+
+# The import time on top of aiohttp, which the sessions require anyway.
+# It used to take about 150 to 200 msec when all function modules and
+# their dependencies were imported by the sessions.
+IMPORT_BUDGET = 0.15
+
+
+def _measure_import() -> float:
+    code = textwrap.dedent('''
+        import time
+        import aiohttp
+        begin = time.perf_counter()
+        from ai.backend.client.session import Session
+        Session.ComputeSession
+        print(time.perf_counter() - begin)
+    ''')
+    proc = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True)
+    return float(proc.stdout)
+
+
+@pytest.mark.timeout(60)
+def test_import_time():
+    elapsed = min(_measure_import() for _ in range(NUM_RUNS))
+    print(f'\nimport: {elapsed * 1000:.1f} msec (budget: {IMPORT_BUDGET * 1000:.0f} msec)')
+    assert elapsed < IMPORT_BUDGET
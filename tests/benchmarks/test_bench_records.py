@@ -0,0 +1,63 @@
+'''
+Compares the memory retained by a large listing collected as a list of dicts
+and as a RecordTable, where the items are decoded from JSON page by page.
+'''
+
+import gc
+import json
+import tracemalloc
+
+import pytest
+
+from ai.backend.client.records import RecordTable
+
+# module-level marker
+pytestmark = pytest.mark.benchmark
+
+NUM_ROWS = 20000
+PAGE_SIZE = 100
+FIELDS = ('id', 'name', 'image', 'type', 'status', 'status_info',
+          'occupied_slots', 'created_at', 'access_key')
+
+
+def _generate_items():
+    # Decode each page separately like the paginated GraphQL responses.
+    for offset in range(0, NUM_ROWS, PAGE_SIZE):
+        page = json.dumps([
+            {
+                'id': f'a3b2c1d0-0000-4000-8000-{i:012d}',
+                'name': f'session-{i}',
+                'image': 'cr.backend.ai/stable/python:3.8-ubuntu18.04',
+                'type': 'INTERACTIVE',
+                'status': 'RUNNING' if i % 3 else 'TERMINATED',
+                'status_info': None,
+                'occupied_slots': '{"cpu": "1", "mem": "1073741824"}',
+                'created_at': '2020-09-01T12:30:15.123456+00:00',
+                'access_key': f'AKIAIOSFODNN7EXAMPL{i % 10}',
+            }
+            for i in range(offset, offset + PAGE_SIZE)
+        ])
+        yield from json.loads(page)
+
+
+def _measure(collect):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = collect()
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(result) == NUM_ROWS
+    return retained
+
+
+@pytest.mark.timeout(60)
+def test_record_table_memory():
+    dict_list_bytes = _measure(lambda: list(_generate_items()))
+    table_bytes = _measure(lambda: RecordTable(FIELDS).extend(_generate_items()))
+    print('\nretained memory for {:,} rows: dicts {:,.1f} MiB, RecordTable {:,.1f} MiB ({:.1f}x)'.format(
+        NUM_ROWS, dict_list_bytes / 2 ** 20, table_bytes / 2 ** 20, dict_list_bytes / table_bytes,
+    ))
+    assert table_bytes < dict_list_bytes / 2
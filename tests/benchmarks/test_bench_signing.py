@@ -0,0 +1,68 @@
+'''
+Measures the throughput of the per-request API signature generation.
+'''
+
+from datetime import datetime
+import hashlib
+import hmac
+import time
+
+from dateutil.tz import tzutc
+import pytest
+
+from ai.backend.client.auth import generate_signature
+
+# module-level marker
+pytestmark = pytest.mark.benchmark
+
+NUM_ITERATIONS = 20000
+
+
+def _generate_signature_uncached(*, method, version, endpoint, date, rel_url,
+                                 content_type, access_key, secret_key, hash_type):
+    # The previous implementation which re-derives everything per request.
+    hostname = endpoint.raw_authority
+    body_hash = hashlib.new(hash_type, b'').hexdigest()
+    sign_str = '{}\n{}\n{}\nhost:{}\ncontent-type:{}\nx-backendai-version:{}\n{}'.format(
+        method.upper(), rel_url, date.isoformat(), hostname,
+        content_type.lower(), version, body_hash,
+    )
+    sign_key = hmac.new(secret_key.encode(),
+                        date.strftime('%Y%m%d').encode(), hash_type).digest()
+    sign_key = hmac.new(sign_key, hostname.encode(), hash_type).digest()
+    signature = hmac.new(sign_key, sign_str.encode(), hash_type).hexdigest()
+    headers = {
+        'Authorization': 'BackendAI signMethod=HMAC-{}, credential={}:{}'.format(
+            hash_type.upper(), access_key, signature,
+        ),
+    }
+    return headers, signature
+
+
+def _measure(func, kwargs):
+    begin = time.perf_counter()
+    for _ in range(NUM_ITERATIONS):
+        func(**kwargs)
+    return NUM_ITERATIONS / (time.perf_counter() - begin)
+
+
+@pytest.mark.parametrize('hash_type', ['sha256', 'md5'])
+def test_signing_throughput(defconfig, hash_type):
+    kwargs = dict(
+        method='POST',
+        version=defconfig.version,
+        endpoint=defconfig.endpoint,
+        date=datetime.now(tzutc()),
+        rel_url='/session/mysession',
+        content_type='application/json',
+        access_key=defconfig.access_key,
+        secret_key=defconfig.secret_key,
+        hash_type=hash_type,
+    )
+    assert generate_signature(**kwargs) == _generate_signature_uncached(**kwargs)
+    uncached_rate = _measure(_generate_signature_uncached, kwargs)
+    cached_rate = _measure(generate_signature, kwargs)
+    print('\nsigning ({}): uncached {:,.0f} ops/sec, cached {:,.0f} ops/sec ({:.2f}x)'.format(
+        hash_type, uncached_rate, cached_rate, cached_rate / uncached_rate,
+    ))
+    assert cached_rate > uncached_rate
@@ -1,10 +1,13 @@
+import subprocess
 import sys
 import re
+import textwrap
 
 import pytest
 from click.testing import CliRunner
 
 from ai.backend.client.cli import main
+from ai.backend.client.cli.lazy import LazyCommandGroup
 from ai.backend.client.config import get_config, set_config
 
 
@@ -26,6 +29,72 @@ def test_print_help_for_unknown_command(runner):
     assert re.match(r'Usage: ([.\w]+) \[OPTIONS\] COMMAND \[ARGS\]', result.output)
 
 
+def test_lazy_command_loading():
+    code = textwrap.dedent('''
+        import sys
+        from click.testing import CliRunner
+        from ai.backend.client.cli import main
+        runner = CliRunner()
+        assert 'vfolder' in runner.invoke(main, ['--help']).output
+        assert 'show-license' in runner.invoke(main, ['admin', '--help']).output
+        assert 'Usage:' in runner.invoke(main, ['ps', '--help']).output
+        print(' '.join(name for name in sys.modules if name.startswith('ai.backend.client.cli.')))
+    ''')
+    proc = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True)
+    loaded = set(proc.stdout.decode().split())
+    # Only the modules of the invoked commands are imported.
+    assert 'ai.backend.client.cli.ps' in loaded
+    assert 'ai.backend.client.cli.admin.sessions' in loaded
+    assert not loaded & {
+        'ai.backend.client.cli.proxy',
+        'ai.backend.client.cli.files',
+        'ai.backend.client.cli.run',
+        'ai.backend.client.cli.vfolder',
+        'ai.backend.client.cli.admin.users',
+    }
+
+
+def test_cli_import_is_lazy():
+    # The timing is measured by the benchmarks, which do not run by default.
+    code = textwrap.dedent('''
+        import sys
+        from ai.backend.client.cli import main
+        print(' '.join(sys.modules))
+    ''')
+    proc = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, check=True)
+    loaded = set(proc.stdout.decode().split())
+    # The entry point imports neither the command modules nor the API client stack.
+    assert {name for name in loaded if name.startswith('ai.backend.client.cli.')} == {
+        'ai.backend.client.cli.lazy',
+    }
+    assert not loaded & {
+        'ai.backend.client.session',
+        'ai.backend.client.request',
+        'aiohttp',
+        'pyarrow',
+        'tqdm',
+        'janus',
+        'aiotusclient',
+    }
+
+
+def _check_command_index(group):
+    group.load_all_commands()
+    assert set(group.commands) == set(group.lazy_commands)
+    for name, placeholder in group.lazy_commands.items():
+        command = group.commands[name]
+        assert command is not placeholder
+        for limit in (45, 200):
+            assert placeholder.get_short_help_str(limit) == command.get_short_help_str(limit), name
+        assert sorted(group._commands.get(name, [])) == sorted(placeholder.aliases), name
+        if isinstance(command, LazyCommandGroup) and command.lazy_commands:
+            _check_command_index(command)
+
+
+def test_command_index_is_up_to_date():
+    _check_command_index(main)
+
+
 def test_config(runner, monkeypatch, example_keypair,
                 unused_tcp_port_factory):
     api_port = unused_tcp_port_factory()
@@ -1,7 +1,14 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
 import os
+import threading
 
+from aiohttp import web
 import pytest
+from yarl import URL
 
+from ai.backend.client.auth import generate_signature
 from ai.backend.client.config import APIConfig, set_config
 
 
@@ -42,3 +49,92 @@ def user_keypair(userconfig):
 @pytest.fixture
 def dummy_endpoint(defconfig):
     return str(defconfig.endpoint) + '/'
+
+
+@asynccontextmanager
+async def _run_local_server(handler):
+    app = web.Application()
+    app.router.add_route('*', '/{path:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        await runner.cleanup()
+
+
+@pytest.fixture
+def local_server():
+    """
+    Returns an async context manager that runs a stand-in API server
+    on a random local port using the given aiohttp handler,
+    and yields the endpoint URL.
+    """
+    return _run_local_server
+
+
+@contextmanager
+def _run_threaded_local_server(handler):
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    stopped = None
+    endpoint = None
+
+    async def _serve():
+        nonlocal stopped, endpoint
+        stopped = asyncio.Event()
+        async with _run_local_server(handler) as endpoint:
+            started.set()
+            await stopped.wait()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(_serve(), ), daemon=True)
+    thread.start()
+    started.wait()
+    try:
+        yield endpoint
+    finally:
+        loop.call_soon_threadsafe(stopped.set)
+        thread.join()
+        loop.close()
+
+
+@pytest.fixture
+def threaded_local_server():
+    """
+    Returns a context manager that runs a stand-in API server like
+    :func:`local_server` in a separate thread, so that synchronous
+    sessions can make requests to it.
+    """
+    return _run_threaded_local_server
+
+
+def _is_signed_for(request, secret_key='wJalrXUtnFEMI/K7MDENG/bPxRfiCYEXAMPLEKEY'):
+    sign_method, _, credential = request.headers.get('Authorization', '').partition(', credential=')
+    access_key, _, signature = credential.partition(':')
+    hash_type = sign_method.rpartition('HMAC-')[2].lower()
+    if not signature or not hash_type:
+        return False
+    _, expected_signature = generate_signature(
+        method=request.method,
+        version=request.headers['X-BackendAI-Version'],
+        endpoint=URL(f'http://{request.host}'),
+        date=datetime.fromisoformat(request.headers['Date']),
+        rel_url=str(request.rel_url),
+        content_type=request.content_type,
+        access_key=access_key,
+        secret_key=secret_key,
+        hash_type=hash_type,
+    )
+    return signature == expected_signature
+
+
+@pytest.fixture
+def signature_checker():
+    """
+    Returns a function that checks if the given aiohttp request of a stand-in
+    API server carries a valid signature for the host which received it.
+    """
+    return _is_signed_for
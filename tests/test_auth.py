@@ -1,8 +1,10 @@
 from datetime import datetime
+import hashlib
+import hmac
 
 from dateutil.tz import tzutc
 
-from ai.backend.client.auth import generate_signature
+from ai.backend.client.auth import generate_signature, _get_sign_key
 
 
 def test_generate_signature(defconfig):
@@ -22,3 +24,37 @@ def test_generate_signature(defconfig):
     assert kwargs['hash_type'].upper() in headers['Authorization']
     assert kwargs['access_key'] in headers['Authorization']
     assert signature in headers['Authorization']
+
+
+def test_generate_signature_reuses_sign_key(defconfig):
+    _get_sign_key.cache_clear()
+    date = datetime(2020, 9, 1, 12, 30, tzinfo=tzutc())
+    kwargs = dict(
+        method='POST',
+        version=defconfig.version,
+        endpoint=defconfig.endpoint,
+        date=date,
+        rel_url='/path/to/api/',
+        content_type='application/json',
+        access_key=defconfig.access_key,
+        secret_key=defconfig.secret_key,
+        hash_type='sha256',
+    )
+    _, signature1 = generate_signature(**kwargs)
+    _, signature2 = generate_signature(**{**kwargs, 'date': date.replace(hour=13)})
+    assert signature1 != signature2
+    cache_info = _get_sign_key.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
+
+    # Check compatibility with the uncached derivation of the signing key.
+    hostname = defconfig.endpoint.raw_authority
+    sign_key = hmac.new(defconfig.secret_key.encode(), b'20200901', 'sha256').digest()
+    sign_key = hmac.new(sign_key, hostname.encode(), 'sha256').digest()
+    sign_str = '\n'.join([
+        'POST', '/path/to/api/', date.isoformat(),
+        f'host:{hostname}', 'content-type:application/json',
+        f'x-backendai-version:{defconfig.version}',
+        hashlib.sha256(b'').hexdigest(),
+    ])
+    assert signature1 == hmac.new(sign_key, sign_str.encode(), 'sha256').hexdigest()
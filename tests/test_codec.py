@@ -0,0 +1,110 @@
+from datetime import datetime
+from decimal import Decimal
+import json
+from pathlib import Path
+from unittest import mock
+import uuid
+
+from aioresponses import aioresponses
+from dateutil.tz import tzutc
+import pytest
+
+from ai.backend.client.codec import get_json_codec, StdlibJSONCodec, OrjsonCodec
+from ai.backend.client.config import API_VERSION, APIConfig
+from ai.backend.client.request import Request
+from ai.backend.client.session import Session, AsyncSession
+from ai.backend.client.test_utils import AsyncMock
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+available_codecs = ['stdlib', pytest.param('orjson', marks=pytest.mark.skipif(
+    orjson is None, reason='orjson is not installed'))]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def api_version():
+    mock_nego_func = AsyncMock()
+    mock_nego_func.return_value = API_VERSION
+    with mock.patch('ai.backend.client.session._negotiate_api_version', mock_nego_func):
+        yield
+
+
+def test_get_json_codec():
+    codec = get_json_codec('auto')
+    if orjson is None:
+        assert isinstance(codec, StdlibJSONCodec)
+    else:
+        assert isinstance(codec, OrjsonCodec)
+    assert isinstance(get_json_codec('stdlib'), StdlibJSONCodec)
+    assert get_json_codec('stdlib') is get_json_codec('stdlib')
+    with pytest.raises(ValueError):
+        get_json_codec('unknown')
+    with pytest.raises(ValueError):
+        APIConfig(access_key='a', secret_key='s', json_codec='unknown')
+
+
+@pytest.mark.parametrize('codec_name', available_codecs)
+def test_json_codec_extended_types(codec_name):
+    codec = get_json_codec(codec_name)
+    value = {
+        'id': uuid.UUID('d1d4a1c2-7bbf-4bd4-9ad8-1e0b0b7c9ed2'),
+        'created_at': datetime(2020, 9, 1, 12, 30, 15, tzinfo=tzutc()),
+        'path': Path('/home/work/data'),
+        'amount': Decimal('1.5'),
+        'items': [1, 'a', None, True],
+    }
+    encoded = codec.dumps(value)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == {
+        'id': 'd1d4a1c2-7bbf-4bd4-9ad8-1e0b0b7c9ed2',
+        'created_at': '2020-09-01T12:30:15+00:00',
+        'path': '/home/work/data',
+        'amount': '1.5',
+        'items': [1, 'a', None, True],
+    }
+    assert codec.loads(b'{"a": [1, 2.5, "\\ud55c"]}') == {'a': [1, 2.5, '한']}
+    assert codec.loads('{"a": null}') == {'a': None}
+    with pytest.raises(TypeError):
+        codec.dumps({'x': object()})
+
+
+@pytest.mark.parametrize('codec_name', available_codecs)
+def test_request_set_json(defconfig, codec_name):
+    config = APIConfig(
+        endpoint=defconfig.endpoint,
+        access_key=defconfig.access_key,
+        secret_key=defconfig.secret_key,
+        json_codec=codec_name,
+    )
+    with Session(config=config):
+        rqst = Request('POST', '/function')
+        rqst.set_json({'path': Path('/tmp'), 'n': 1})
+        assert rqst.content_type == 'application/json'
+        assert json.loads(rqst.content) == {'path': '/tmp', 'n': 1}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('codec_name', available_codecs)
+async def test_response_json(defconfig, dummy_endpoint, codec_name):
+    config = APIConfig(
+        endpoint=defconfig.endpoint,
+        access_key=defconfig.access_key,
+        secret_key=defconfig.secret_key,
+        json_codec=codec_name,
+    )
+    body = '{"name": "한글", "items": [1, 2, 3]}'.encode('utf-8')
+    with aioresponses() as m:
+        m.get(dummy_endpoint + 'function', status=200, body=body,
+              headers={'Content-Type': 'application/json'})
+        m.get(dummy_endpoint + 'function', status=200, body=b'',
+              headers={'Content-Type': 'application/json'})
+        async with AsyncSession(config=config):
+            rqst = Request('GET', '/function')
+            async with rqst.fetch() as resp:
+                assert await resp.json() == {'name': '한글', 'items': [1, 2, 3]}
+            rqst = Request('GET', '/function')
+            async with rqst.fetch() as resp:
+                assert await resp.json() is None
@@ -0,0 +1,98 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from ai.backend.client.cli.pagination import export_items, select_fields
+from ai.backend.client.export import guess_export_options, open_record_writer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+requires_zstd = pytest.mark.skipif(zstandard is None, reason='zstandard is not installed')
+
+items = [
+    {'email': 'a@example.com', 'role': 'admin', 'groups': [{'id': 'g1', 'name': 'default'}]},
+    {'email': 'b@example.com', 'role': None, 'groups': []},
+]
+
+
+def test_guess_export_options():
+    assert guess_export_options('users.ndjson') == ('ndjson', None)
+    assert guess_export_options('users.CSV.gz') == ('csv', 'gzip')
+    assert guess_export_options('/tmp/users.jsonl.zst') == ('ndjson', 'zstd')
+    assert guess_export_options('users.parquet') == ('parquet', None)
+    assert guess_export_options('users.txt') == (None, None)
+    assert guess_export_options('users') == (None, None)
+
+
+def test_ndjson_writer(tmp_path):
+    path = tmp_path / 'users.ndjson'
+    with open_record_writer(path, ['email', 'groups', 'missing']) as writer:
+        assert writer.write_all(iter(items)) == 2
+    lines = path.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'email': 'a@example.com', 'groups': [{'id': 'g1', 'name': 'default'}], 'missing': None},
+        {'email': 'b@example.com', 'groups': [], 'missing': None},
+    ]
+
+
+def test_csv_writer_with_gzip(tmp_path):
+    path = tmp_path / 'users.csv.gz'
+    with open_record_writer(path, ['email', 'role', 'groups']) as writer:
+        writer.write_all(items)
+    with gzip.open(path, 'rt', newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['email', 'role', 'groups']
+    assert rows[1][:2] == ['a@example.com', 'admin']
+    assert json.loads(rows[1][2]) == [{'id': 'g1', 'name': 'default'}]
+    assert rows[2] == ['b@example.com', '', '[]']
+
+
+@requires_zstd
+@pytest.mark.asyncio
+async def test_ndjson_writer_with_zstd(tmp_path):
+
+    async def _generate_items():
+        for item in items:
+            yield item
+
+    path = tmp_path / 'users.out'
+    with open_record_writer(path, ['email'], format='ndjson', compression='zstd') as writer:
+        assert await writer.write_all_async(_generate_items()) == 2
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(path.read_bytes()))
+    assert [json.loads(line) for line in reader.read().splitlines()] == [
+        {'email': 'a@example.com'},
+        {'email': 'b@example.com'},
+    ]
+
+
+def test_parquet_writer(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'users.parquet'
+    with open_record_writer(path, ['email', 'role', 'groups']) as writer:
+        for _ in range(3):
+            writer.write_all(items)
+    table = pq.read_table(path)
+    assert table.column_names == ['email', 'role', 'groups']
+    assert table.num_rows == 6
+    assert table.column('role').to_pylist()[:2] == ['admin', None]
+
+
+def test_export_items_with_projection(tmp_path):
+    fields = [
+        ('Email', 'email'),
+        ('Role', 'role'),
+        ('Groups', 'groups { id name }'),
+    ]
+    selected = select_fields(fields, 'groups,email')
+    assert selected == [('Groups', 'groups { id name }'), ('Email', 'email')]
+    with pytest.raises(ValueError):
+        select_fields(fields, 'email,password')
+    path = tmp_path / 'users.ndjson'
+    assert export_items(iter(items), selected, str(path)) == 2
+    assert json.loads(path.read_text().splitlines()[1]) == {'groups': [], 'email': 'b@example.com'}
@@ -114,7 +114,7 @@ def test_get_kernel_info_url(mocker):
         mock_req.assert_called_once_with(
             'GET', f'/{prefix}/{session_id}',
             params={})
-        mock_req_obj.fetch.assert_called_once_with()
+        mock_req_obj.fetch.assert_called_once_with(coalesce=True)
         mock_req_obj.fetch.return_value.json.assert_called_once_with()
 
 
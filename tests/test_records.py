@@ -0,0 +1,68 @@
+import pytest
+
+from ai.backend.client.records import RecordTable
+
+items = [
+    {'id': 's1', 'status': 'RUNNING', 'cpu': 1, 'groups': [{'name': 'default'}]},
+    {'id': 's2', 'status': 'RUNNING', 'cpu': 2, 'groups': []},
+    {'id': 's3', 'status': 'TERMINATED', 'cpu': 4},
+]
+
+
+def test_record_table():
+    table = RecordTable(['id', 'status', 'cpu', 'groups { name }'])
+    table.extend(dict(item) for item in items)
+    assert table.keys == ('id', 'status', 'cpu', 'groups')
+    assert len(table) == 3
+    assert table[0]['groups'] == [{'name': 'default'}]
+    assert table[-1].get('groups') is None
+    assert dict(table[1]) == items[1]
+    assert [row['id'] for row in table] == ['s1', 's2', 's3']
+    assert [row['id'] for row in table[1:]] == ['s2', 's3']
+    with pytest.raises(IndexError):
+        table[3]
+    with pytest.raises(KeyError):
+        table[0]['unknown']
+    assert table.column('cpu') == [1, 2, 4]
+    assert table.to_dicts()[2] == {'id': 's3', 'status': 'TERMINATED', 'cpu': 4, 'groups': None}
+    # The repeated strings are shared.
+    assert table[0]['status'] is table[1]['status']
+
+
+def test_record_table_shared_values_limit():
+    table = RecordTable(['id'], max_shared_values=2)
+    table.extend({'id': ''.join(['id', str(i % 3)])} for i in range(6))
+    column = table.column('id')
+    assert column[0] is column[3]
+    assert column[1] is column[4]
+    assert column[2] is not column[5]
+
+
+@pytest.mark.asyncio
+async def test_record_table_extend_async():
+
+    async def _generate_items():
+        for item in items:
+            yield item
+
+    table = await RecordTable(['id']).extend_async(_generate_items())
+    assert table.column('id') == ['s1', 's2', 's3']
+
+
+def test_record_table_to_numpy():
+    numpy = pytest.importorskip('numpy')
+    table = RecordTable(['cpu', 'groups']).extend(items)
+    cpu = table.to_numpy('cpu')
+    assert cpu.dtype.kind == 'i'
+    assert cpu.sum() == 7
+    groups = table.to_numpy('groups')
+    assert groups.dtype == numpy.dtype(object)
+    assert groups[1] == []
+
+
+def test_record_table_to_pandas():
+    pytest.importorskip('pandas')
+    df = RecordTable(['id', 'status', 'cpu']).extend(items).to_pandas()
+    assert list(df.columns) == ['id', 'status', 'cpu']
+    assert df['cpu'].sum() == 7
+    assert (df['status'] == 'RUNNING').sum() == 2
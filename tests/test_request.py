@@ -78,6 +78,23 @@ def test_request_set_content(mock_request_params):
     assert rqst._pack_content() is rqst.content
 
 
+def test_request_graphql_query_decoded_once(session):
+    rqst = Request('POST', '/admin/graphql')
+    rqst.set_json({'query': 'query { images { name } }', 'variables': {'a': 1}})
+    with mock.patch.object(Request, '_decode_graphql_query',
+                           autospec=True, side_effect=Request._decode_graphql_query) as decode:
+        assert rqst._is_idempotent()
+        assert rqst._get_coalescing_key() is not None
+        assert rqst._load_graphql_query() == ('query { images { name } }', {'a': 1})
+        assert decode.call_count == 1
+
+        # Replacing the content invalidates the memoized query.
+        rqst.set_json({'query': 'mutation { rescan_images { ok } }', 'variables': {}})
+        assert not rqst._is_idempotent()
+        assert rqst._get_coalescing_key() is None
+        assert decode.call_count == 2
+
+
 def test_request_attach_files(mock_request_params):
     files = [
         AttachedFile('test1.txt', io.BytesIO(), 'application/octet-stream'),